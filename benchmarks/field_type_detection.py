@@ -0,0 +1,58 @@
+"""
+Per-value cost of field type detection, reference vs compiled detector. The
+detector is timed on `detect_helper`, which is what `select_field_type` uses
+(field types are only instantiated once per column).
+
+    python benchmarks/field_type_detection.py
+"""
+from __future__ import annotations
+
+import decimal
+import timeit
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List
+
+from dcp.data_format.formats.memory.records import (
+    ALL_FIELD_TYPE_HELPERS,
+    FieldTypeDetector,
+    _detect_field_type_fast,
+)
+
+N_VALUES = 10_000
+
+SAMPLES: Dict[str, Callable[[int], Any]] = {
+    "int": lambda i: i,
+    "float": lambda i: i / 3,
+    "decimal": lambda i: decimal.Decimal(i),
+    "date": lambda i: date(2020, 1, i % 28 + 1),
+    "datetime": lambda i: datetime(2020, 1, i % 28 + 1, i % 24),
+    "json": lambda i: {"a": i},
+    "str int": lambda i: str(i),
+    "str float": lambda i: f"{i / 3:.3f}",
+    "str bool": lambda i: "true" if i % 2 else "false",
+    "str iso date": lambda i: f"2020-01-{i % 28 + 1:02d}",
+    "str iso datetime": lambda i: f"2020-01-{i % 28 + 1:02d}T{i % 24:02d}:00:00",
+    "str text": lambda i: f"some text {i}",
+    "str time": lambda i: f"{i % 24:02d}:{i % 60:02d}",
+}
+
+
+def per_value_us(detect: Callable[[Any], Any], values: List[Any]) -> float:
+    seconds = timeit.timeit(lambda: [detect(v) for v in values], number=1)
+    return seconds / len(values) * 1e6
+
+
+def main():
+    print(f"{'values':<18}{'reference':>12}{'cold':>12}{'warm':>12}  (us / value)")
+    for name, make in SAMPLES.items():
+        values = [make(i) for i in range(N_VALUES)]
+        reference = per_value_us(_detect_field_type_fast, values)
+        # Fresh detector (empty cache), then again with the cache populated
+        detector = FieldTypeDetector(ALL_FIELD_TYPE_HELPERS.values())
+        cold = per_value_us(detector.detect_helper, values)
+        warm = per_value_us(detector.detect_helper, values)
+        print(f"{name:<18}{reference:>12.2f}{cold:>12.2f}{warm:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
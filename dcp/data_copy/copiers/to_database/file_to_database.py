@@ -2,13 +2,20 @@ from dcp.data_format.formats.database.base import DatabaseTableFormat
 from dcp.storage.database.api import DatabaseStorageApi
 
 from dcp.data_copy.base import CopyRequest, DataCopierBase
-from dcp.data_copy.costs import NetworkToBufferCost
+from dcp.data_copy.costs import FormatConversionCost, NetworkToBufferCost
 from dcp.data_format.formats.file_system.csv_file import CsvFileFormat
+from dcp.data_format.formats.file_system.json_lines_file import JsonLinesFileFormat
+from dcp.data_format.formats.file_system.parquet_file import (
+    PYARROW_SUPPORTED,
+    ParquetFileFormat,
+    iter_parquet_batches,
+)
 from dcp.storage.base import (
     DatabaseStorageClass,
     FileSystemStorageClass,
 )
 from dcp.storage.file_system.engines.local import FileSystemStorageApi
+from dcp.utils.data import iterate_chunks, read_json_lines
 
 
 class FileToDatabaseMixin:
@@ -27,3 +34,33 @@ class FileToDatabaseMixin:
 class CsvFileToDatabaseTable(FileToDatabaseMixin, DataCopierBase):
     from_data_formats = [CsvFileFormat]
     to_data_formats = [DatabaseTableFormat]
+
+
+class JsonLinesFileToDatabaseTable(FileToDatabaseMixin, DataCopierBase):
+    from_data_formats = [JsonLinesFileFormat]
+    to_data_formats = [DatabaseTableFormat]
+    cost = NetworkToBufferCost + FormatConversionCost
+    chunk_size = 1000
+
+    def append(self, req: CopyRequest):
+        schema = req.get_to_schema()
+        db_api = req.to_obj.storage.get_database_api()
+        with req.from_obj.storage.get_filesystem_api().open(req.from_obj, "rb") as f:
+            for records in iterate_chunks(read_json_lines(f), self.chunk_size):
+                db_api.bulk_insert_records(req.to_obj, records, schema)
+
+
+class ParquetFileToDatabaseTable(FileToDatabaseMixin, DataCopierBase):
+    from_data_formats = [ParquetFileFormat]
+    to_data_formats = [DatabaseTableFormat]
+    cost = NetworkToBufferCost + FormatConversionCost
+
+    def append(self, req: CopyRequest):
+        if not PYARROW_SUPPORTED:
+            raise ImportError("Pyarrow is not installed")
+        schema = req.get_to_schema()
+        db_api = req.to_obj.storage.get_database_api()
+        with req.from_obj.storage.get_filesystem_api().open(req.from_obj, "rb") as f:
+            # Stream row group batches so we never hold the whole file in memory
+            for batch in iter_parquet_batches(f, schema.field_names()):
+                db_api.bulk_insert_records(req.to_obj, batch.to_pylist(), schema)
@@ -1,20 +1,35 @@
 from __future__ import annotations
 
-from typing import Any, Sequence
+from typing import Any, Iterator, Sequence
 
 from commonmodel.base import Schema
 from dcp.data_copy.base import CopyRequest, DataCopierBase, create_empty_if_not_exists
 from dcp.data_copy.costs import (
     FormatConversionCost,
     MemoryToMemoryCost,
+    NetworkToBufferCost,
     NetworkToMemoryCost,
 )
 from dcp.data_format.formats.database.base import DatabaseTableFormat
+from dcp.data_format.formats.memory.arrow_batch_iterator import (
+    ArrowBatchIterator,
+    ArrowBatchIteratorFormat,
+)
 from dcp.data_format.formats.memory.dataframe import DataFrameFormat
+from dcp.data_format.formats.memory.dataframe_iterator import (
+    DataFrameIterator,
+    DataFrameIteratorFormat,
+)
 from dcp.data_format.formats.memory.records import Records, RecordsFormat
+from dcp.data_format.formats.memory.records_iterator import (
+    RecordsIterator,
+    RecordsIteratorFormat,
+    ensure_records_iterator,
+)
 from dcp.storage.base import DatabaseStorageClass, MemoryStorageClass, StorageApi
 from dcp.storage.database.api import DatabaseStorageApi
 from dcp.storage.memory.engines.python import PythonStorageApi
+from dcp.utils.pandas import dataframe_to_records
 
 
 class MemoryToDatabaseMixin:
@@ -41,21 +56,56 @@ class RecordsToDatabaseTable(MemoryToDatabaseMixin, DataCopierBase):
         )
 
 
-# @datacopier(
-#     from_storage_classes=[MemoryStorageClass],
-#     from_data_formats=[RecordsIteratorFormat],
-#     to_storage_classes=[DatabaseStorageClass],
-#     to_data_formats=[DatabaseTableFormat],
-#     cost=NetworkToBufferCost,
-# )
-# def copy_records_iterator_to_db(
-#     req: CopyRequest
-# ):
-#     assert isinstance(req.from_storage_api, PythonStorageApi)
-#     assert isinstance(req.to_storage_api, DatabaseStorageApi)
-#     mdr = req.from_storage_api.get(req.from_name)
-#     req.to_format_handler.create_empty(
-#         req.to_name, req.to_storage_api.storage, req.get_schema()
-#     )
-#     for records in mdr.records_object:
-#         req.to_obj.storage.get_database_api().bulk_insert_records(req.to_name, records)
+class IteratorToDatabaseMixin(MemoryToDatabaseMixin):
+    """
+    Streams the iterator into the table a chunk of records at a time, so memory
+    is bounded by `chunk_size`. The iterator is closed when done.
+    """
+
+    chunk_size = 1000
+
+    def insert_object(self, req: CopyRequest, obj: Any):
+        schema = req.get_to_schema()
+        db_api = req.to_obj.storage.get_database_api()
+        for records in self.iterate_record_chunks(obj):
+            if records:
+                db_api.bulk_insert_records(req.to_obj, records, schema)
+
+    def iterate_record_chunks(self, obj: Any) -> Iterator[Records]:
+        raise NotImplementedError
+
+
+class RecordsIteratorToDatabaseTable(IteratorToDatabaseMixin, DataCopierBase):
+    from_data_formats = [RecordsIteratorFormat]
+    to_data_formats = [DatabaseTableFormat]
+    cost = NetworkToBufferCost
+    requires_schema_cast = False
+
+    def iterate_record_chunks(self, obj: RecordsIterator) -> Iterator[Records]:
+        return ensure_records_iterator(obj).chunks(self.chunk_size)
+
+
+class DataFrameIteratorToDatabaseTable(IteratorToDatabaseMixin, DataCopierBase):
+    from_data_formats = [DataFrameIteratorFormat]
+    to_data_formats = [DatabaseTableFormat]
+    cost = NetworkToBufferCost + FormatConversionCost
+    requires_schema_cast = False
+
+    def iterate_record_chunks(self, obj: DataFrameIterator) -> Iterator[Records]:
+        for df in obj.chunks(self.chunk_size):
+            yield dataframe_to_records(df)
+
+
+class ArrowBatchIteratorToDatabaseTable(IteratorToDatabaseMixin, DataCopierBase):
+    from_data_formats = [ArrowBatchIteratorFormat]
+    to_data_formats = [DatabaseTableFormat]
+    cost = NetworkToBufferCost + FormatConversionCost
+    requires_schema_cast = False
+
+    def iterate_record_chunks(self, obj: ArrowBatchIterator) -> Iterator[Records]:
+        # Already chunked, as batches
+        try:
+            for batch in obj.iterator:
+                yield batch.to_pylist()
+        finally:
+            obj.close()
@@ -1,21 +1,59 @@
 import json
 from io import IOBase
-from typing import Any
+from typing import Any, Iterator
+
+import pandas as pd
+from commonmodel import Schema
 
 from dcp.data_copy.base import CopyRequest, DataCopierBase
 from dcp.data_copy.costs import (
+    DiskToBufferCost,
     DiskToMemoryCost,
     FormatConversionCost,
 )
+from dcp.data_format.formats.file_system.arrow_file import (
+    ArrowFileFormat,
+    write_arrow_file,
+)
 from dcp.data_format.formats.file_system.csv_file import CsvFileFormat
 from dcp.data_format.formats.file_system.json_lines_file import JsonLinesFileFormat
+from dcp.data_format.formats.file_system.parquet_file import (
+    ParquetFileFormat,
+    read_parquet_table,
+    write_parquet_table,
+)
+from dcp.data_format.formats.memory.arrow_batch_iterator import (
+    ArrowBatchIterator,
+    ArrowBatchIteratorFormat,
+)
+from dcp.data_format.formats.memory.arrow_table import ArrowTable, ArrowTableFormat
+from dcp.data_format.formats.memory.dataframe import DataFrameFormat
+from dcp.data_format.formats.memory.dataframe_iterator import (
+    DataFrameIterator,
+    DataFrameIteratorFormat,
+)
 from dcp.data_format.formats.memory.records import Records, RecordsFormat
+from dcp.data_format.formats.memory.records_iterator import (
+    RecordsIterator,
+    RecordsIteratorFormat,
+    ensure_records_iterator,
+)
 from dcp.storage.base import FileSystemStorageClass, MemoryStorageClass
 from dcp.storage.file_system.engines.local import FileSystemStorageApi
 from dcp.storage.memory.engines.python import PythonStorageApi
 from dcp.utils.common import DcpJsonEncoder
 from dcp.utils.data import write_csv
+from dcp.utils.pandas import dataframe_to_records
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_SUPPORTED = True
+except ImportError:
+    PYARROW_SUPPORTED = False
+    pa = None
+    pq = None
 
 # from dcp.data_format.formats.memory.csv_lines_iterator import CsvLinesIteratorFormat
 
@@ -27,9 +65,9 @@ class MemoryToFileMixin:
     def append(self, req: CopyRequest):
         records = req.from_obj.storage.get_memory_api().get(req.from_obj)
         with req.to_obj.storage.get_filesystem_api().open(req.to_obj, "a") as f:
-            self.write_object(f, records)
+            self.write_object(f, records, req.get_to_schema())
 
-    def write_object(self, f: IOBase, obj: Any):
+    def write_object(self, f: IOBase, obj: Any, schema: Schema):
         raise NotImplementedError
 
 
@@ -39,8 +77,9 @@ class RecordsToCsvFile(MemoryToFileMixin, DataCopierBase):
     cost = DiskToMemoryCost + FormatConversionCost
     requires_schema_cast = False
 
-    def write_object(self, f: IOBase, obj: Any):
-        write_csv(obj, f, append=True)
+    def write_object(self, f: IOBase, obj: Any, schema: Schema):
+        # Columns of the header (written with the schema), whatever the key order
+        write_csv(obj, f, columns=schema.field_names(), append=True)
 
 
 # @datacopier(
@@ -70,7 +109,177 @@ class RecordsToJsonLinesFile(MemoryToFileMixin, DataCopierBase):
     cost = DiskToMemoryCost
     requires_schema_cast = False
 
-    def write_object(self, f: IOBase, obj: Records):
+    def write_object(self, f: IOBase, obj: Records, schema: Schema):
         for r in obj:
             s = json.dumps(r, cls=DcpJsonEncoder)
             f.write(s + "\n")
+
+
+class MemoryToParquetFileMixin(MemoryToFileMixin):
+    def append(self, req: CopyRequest):
+        if not PYARROW_SUPPORTED:
+            raise ImportError("Pyarrow is not installed")
+        obj = req.from_obj.storage.get_memory_api().get(req.from_obj)
+        table = self.object_to_arrow_table(obj)
+        fs_api = req.to_obj.storage.get_filesystem_api()
+        # Parquet can't be appended to in place, so we rewrite with the existing row groups
+        with fs_api.open(req.to_obj, "rb") as f:
+            existing = read_parquet_table(f)
+        if existing.num_rows:
+            table = pa.concat_tables([existing, table.cast(existing.schema)])
+        with fs_api.open(req.to_obj, "wb") as f:
+            write_parquet_table(f, table)
+
+    def object_to_arrow_table(self, obj: Any) -> ArrowTable:
+        raise NotImplementedError
+
+
+class ArrowTableToParquetFile(MemoryToParquetFileMixin, DataCopierBase):
+    from_data_formats = [ArrowTableFormat]
+    to_data_formats = [ParquetFileFormat]
+    cost = DiskToMemoryCost
+    requires_schema_cast = False
+
+    def object_to_arrow_table(self, obj: ArrowTable) -> ArrowTable:
+        return obj
+
+
+class DataFrameToParquetFile(MemoryToParquetFileMixin, DataCopierBase):
+    from_data_formats = [DataFrameFormat]
+    to_data_formats = [ParquetFileFormat]
+    cost = DiskToMemoryCost + FormatConversionCost
+    requires_schema_cast = False
+
+    def object_to_arrow_table(self, obj: pd.DataFrame) -> ArrowTable:
+        return pa.Table.from_pandas(obj, preserve_index=False)
+
+
+class ArrowTableToArrowFile(MemoryToFileMixin, DataCopierBase):
+    from_data_formats = [ArrowTableFormat]
+    to_data_formats = [ArrowFileFormat]
+    cost = DiskToMemoryCost
+    requires_schema_cast = False
+
+    def append(self, req: CopyRequest):
+        if not PYARROW_SUPPORTED:
+            raise ImportError("Pyarrow is not installed")
+        table = req.from_obj.storage.get_memory_api().get(req.from_obj)
+        fs_api = req.to_obj.storage.get_filesystem_api()
+        # IPC files have a footer, so rewrite with the existing batches. Don't
+        # memory map here, we are about to truncate the file.
+        with fs_api.open(req.to_obj, "rb") as f:
+            existing = pa.ipc.open_file(f).read_all()
+        if existing.num_rows:
+            table = pa.concat_tables([existing, table.cast(existing.schema)])
+        with fs_api.open(req.to_obj, "wb") as f:
+            write_arrow_file(f, table.schema, table.to_batches())
+
+
+class IteratorToFileMixin(MemoryToFileMixin):
+    """
+    Streams the iterator to the file a chunk of records at a time, so memory is
+    bounded by `chunk_size`. Records are written with the records copier's
+    `write_object`, so values are formatted the same either way.
+    """
+
+    chunk_size = 1000
+
+    def append(self, req: CopyRequest):
+        obj = req.from_obj.storage.get_memory_api().get(req.from_obj)
+        schema = req.get_to_schema()
+        with req.to_obj.storage.get_filesystem_api().open(req.to_obj, "a") as f:
+            for records in self.iterate_record_chunks(obj):
+                if records:
+                    self.write_object(f, records, schema)
+
+    def iterate_record_chunks(self, obj: Any) -> Iterator[Records]:
+        raise NotImplementedError
+
+
+class RecordsIteratorToFileMixin(IteratorToFileMixin):
+    from_data_formats = [RecordsIteratorFormat]
+    cost = DiskToBufferCost
+
+    def iterate_record_chunks(self, obj: RecordsIterator) -> Iterator[Records]:
+        return ensure_records_iterator(obj).chunks(self.chunk_size)
+
+
+class DataFrameIteratorToFileMixin(IteratorToFileMixin):
+    from_data_formats = [DataFrameIteratorFormat]
+    cost = DiskToBufferCost + FormatConversionCost
+
+    def iterate_record_chunks(self, obj: DataFrameIterator) -> Iterator[Records]:
+        for df in obj.chunks(self.chunk_size):
+            yield dataframe_to_records(df)
+
+
+class ArrowBatchIteratorToFileMixin(IteratorToFileMixin):
+    from_data_formats = [ArrowBatchIteratorFormat]
+    cost = DiskToBufferCost + FormatConversionCost
+
+    def iterate_record_chunks(self, obj: ArrowBatchIterator) -> Iterator[Records]:
+        # Already chunked, as batches
+        try:
+            for batch in obj.iterator:
+                yield batch.to_pylist()
+        finally:
+            obj.close()
+
+
+class RecordsIteratorToCsvFile(RecordsIteratorToFileMixin, RecordsToCsvFile):
+    pass
+
+
+class RecordsIteratorToJsonLinesFile(
+    RecordsIteratorToFileMixin, RecordsToJsonLinesFile
+):
+    pass
+
+
+class DataFrameIteratorToCsvFile(DataFrameIteratorToFileMixin, RecordsToCsvFile):
+    pass
+
+
+class DataFrameIteratorToJsonLinesFile(
+    DataFrameIteratorToFileMixin, RecordsToJsonLinesFile
+):
+    pass
+
+
+class ArrowBatchIteratorToCsvFile(ArrowBatchIteratorToFileMixin, RecordsToCsvFile):
+    pass
+
+
+class ArrowBatchIteratorToJsonLinesFile(
+    ArrowBatchIteratorToFileMixin, RecordsToJsonLinesFile
+):
+    pass
+
+
+class ArrowBatchIteratorToParquetFile(MemoryToFileMixin, DataCopierBase):
+    from_data_formats = [ArrowBatchIteratorFormat]
+    to_data_formats = [ParquetFileFormat]
+    cost = DiskToBufferCost
+    requires_schema_cast = False
+
+    def append(self, req: CopyRequest):
+        if not PYARROW_SUPPORTED:
+            raise ImportError("Pyarrow is not installed")
+        itr: ArrowBatchIterator = req.from_obj.storage.get_memory_api().get(
+            req.from_obj
+        )
+        fs_api = req.to_obj.storage.get_filesystem_api()
+        # Parquet can't be appended to in place, so the existing row groups are
+        # rewritten first, then batches are streamed in as row groups
+        with fs_api.open(req.to_obj, "rb") as f:
+            existing = read_parquet_table(f)
+        try:
+            with fs_api.open(req.to_obj, "wb") as f:
+                with pq.ParquetWriter(f, existing.schema) as writer:
+                    if existing.num_rows:
+                        writer.write_table(existing)
+                    for batch in itr.iterator:
+                        table = pa.Table.from_batches([batch])
+                        writer.write_table(table.cast(existing.schema))
+        finally:
+            itr.close()
@@ -2,9 +2,18 @@ from sqlalchemy.engine import Result
 
 from dcp.data_copy.base import CopyRequest, DataCopierBase
 from dcp.data_copy.costs import (
+    FormatConversionCost,
+    NetworkToBufferCost,
     NetworkToMemoryCost,
 )
 from dcp.data_format.formats.database.base import DatabaseTableFormat
+from dcp.data_format.formats.memory.arrow_batch_iterator import (
+    DEFAULT_ARROW_BATCH_SIZE,
+    ArrowBatchIterator,
+    ArrowBatchIteratorFormat,
+    records_chunks_to_batches,
+)
+from dcp.data_format.formats.memory.arrow_table import schema_to_arrow_schema
 from dcp.data_format.formats.memory.records import Records, RecordsFormat
 from dcp.data_format.formats.memory.records_iterator import (
     RecordsIterator,
@@ -14,7 +23,7 @@ from dcp.storage.base import (
     DatabaseStorageClass,
     MemoryStorageClass,
 )
-from dcp.storage.database.utils import result_proxy_to_records
+from dcp.storage.database.utils import db_result_batcher, result_proxy_to_records
 
 
 class DatabaseToMemoryMixin:
@@ -22,7 +31,8 @@ class DatabaseToMemoryMixin:
     to_storage_classes = [MemoryStorageClass]
 
     def append(self, req: CopyRequest):
-        existing = req.to_obj.storage.get_memory_api().get(req.to_obj)
+        # Concat may extend existing in place
+        existing = req.to_obj.storage.get_memory_api().get_mutable(req.to_obj)
         select_sql = f"select * from {req.from_obj.formatted_full_name}"
         with req.from_obj.storage.get_database_api().execute_sql_result(
             select_sql
@@ -45,7 +55,8 @@ class DatabaseTableToRecords(DatabaseToMemoryMixin, DataCopierBase):
     requires_schema_cast = False
 
     def concat(self, existing: Records, new: Records) -> Records:
-        return existing + new
+        existing.extend(new)
+        return existing
 
     def result_to_object(self, res: Result):
         records = result_proxy_to_records(res)
@@ -83,6 +94,32 @@ class DatabaseTableToRecordsIterator(DatabaseToMemoryMixin, DataCopierBase):
         req.to_obj.storage.get_memory_api().put(req.to_obj, final)
 
 
+class DatabaseTableToArrowBatchIterator(DatabaseToMemoryMixin, DataCopierBase):
+    from_data_formats = [DatabaseTableFormat]
+    to_data_formats = [ArrowBatchIteratorFormat]
+    cost = NetworkToBufferCost + FormatConversionCost
+    requires_schema_cast = False
+    chunk_size = DEFAULT_ARROW_BATCH_SIZE
+
+    def append(self, req: CopyRequest):
+        existing = req.to_obj.storage.get_memory_api().get(req.to_obj)
+        select_sql = f"select * from {req.from_obj.formatted_full_name}"
+        conn = req.from_obj.storage.get_database_api().get_engine().connect()
+        res = conn.execute(select_sql)
+
+        def c():
+            res.close()
+            conn.close()
+
+        # Batches are built against the target schema, so all have the same types
+        batches = records_chunks_to_batches(
+            db_result_batcher(res, self.chunk_size),
+            schema_to_arrow_schema(req.get_to_schema()),
+        )
+        new = ArrowBatchIterator(batches, c)
+        req.to_obj.storage.get_memory_api().put(req.to_obj, existing.concat(new))
+
+
 # @datacopier(
 #     from_storage_classes=[DatabaseStorageClass],
 #     from_data_formats=[DatabaseTableFormat],
@@ -1,24 +1,70 @@
+import os
 from io import IOBase
+from typing import Iterator, Optional
+
+import pandas as pd
 
 from dcp.data_copy.base import CopyRequest, DataCopierBase
 from dcp.data_copy.costs import (
+    DiskToBufferCost,
     DiskToMemoryCost,
     FormatConversionCost,
 )
+from dcp.data_format.formats.file_system.arrow_file import (
+    ArrowFileFormat,
+    read_arrow_file_table,
+)
 from dcp.data_format.formats.file_system.csv_file import CsvFileFormat
 from dcp.data_format.formats.file_system.json_lines_file import JsonLinesFileFormat
-from dcp.data_format.formats.memory.arrow_table import ArrowTable, ArrowTableFormat
+from dcp.data_format.formats.file_system.parquet_file import (
+    ParquetFileFormat,
+    iter_parquet_batches,
+    read_parquet_table,
+)
+from dcp.data_format.formats.memory.arrow_batch_iterator import (
+    DEFAULT_ARROW_BATCH_SIZE,
+    ArrowBatchIterator,
+    ArrowBatchIteratorFormat,
+    records_chunks_to_batches,
+)
+from dcp.data_format.formats.memory.arrow_table import (
+    ArrowTable,
+    ArrowTableFormat,
+    arrow_table_to_dataframe,
+    conform_arrow_table,
+    schema_to_arrow_schema,
+)
+from dcp.data_format.formats.memory.dataframe import DataFrameFormat
 from dcp.data_format.formats.memory.records import Records, RecordsFormat
-from dcp.storage.base import FileSystemStorageClass, MemoryStorageClass
-from dcp.utils.data import read_csv
+from dcp.data_format.formats.memory.records_iterator import (
+    RecordsIterator,
+    RecordsIteratorFormat,
+)
+from dcp.storage.base import (
+    FileSystemStorageClass,
+    LocalFileSystemStorageEngine,
+    MemoryStorageClass,
+    StorageObject,
+)
+from dcp.storage.file_system.compression import infer_compression
+from dcp.utils.data import iterate_chunks, read_csv, read_json_lines
+from dcp.utils.parallel import (
+    PARALLEL_READ_MIN_BYTES,
+    concat_arrow_tables,
+    iter_arrow_csv_batches,
+    read_csv_file_parallel,
+    read_json_lines_file_parallel,
+)
 
 try:
+    import pyarrow as pa
     from pyarrow import Table
     from pyarrow import json as pa_json
 
     PYARROW_SUPPORTED = True
 except ImportError:
     PYARROW_SUPPORTED = False
+    pa = None
     Table = None
     pa_json = None
 
@@ -26,15 +72,28 @@ except ImportError:
 class FileToMemoryMixin:
     from_storage_classes = [FileSystemStorageClass]
     to_storage_classes = [MemoryStorageClass]
+    read_mode = "r"
+    supports_parallel_read = False
+    # Opt in (eg to PARALLEL_READ_MIN_BYTES) to parse local files of at least
+    # this size on a process pool. Workers are spawned, so scripts doing so
+    # need an `if __name__ == "__main__"` guard
+    parallel_read_min_bytes: Optional[int] = None
+    parallel_read_max_workers: Optional[int] = None
 
     def append(self, req: CopyRequest):
         existing = req.to_obj.storage.get_memory_api().get(
             req.to_obj.formatted_full_name
         )
-        with req.from_obj.storage.get_filesystem_api().open(
-            req.from_obj.formatted_full_name
-        ) as f:
-            new = self.read_to_object(f)
+        pth = None
+        if self.supports_parallel_read and self.parallel_read_min_bytes is not None:
+            pth = get_parallel_read_path(req.from_obj, self.parallel_read_min_bytes)
+        if pth is not None:
+            new = self.read_path_parallel(pth)
+        else:
+            with req.from_obj.storage.get_filesystem_api().open(
+                req.from_obj.formatted_full_name, self.read_mode
+            ) as f:
+                new = self.read_to_object(f)
         final = self.concat(existing, new)
         req.to_obj.storage.get_memory_api().put(req.to_obj.formatted_full_name, final)
 
@@ -44,12 +103,30 @@ class FileToMemoryMixin:
     def read_to_object(self, req: CopyRequest):
         raise NotImplementedError
 
+    def read_path_parallel(self, pth: str):
+        raise NotImplementedError
+
+
+def get_parallel_read_path(
+    so: StorageObject, min_bytes: int = PARALLEL_READ_MIN_BYTES
+) -> Optional[str]:
+    # Only large, local, uncompressed files can be split into byte ranges
+    if so.storage.storage_engine is not LocalFileSystemStorageEngine:
+        return None
+    pth = so.storage.get_filesystem_api().get_path(so)
+    if infer_compression(pth) is not None:
+        return None
+    if os.path.getsize(pth) < min_bytes:
+        return None
+    return pth
+
 
 class CsvFileToRecords(FileToMemoryMixin, DataCopierBase):
     from_data_formats = [CsvFileFormat]
     to_data_formats = [RecordsFormat]
     cost = DiskToMemoryCost + FormatConversionCost
     requires_schema_cast = True
+    supports_parallel_read = True
 
     def concat(self, existing: Records, new: Records) -> Records:
         return existing + new
@@ -58,18 +135,189 @@ class CsvFileToRecords(FileToMemoryMixin, DataCopierBase):
         records = list(read_csv(f.readlines()))
         return records
 
+    def read_path_parallel(self, pth: str) -> Records:
+        return read_csv_file_parallel(pth, max_workers=self.parallel_read_max_workers)
+
+
+class JsonLinesFileToRecords(FileToMemoryMixin, DataCopierBase):
+    from_data_formats = [JsonLinesFileFormat]
+    to_data_formats = [RecordsFormat]
+    cost = DiskToMemoryCost + FormatConversionCost
+    requires_schema_cast = True
+    # Let the json parser decode bytes directly
+    read_mode = "rb"
+    supports_parallel_read = True
+
+    def concat(self, existing: Records, new: Records) -> Records:
+        return existing + new
+
+    def read_to_object(self, f: IOBase):
+        return list(read_json_lines(f))
+
+    def read_path_parallel(self, pth: str) -> Records:
+        return read_json_lines_file_parallel(
+            pth, max_workers=self.parallel_read_max_workers
+        )
+
+
+class JsonLinesFileToRecordsIterator(FileToMemoryMixin, DataCopierBase):
+    from_data_formats = [JsonLinesFileFormat]
+    to_data_formats = [RecordsIteratorFormat]
+    cost = DiskToBufferCost + FormatConversionCost
+    requires_schema_cast = False
+
+    def append(self, req: CopyRequest):
+        existing = req.to_obj.storage.get_memory_api().get(req.to_obj)
+        # File is closed when the iterator is exhausted or closed
+        f = req.from_obj.storage.get_filesystem_api().open_name(req.from_obj, "rb")
+        new = RecordsIterator(read_json_lines(f), f.close)
+        req.to_obj.storage.get_memory_api().put(req.to_obj, existing.concat(new))
+
 
 class JsonLinesFileToArrowTable(FileToMemoryMixin, DataCopierBase):
     from_data_formats = [JsonLinesFileFormat]
     to_data_formats = [ArrowTableFormat]
     cost = DiskToMemoryCost + FormatConversionCost
     requires_schema_cast = True
+    read_mode = "rb"
+    supports_parallel_read = True
+    block_size = 16 * 1024 * 1024
 
     def concat(self, existing: ArrowTable, new: ArrowTable) -> ArrowTable:
         if not PYARROW_SUPPORTED:
             raise ImportError("Pyarrow is not installed")
+        if existing.num_rows and new.schema != existing.schema:
+            # Existing table has been cast to the schema already
+            new = conform_arrow_table(new, existing.schema)
+            return concat_arrow_tables([existing, new])
         return Table.from_batches(existing.to_batches() + new.to_batches())
 
     def read_to_object(self, f: IOBase):
-        at = pa_json.read_json(f.name)
+        # Read from the open file object (not f.name) so this works for
+        # remote and compressed files too
+        read_options = pa_json.ReadOptions(block_size=self.block_size)
+        at = pa_json.read_json(f, read_options=read_options)
         return at
+
+    def read_path_parallel(self, pth: str) -> ArrowTable:
+        return read_json_lines_file_parallel(
+            pth, output="arrow", max_workers=self.parallel_read_max_workers
+        )
+
+
+class ParquetFileToMemoryMixin(FileToMemoryMixin):
+    def append(self, req: CopyRequest):
+        if not PYARROW_SUPPORTED:
+            raise ImportError("Pyarrow is not installed")
+        existing = req.to_obj.storage.get_memory_api().get(req.to_obj)
+        with req.from_obj.storage.get_filesystem_api().open(req.from_obj, "rb") as f:
+            # Project to the requested fields only
+            table = read_parquet_table(f, req.get_to_schema().field_names())
+        new = self.arrow_table_to_object(table)
+        final = self.concat(existing, new)
+        req.to_obj.storage.get_memory_api().put(req.to_obj, final)
+
+    def arrow_table_to_object(self, table: ArrowTable):
+        raise NotImplementedError
+
+
+class ParquetFileToArrowTable(ParquetFileToMemoryMixin, DataCopierBase):
+    from_data_formats = [ParquetFileFormat]
+    to_data_formats = [ArrowTableFormat]
+    cost = DiskToMemoryCost
+    requires_schema_cast = False
+
+    def concat(self, existing: ArrowTable, new: ArrowTable) -> ArrowTable:
+        if existing.num_rows == 0:
+            return new
+        return pa.concat_tables([existing, new])
+
+    def arrow_table_to_object(self, table: ArrowTable) -> ArrowTable:
+        return table
+
+
+class ParquetFileToDataFrame(ParquetFileToMemoryMixin, DataCopierBase):
+    from_data_formats = [ParquetFileFormat]
+    to_data_formats = [DataFrameFormat]
+    cost = DiskToMemoryCost + FormatConversionCost
+    requires_schema_cast = False
+
+    def concat(self, existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        if existing.empty:
+            return new
+        return pd.concat([existing, new])
+
+    def arrow_table_to_object(self, table: ArrowTable) -> pd.DataFrame:
+        # Table was just read and isn't referenced elsewhere
+        return arrow_table_to_dataframe(table, self_destruct=True)
+
+
+class ArrowFileToArrowTable(FileToMemoryMixin, DataCopierBase):
+    from_data_formats = [ArrowFileFormat]
+    to_data_formats = [ArrowTableFormat]
+    # Memory mapped, so no copy into memory
+    cost = DiskToBufferCost
+    requires_schema_cast = False
+
+    def append(self, req: CopyRequest):
+        existing = req.to_obj.storage.get_memory_api().get(req.to_obj)
+        new = read_arrow_file_table(req.from_obj)
+        final = self.concat(existing, new)
+        req.to_obj.storage.get_memory_api().put(req.to_obj, final)
+
+    def concat(self, existing: ArrowTable, new: ArrowTable) -> ArrowTable:
+        if existing.num_rows == 0:
+            return new
+        return pa.concat_tables([existing, new])
+
+
+class FileToArrowBatchIteratorMixin(FileToMemoryMixin):
+    def append(self, req: CopyRequest):
+        if not PYARROW_SUPPORTED:
+            raise ImportError("Pyarrow is not installed")
+        existing = req.to_obj.storage.get_memory_api().get(req.to_obj)
+        # File is closed when the iterator is exhausted or closed
+        f = req.from_obj.storage.get_filesystem_api().open_name(req.from_obj, "rb")
+        new = ArrowBatchIterator(self.iter_batches(req, f), f.close)
+        req.to_obj.storage.get_memory_api().put(req.to_obj, existing.concat(new))
+
+    def iter_batches(self, req: CopyRequest, f: IOBase) -> Iterator[pa.RecordBatch]:
+        raise NotImplementedError
+
+
+class CsvFileToArrowBatchIterator(FileToArrowBatchIteratorMixin, DataCopierBase):
+    from_data_formats = [CsvFileFormat]
+    to_data_formats = [ArrowBatchIteratorFormat]
+    cost = DiskToBufferCost + FormatConversionCost
+    # Values are read as strings, and cast batch by batch
+    requires_schema_cast = True
+    block_size = 16 * 1024 * 1024
+
+    def iter_batches(self, req: CopyRequest, f: IOBase) -> Iterator[pa.RecordBatch]:
+        return iter_arrow_csv_batches(f, self.block_size)
+
+
+class JsonLinesFileToArrowBatchIterator(FileToArrowBatchIteratorMixin, DataCopierBase):
+    from_data_formats = [JsonLinesFileFormat]
+    to_data_formats = [ArrowBatchIteratorFormat]
+    cost = DiskToBufferCost + FormatConversionCost
+    requires_schema_cast = False
+    chunk_size = DEFAULT_ARROW_BATCH_SIZE
+
+    def iter_batches(self, req: CopyRequest, f: IOBase) -> Iterator[pa.RecordBatch]:
+        # No streaming json reader in arrow, so batch up parsed lines. Built
+        # against the target schema, so every batch has the same types.
+        return records_chunks_to_batches(
+            iterate_chunks(read_json_lines(f), self.chunk_size),
+            schema_to_arrow_schema(req.get_to_schema()),
+        )
+
+
+class ParquetFileToArrowBatchIterator(FileToArrowBatchIteratorMixin, DataCopierBase):
+    from_data_formats = [ParquetFileFormat]
+    to_data_formats = [ArrowBatchIteratorFormat]
+    cost = DiskToBufferCost
+    requires_schema_cast = False
+
+    def iter_batches(self, req: CopyRequest, f: IOBase) -> Iterator[pa.RecordBatch]:
+        return iter_parquet_batches(f, req.get_to_schema().field_names())
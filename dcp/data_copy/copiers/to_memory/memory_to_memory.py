@@ -1,3 +1,5 @@
+from typing import Any
+
 import pandas as pd
 from sqlalchemy.engine import ResultProxy
 
@@ -6,12 +8,31 @@ from dcp.data_copy.costs import (
     FormatConversionCost,
     MemoryToMemoryCost,
 )
-from dcp.data_format.formats.memory.arrow_table import ArrowTable, ArrowTableFormat
+from dcp.data_format.formats.memory.arrow_batch_iterator import (
+    DEFAULT_ARROW_BATCH_SIZE,
+    ArrowBatchIterator,
+    ArrowBatchIteratorFormat,
+    records_chunks_to_batches,
+)
+from dcp.data_format.formats.memory.arrow_table import (
+    ArrowTable,
+    ArrowTableFormat,
+    arrow_table_to_dataframe,
+    records_to_arrow_table,
+    schema_to_arrow_schema,
+)
+from dcp.data_format.formats.memory.columnar_records import (
+    ColumnarRecords,
+    ColumnarRecordsFormat,
+)
 from dcp.data_format.formats.memory.database_cursor import (
     DatabaseCursorFormat,
     DatabaseCursor,
 )
-from dcp.data_format.formats.memory.dataframe import DataFrameFormat
+from dcp.data_format.formats.memory.dataframe import (
+    DataFrameFormat,
+    cast_dataframe_to_schema,
+)
 from dcp.data_format.formats.memory.dataframe_iterator import (
     DataFrameIterator,
     DataFrameIteratorFormat,
@@ -20,8 +41,10 @@ from dcp.data_format.formats.memory.records import Records, RecordsFormat
 from dcp.data_format.formats.memory.records_iterator import (
     RecordsIterator,
     RecordsIteratorFormat,
+    ensure_records_iterator,
 )
 from dcp.storage.base import MemoryStorageClass
+from dcp.storage.database.utils import db_result_batcher
 from dcp.storage.memory.engines.python import PythonStorageApi
 from dcp.utils.pandas import dataframe_to_records
 
@@ -48,49 +71,63 @@ class MemoryDataCopierMixin:
         raise NotImplementedError
 
 
-class RecordsToDataframe(MemoryDataCopierMixin, DataCopierBase):
+class MemoryChunkAppendMixin(MemoryDataCopierMixin):
+    """
+    Appends the converted object as a new chunk (see PythonStorageApi.append)
+    rather than concatenating with (and so copying) what's already there.
+    """
+
+    def append(self, req: CopyRequest):
+        new = req.from_obj.storage.get_memory_api().get(req.from_obj)
+        req.to_obj.storage.get_memory_api().append(req.to_obj, self.to_chunk(req, new))
+
+    def to_chunk(self, req: CopyRequest, new: Any) -> Any:
+        raise NotImplementedError
+
+
+class RecordsToDataframe(MemoryChunkAppendMixin, DataCopierBase):
     from_data_formats = [RecordsFormat]
     to_data_formats = [DataFrameFormat]
     cost = MemoryToMemoryCost + FormatConversionCost
-    requires_schema_cast = True
+    # Each chunk is cast as it's appended, so we never cast the whole frame
+    requires_schema_cast = False
 
-    def concat(self, existing: pd.DataFrame, new: Records) -> pd.DataFrame:
-        df = pd.DataFrame(new)
-        return pd.concat([existing, df])
+    def to_chunk(self, req: CopyRequest, new: Records) -> pd.DataFrame:
+        return cast_dataframe_to_schema(pd.DataFrame(new), req.get_to_schema())
 
 
-class DataframeToRecords(MemoryDataCopierMixin, DataCopierBase):
+class DataframeToRecords(MemoryChunkAppendMixin, DataCopierBase):
     from_data_formats = [DataFrameFormat]
     to_data_formats = [RecordsFormat]
     cost = MemoryToMemoryCost + FormatConversionCost
     requires_schema_cast = False  # TODO: maybe?
 
-    def concat(self, existing: Records, new: pd.DataFrame) -> Records:
-        records = dataframe_to_records(new)
-        return existing + records
+    def to_chunk(self, req: CopyRequest, new: pd.DataFrame) -> Records:
+        return dataframe_to_records(new)
 
 
 # Self copies
 
 
-class DataframeToDataframe(MemoryDataCopierMixin, DataCopierBase):
+class DataframeToDataframe(MemoryChunkAppendMixin, DataCopierBase):
     from_data_formats = [DataFrameFormat]
     to_data_formats = [DataFrameFormat]
     cost = MemoryToMemoryCost
     requires_schema_cast = False
 
-    def concat(self, existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
-        return pd.concat([existing, new])
+    def to_chunk(self, req: CopyRequest, new: pd.DataFrame) -> pd.DataFrame:
+        # Don't share the frame itself with the source
+        return new.copy(deep=False)
 
 
-class RecordsToRecords(MemoryDataCopierMixin, DataCopierBase):
+class RecordsToRecords(MemoryChunkAppendMixin, DataCopierBase):
     from_data_formats = [RecordsFormat]
     to_data_formats = [RecordsFormat]
     cost = MemoryToMemoryCost
     requires_schema_cast = False
 
-    def concat(self, existing: Records, new: Records) -> Records:
-        return existing + new
+    def to_chunk(self, req: CopyRequest, new: Records) -> Records:
+        return new
 
 
 ### Iterators
@@ -105,7 +142,17 @@ class RecordsIteratorToDataframeIterator(MemoryDataCopierMixin, DataCopierBase):
     def concat(
         self, existing: DataFrameIterator, new: RecordsIterator
     ) -> DataFrameIterator:
-        return DataFrameIterator(existing.iterator.concat(new))
+        return DataFrameIterator(existing.iterator.concat(ensure_records_iterator(new)))
+
+
+class RecordsIteratorToRecords(MemoryChunkAppendMixin, DataCopierBase):
+    from_data_formats = [RecordsIteratorFormat]
+    to_data_formats = [RecordsFormat]
+    cost = MemoryToMemoryCost
+    requires_schema_cast = False
+
+    def to_chunk(self, req: CopyRequest, new: RecordsIterator) -> Records:
+        return list(ensure_records_iterator(new))
 
 
 ### Database
@@ -126,6 +173,24 @@ class DatabaseCursorToRecordsIterator(MemoryDataCopierMixin, DataCopierBase):
         return existing.concat(RecordsIterator(f(), new.close))
 
 
+class DatabaseCursorToArrowBatchIterator(MemoryDataCopierMixin, DataCopierBase):
+    from_data_formats = [DatabaseCursorFormat]
+    to_data_formats = [ArrowBatchIteratorFormat]
+    cost = MemoryToMemoryCost + FormatConversionCost
+    requires_schema_cast = False
+    chunk_size = DEFAULT_ARROW_BATCH_SIZE
+
+    def append(self, req: CopyRequest):
+        new = req.from_obj.storage.get_memory_api().get(req.from_obj)
+        existing = req.to_obj.storage.get_memory_api().get(req.to_obj)
+        batches = records_chunks_to_batches(
+            db_result_batcher(new, self.chunk_size),
+            schema_to_arrow_schema(req.get_to_schema()),
+        )
+        final = existing.concat(ArrowBatchIterator(batches, new.close))
+        req.to_obj.storage.get_memory_api().put(req.to_obj, final)
+
+
 # @datacopier(
 #     from_storage_classes=[MemoryStorageClass],
 #     from_data_formats=[DataFrameIteratorFormat],
@@ -298,28 +363,155 @@ class DatabaseCursorToRecordsIterator(MemoryDataCopierMixin, DataCopierBase):
 #########
 
 
-class ArrowTableToDataFrame(MemoryDataCopierMixin, DataCopierBase):
+class ArrowTableToDataFrame(MemoryChunkAppendMixin, DataCopierBase):
     from_data_formats = [ArrowTableFormat]
     to_data_formats = [DataFrameFormat]
     cost = MemoryToMemoryCost
     requires_schema_cast = False  # TODO: maybe?
+    # ArrowDtype-backed columns share the arrow buffers (pandas >= 1.5)
+    use_arrow_dtypes = False
+
+    def to_chunk(self, req: CopyRequest, new: ArrowTable) -> pd.DataFrame:
+        if not PYARROW_SUPPORTED:
+            raise ImportError("Pyarrow is not installed")
+        # Source table is still in storage, so can't self destruct it
+        return arrow_table_to_dataframe(new, use_arrow_dtypes=self.use_arrow_dtypes)
+
+
+class RecordsToArrowTable(MemoryDataCopierMixin, DataCopierBase):
+    from_data_formats = [RecordsFormat]
+    to_data_formats = [ArrowTableFormat]
+    # Direct, so cheaper than going through a DataFrame (and no dtype mangling)
+    cost = MemoryToMemoryCost + FormatConversionCost
+    requires_schema_cast = False
 
-    def concat(self, existing: pd.DataFrame, new: ArrowTable) -> pd.DataFrame:
+    def concat(self, existing: ArrowTable, new: Records) -> ArrowTable:
         if not PYARROW_SUPPORTED:
             raise ImportError("Pyarrow is not installed")
-        new_df = new.to_pandas()
-        return pd.concat([existing, new_df])
+        # Existing was created empty with the target schema
+        arrow_schema = existing.schema if existing.num_columns else None
+        new_at = records_to_arrow_table(new, arrow_schema)
+        if existing.num_rows == 0:
+            return new_at
+        return pa.concat_tables([existing, new_at])
 
 
-class DataFrameToArrowTable(MemoryDataCopierMixin, DataCopierBase):
+class ArrowTableToRecords(MemoryChunkAppendMixin, DataCopierBase):
+    from_data_formats = [ArrowTableFormat]
+    to_data_formats = [RecordsFormat]
+    cost = MemoryToMemoryCost + FormatConversionCost
+    requires_schema_cast = False
+
+    def to_chunk(self, req: CopyRequest, new: ArrowTable) -> Records:
+        if not PYARROW_SUPPORTED:
+            raise ImportError("Pyarrow is not installed")
+        return new.to_pylist()
+
+
+class DataFrameToArrowTable(MemoryChunkAppendMixin, DataCopierBase):
     from_data_formats = [DataFrameFormat]
     to_data_formats = [ArrowTableFormat]
     cost = MemoryToMemoryCost
     requires_schema_cast = False  # TODO: maybe?
 
-    def concat(self, existing: ArrowTable, new: pd.DataFrame) -> ArrowTable:
+    def to_chunk(self, req: CopyRequest, new: pd.DataFrame) -> ArrowTable:
+        if not PYARROW_SUPPORTED:
+            raise ImportError("Pyarrow is not installed")
+        return pa.Table.from_pandas(new, preserve_index=False)
+
+
+class ArrowTableToArrowTable(MemoryChunkAppendMixin, DataCopierBase):
+    # Eg between python and shared memory storages
+    from_data_formats = [ArrowTableFormat]
+    to_data_formats = [ArrowTableFormat]
+    cost = MemoryToMemoryCost
+    requires_schema_cast = False
+
+    def to_chunk(self, req: CopyRequest, new: ArrowTable) -> ArrowTable:
+        # Immutable, so safe to share
+        return new
+
+
+############
+### Columnar
+############
+
+
+class RecordsToColumnarRecords(MemoryDataCopierMixin, DataCopierBase):
+    from_data_formats = [RecordsFormat]
+    to_data_formats = [ColumnarRecordsFormat]
+    cost = MemoryToMemoryCost + FormatConversionCost
+    # Casts a column (or, for text, a distinct value) at a time
+    requires_schema_cast = True
+
+    def concat(self, existing: ColumnarRecords, new: Records) -> ColumnarRecords:
+        field_names = existing.field_names if len(existing) else None
+        return existing.concat(ColumnarRecords.from_records(new, field_names))
+
+
+class ColumnarRecordsToRecords(MemoryChunkAppendMixin, DataCopierBase):
+    from_data_formats = [ColumnarRecordsFormat]
+    to_data_formats = [RecordsFormat]
+    cost = MemoryToMemoryCost + FormatConversionCost
+    requires_schema_cast = False
+
+    def to_chunk(self, req: CopyRequest, new: ColumnarRecords) -> Records:
+        return new.to_records()
+
+
+class DataFrameToColumnarRecords(MemoryDataCopierMixin, DataCopierBase):
+    from_data_formats = [DataFrameFormat]
+    to_data_formats = [ColumnarRecordsFormat]
+    # Numeric columns are taken as is
+    cost = MemoryToMemoryCost
+    requires_schema_cast = False
+
+    def concat(self, existing: ColumnarRecords, new: pd.DataFrame) -> ColumnarRecords:
+        return existing.concat(ColumnarRecords.from_dataframe(new))
+
+
+class ColumnarRecordsToDataFrame(MemoryChunkAppendMixin, DataCopierBase):
+    from_data_formats = [ColumnarRecordsFormat]
+    to_data_formats = [DataFrameFormat]
+    cost = MemoryToMemoryCost
+    requires_schema_cast = False
+
+    def to_chunk(self, req: CopyRequest, new: ColumnarRecords) -> pd.DataFrame:
+        return new.to_dataframe()
+
+
+class ArrowTableToColumnarRecords(MemoryDataCopierMixin, DataCopierBase):
+    from_data_formats = [ArrowTableFormat]
+    to_data_formats = [ColumnarRecordsFormat]
+    cost = MemoryToMemoryCost
+    requires_schema_cast = False
+
+    def concat(self, existing: ColumnarRecords, new: ArrowTable) -> ColumnarRecords:
+        if not PYARROW_SUPPORTED:
+            raise ImportError("Pyarrow is not installed")
+        return existing.concat(ColumnarRecords.from_arrow(new))
+
+
+class ColumnarRecordsToArrowTable(MemoryChunkAppendMixin, DataCopierBase):
+    from_data_formats = [ColumnarRecordsFormat]
+    to_data_formats = [ArrowTableFormat]
+    cost = MemoryToMemoryCost
+    requires_schema_cast = False
+
+    def to_chunk(self, req: CopyRequest, new: ColumnarRecords) -> ArrowTable:
+        if not PYARROW_SUPPORTED:
+            raise ImportError("Pyarrow is not installed")
+        return new.to_arrow()
+
+
+class ArrowBatchIteratorToArrowTable(MemoryChunkAppendMixin, DataCopierBase):
+    from_data_formats = [ArrowBatchIteratorFormat]
+    to_data_formats = [ArrowTableFormat]
+    # Batches become the table's chunks as is
+    cost = MemoryToMemoryCost
+    requires_schema_cast = False
+
+    def to_chunk(self, req: CopyRequest, new: ArrowBatchIterator) -> ArrowTable:
         if not PYARROW_SUPPORTED:
             raise ImportError("Pyarrow is not installed")
-        new_at = pa.Table.from_pandas(new)
-        existing = pa.Table.from_batches(existing.to_batches() + new_at.to_batches())
-        return existing
+        return new.to_table(schema_to_arrow_schema(req.get_to_schema()))
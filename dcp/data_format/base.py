@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import (
     TYPE_CHECKING,
+    Dict,
     Generic,
     List,
     Optional,
@@ -64,11 +65,55 @@ DataFormat = Type[DataFormatBase]
 # IterableDataFormat = Type[IterableDataFormatBase]
 
 
+class DataFormatIndex:
+    """
+    Format lookups indexed from ALL_DATA_FORMATS, rebuilt whenever a format is
+    registered.
+    """
+
+    def __init__(self):
+        self.registered_count = 0
+        self.by_nickname: Dict[str, DataFormat] = {}
+        self.supported_by_engine: Dict[Type[StorageEngine], List[DataFormat]] = {}
+
+    def refresh(self):
+        # Formats are only ever appended
+        if self.registered_count != len(ALL_DATA_FORMATS):
+            self.registered_count = len(ALL_DATA_FORMATS)
+            self.by_nickname = {}
+            for fmt in ALL_DATA_FORMATS:
+                self.by_nickname.setdefault(fmt.nickname, fmt)
+            self.supported_by_engine = {}
+
+    def get_format_for_nickname(self, name: str) -> Optional[DataFormat]:
+        self.refresh()
+        return self.by_nickname.get(name)
+
+    def get_supported_formats(
+        self, storage_engine: Type[StorageEngine]
+    ) -> List[DataFormat]:
+        self.refresh()
+        if storage_engine not in self.supported_by_engine:
+            fmts = []
+            for fmt in ALL_DATA_FORMATS:
+                if fmt.natural_storage_class == storage_engine.storage_class:
+                    if (
+                        not fmt.natural_storage_engine
+                        or fmt.natural_storage_engine == storage_engine
+                    ):
+                        fmts.append(fmt)
+            self.supported_by_engine[storage_engine] = fmts
+        return self.supported_by_engine[storage_engine]
+
+
+DATA_FORMAT_INDEX = DataFormatIndex()
+
+
 def get_format_for_nickname(name: str) -> DataFormat:
-    for fmt in ALL_DATA_FORMATS:
-        if fmt.nickname == name:
-            return fmt
-    raise NameError(f"DataFormat '{name}' not found.")
+    fmt = DATA_FORMAT_INDEX.get_format_for_nickname(name)
+    if fmt is None:
+        raise NameError(f"DataFormat '{name}' not found.")
+    return fmt
 
 
 class UnknownFormat(DataFormatBase):
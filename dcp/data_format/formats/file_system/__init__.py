@@ -1,3 +1,4 @@
 from .arrow_file import *
 from .csv_file import *
 from .json_lines_file import *
+from .parquet_file import *
@@ -1,13 +1,149 @@
 from __future__ import annotations
 
-from typing import TypeVar
+from contextlib import contextmanager
+from typing import IO, Dict, Iterator, List, Optional, TypeVar
+
+from commonmodel import Field, FieldType, Schema
 
 import dcp.storage.base as storage
-from dcp.data_format.base import DataFormatBase
+from dcp.data_format.base import DataFormat, DataFormatBase
+from dcp.data_format.formats.memory.arrow_table import (
+    arrow_type_to_field_type,
+    cast_arrow_table,
+    schema_requires_cast,
+    schema_to_arrow_schema,
+)
+from dcp.data_format.handler import FormatHandler
+from dcp.data_format.inference import generate_auto_schema
+
+try:
+    import pyarrow as pa
+
+    PYARROW_SUPPORTED = True
+except ImportError:
+    PYARROW_SUPPORTED = False
+    pa = None
 
 ArrowFile = TypeVar("ArrowFile")
 
+ARROW_FILE_MAGIC_BYTES = b"ARROW1"
+ARROW_FILE_EXTENSIONS = (".arrow", ".feather", ".ipc")
+
 
 class ArrowFileFormat(DataFormatBase[ArrowFile]):
     natural_storage_class = storage.FileSystemStorageClass
     nickname = "arrowfile"
+
+
+class ArrowFileHandler(FormatHandler):
+    for_data_formats = [ArrowFileFormat]
+    for_storage_classes = [storage.FileSystemStorageClass]
+    inference_cost = 1  # Reads the magic bytes
+    # What to do with values that can't be cast: "raise" or "null" them
+    cast_errors: str = "raise"
+
+    def infer_data_format_from_name(
+        self, so: storage.StorageObject
+    ) -> Optional[DataFormat]:
+        if so.formatted_full_name.endswith(ARROW_FILE_EXTENSIONS):
+            return ArrowFileFormat
+        return None
+
+    def infer_data_format(self, so: storage.StorageObject) -> Optional[DataFormat]:
+        if self.infer_data_format_from_name(so):
+            return ArrowFileFormat
+        with so.storage.get_filesystem_api().open(so, "rb") as f:
+            if f.read(len(ARROW_FILE_MAGIC_BYTES)) == ARROW_FILE_MAGIC_BYTES:
+                return ArrowFileFormat
+        return None
+
+    def infer_field_names(self, so: storage.StorageObject) -> List[str]:
+        return read_arrow_file_schema(so).names
+
+    def infer_field_type(self, so: storage.StorageObject, field: str) -> FieldType:
+        return arrow_type_to_field_type(
+            str(read_arrow_file_schema(so).field(field).type)
+        )
+
+    def infer_schema(self, so: storage.StorageObject) -> Schema:
+        # Schema lives in the footer, no need to touch the data
+        fields = [
+            Field(name=f.name, field_type=arrow_type_to_field_type(str(f.type)))
+            for f in read_arrow_file_schema(so)
+        ]
+        return generate_auto_schema(fields=fields)
+
+    def cast_to_field_type(
+        self, so: storage.StorageObject, field: str, field_type: FieldType
+    ):
+        self.cast_fields(so, {field: field_type})
+
+    def cast_to_schema(self, so: storage.StorageObject, schema: Schema):
+        # All fields at once, so the file is rewritten at most once
+        self.cast_fields(so, {f.name: f.field_type for f in schema.fields})
+
+    def cast_fields(
+        self, so: storage.StorageObject, field_types: Dict[str, FieldType]
+    ):
+        # Files are typed, so casting rewrites the file (if any type changes)
+        if not schema_requires_cast(read_arrow_file_schema(so), field_types):
+            return
+        fs_api = so.storage.get_filesystem_api()
+        # Read into memory (not memory mapped), since the file is overwritten
+        with fs_api.open(so, "rb") as f:
+            table = pa.ipc.open_file(f).read_all()
+        table = cast_arrow_table(table, field_types, self.cast_errors)
+        with fs_api.open(so, "wb") as f:
+            write_arrow_file(f, table.schema, table.to_batches())
+
+    def create_empty(self, so: storage.StorageObject, schema: Schema):
+        with so.storage.get_filesystem_api().open(so, "wb") as f:
+            write_arrow_file(f, schema_to_arrow_schema(schema), [])
+
+    def get_record_count(self, so: storage.StorageObject) -> Optional[int]:
+        if not is_memory_mapped(so):
+            # Would have to read (and download) every batch, just to count rows
+            return None
+        # Memory mapped batches are zero-copy, so this only touches the pages
+        # with each batch's metadata
+        with open_arrow_file(so) as reader:
+            return sum(
+                reader.get_batch(i).num_rows for i in range(reader.num_record_batches)
+            )
+
+
+def is_memory_mapped(so: storage.StorageObject) -> bool:
+    return so.storage.storage_engine is storage.LocalFileSystemStorageEngine
+
+
+@contextmanager
+def open_arrow_file(so: storage.StorageObject) -> Iterator[pa.RecordBatchFileReader]:
+    if not PYARROW_SUPPORTED:
+        raise ImportError("Pyarrow is not installed")
+    fs_api = so.storage.get_filesystem_api()
+    if is_memory_mapped(so):
+        # Memory map local files so reads are zero-copy
+        with pa.memory_map(fs_api.get_path(so), "r") as source:
+            yield pa.ipc.open_file(source)
+    else:
+        with fs_api.open(so, "rb") as f:
+            yield pa.ipc.open_file(f)
+
+
+def read_arrow_file_schema(so: storage.StorageObject) -> pa.Schema:
+    with open_arrow_file(so) as reader:
+        return reader.schema
+
+
+def read_arrow_file_table(so: storage.StorageObject) -> pa.Table:
+    # Note: for memory-mapped files the table references the mapped pages
+    with open_arrow_file(so) as reader:
+        return reader.read_all()
+
+
+def write_arrow_file(
+    f: IO[bytes], schema: pa.Schema, batches: List[pa.RecordBatch]
+):
+    with pa.ipc.new_file(f, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
-import csv
-from typing import List, Optional, TypeVar
+import clevercsv as csv
+from typing import List, Optional, Tuple, TypeVar
 
 from commonmodel import (
-    DEFAULT_FIELD_TYPE,
     FieldType,
     Schema,
 )
 
 import dcp.storage.base as storage
 from dcp.data_format.base import DataFormat, DataFormatBase
+from dcp.data_format.formats.file_system.sampling import SampledSchemaInferenceMixin
+from dcp.data_format.formats.memory.records import Records
 from dcp.data_format.handler import FormatHandler
-from dcp.utils.data import infer_csv_dialect, is_maybe_csv, write_csv
+from dcp.storage.file_system.compression import strip_compression_extension
+from dcp.utils.data import (
+    ensure_strings,
+    infer_csv_dialect,
+    is_maybe_csv,
+    process_raw_value,
+    write_csv,
+)
 
 CsvFile = TypeVar("CsvFile")
 
@@ -24,17 +32,29 @@ class CsvFileFormat(DataFormatBase[CsvFile]):
     nickname = "csv"
 
 
-class CsvFileHandler(FormatHandler):
+class CsvFileHandler(SampledSchemaInferenceMixin, FormatHandler):
     for_data_formats = [CsvFileFormat]
     for_storage_classes = [storage.FileSystemStorageClass]
+    inference_cost = 2  # Sniffs a sample of the text
     delimiter = ","
 
+    def infer_data_format_from_name(
+        self, so: storage.StorageObject
+    ) -> Optional[DataFormat]:
+        if strip_compression_extension(so.formatted_full_name).endswith(".csv"):
+            return CsvFileFormat
+        return None
+
     def infer_data_format(self, so: storage.StorageObject) -> Optional[DataFormat]:
-        if so.formatted_full_name.endswith(".csv"):
+        if self.infer_data_format_from_name(so):
             return CsvFileFormat
         # TODO: how hacky is this? very
         with so.storage.get_filesystem_api().open(so) as f:
-            s = f.read(SAMPLE_SIZE_CHARACTERS)
+            try:
+                s = f.read(SAMPLE_SIZE_CHARACTERS)
+            except UnicodeDecodeError:
+                # Binary file
+                return None
             if is_maybe_csv(s):
                 return CsvFileFormat
         return None
@@ -47,10 +67,32 @@ class CsvFileHandler(FormatHandler):
             headers = next(csv.reader([ln], dialect=dialect))
             return headers
 
-    def infer_field_type(self, so: storage.StorageObject, field: str) -> FieldType:
-        # TODO: to do this, essentially need to copy into mem
-        # TODO: fix once we have sample?
-        return DEFAULT_FIELD_TYPE
+    def parse_sample_lines(
+        self, head: List[bytes], tail: List[bytes]
+    ) -> Tuple[List[str], Records]:
+        head = list(ensure_strings(head))
+        if not head:
+            return [], []
+        dialect = infer_csv_dialect("".join(head)[:SAMPLE_SIZE_CHARACTERS])
+        headers = next(csv.reader(head[:1], dialect=dialect))
+        # Last head row may be cut off mid (quoted) value, and random lines may
+        # start mid value, so skip anything that doesn't line up with the header
+        rows = []
+        try:
+            rows.extend(csv.reader(head[1:], dialect=dialect))
+        except csv.Error:
+            pass
+        for ln in ensure_strings(tail):
+            try:
+                rows.extend(csv.reader([ln], dialect=dialect))
+            except csv.Error:
+                pass
+        records = [
+            {h: process_raw_value(v) for h, v in zip(headers, row)}
+            for row in rows
+            if len(row) == len(headers)
+        ]
+        return headers, records
 
     def cast_to_field_type(
         self, so: storage.StorageObject, field: str, field_type: FieldType
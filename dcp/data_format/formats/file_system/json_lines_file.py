@@ -1,17 +1,20 @@
 from __future__ import annotations
 
 import json
-from typing import List, Optional, TypeVar
+from typing import List, Optional, Tuple, TypeVar
 
 from commonmodel import (
-    DEFAULT_FIELD_TYPE,
     FieldType,
     Schema,
 )
 
 import dcp.storage.base as storage
 from dcp.data_format.base import DataFormat, DataFormatBase
+from dcp.data_format.formats.file_system.sampling import SampledSchemaInferenceMixin
+from dcp.data_format.formats.memory.records import Records
 from dcp.data_format.handler import FormatHandler
+from dcp.storage.file_system.compression import strip_compression_extension
+from dcp.utils.data import read_json
 
 JsonLinesFile = TypeVar("JsonLinesFile")
 
@@ -21,32 +24,52 @@ class JsonLinesFileFormat(DataFormatBase[JsonLinesFile]):
     nickname = "jsonl"
 
 
-class JsonLinesFileHandler(FormatHandler):
+class JsonLinesFileHandler(SampledSchemaInferenceMixin, FormatHandler):
     for_data_formats = [JsonLinesFileFormat]
     for_storage_classes = [storage.FileSystemStorageClass]
+    inference_cost = 2  # Parses the first line
+
+    def infer_data_format_from_name(
+        self, so: storage.StorageObject
+    ) -> Optional[DataFormat]:
+        if strip_compression_extension(so.formatted_full_name).endswith(".jsonl"):
+            return JsonLinesFileFormat
+        return None
 
     def infer_data_format(self, so: storage.StorageObject) -> Optional[DataFormat]:
-        if so.formatted_full_name.endswith(".jsonl"):
+        if self.infer_data_format_from_name(so):
             return JsonLinesFileFormat
         # TODO: how hacky is this? very
         with so.storage.get_filesystem_api().open(so) as f:
-            ln = f.readline()
             try:
+                ln = f.readline()
                 json.loads(ln)
                 return JsonLinesFileFormat
-            except json.JSONDecodeError:
+            except (json.JSONDecodeError, UnicodeDecodeError):
                 pass
         return None
 
     def infer_field_names(self, so: storage.StorageObject) -> List[str]:
-        with so.storage.get_filesystem_api().open(so) as f:
-            ln = f.readline()
-            return [k for k in json.loads(ln).keys()]
+        return self.infer_schema(so).field_names()
 
-    def infer_field_type(self, so: storage.StorageObject, field: str) -> FieldType:
-        # TODO: to do this, essentially need to copy into mem
-        # TODO: fix once we have sample?
-        return DEFAULT_FIELD_TYPE
+    def parse_sample_lines(
+        self, head: List[bytes], tail: List[bytes]
+    ) -> Tuple[List[str], Records]:
+        records = []
+        for ln in head + tail:
+            try:
+                r = read_json(ln)
+            except ValueError:
+                # Cut off line (or not json)
+                continue
+            if isinstance(r, dict):
+                records.append(r)
+        names = []
+        for r in records:
+            for k in r.keys():
+                if k not in names:
+                    names.append(k)  # Keep order
+        return names, records
 
     def cast_to_field_type(
         self, so: storage.StorageObject, field: str, field_type: FieldType
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from typing import IO, Dict, Iterator, List, Optional, TypeVar
+
+from commonmodel import Field, FieldType, Schema
+
+import dcp.storage.base as storage
+from dcp.data_format.base import DataFormat, DataFormatBase
+from dcp.data_format.formats.memory.arrow_table import (
+    arrow_type_to_field_type,
+    cast_arrow_table,
+    schema_requires_cast,
+    schema_to_arrow_schema,
+)
+from dcp.data_format.handler import FormatHandler
+from dcp.data_format.inference import generate_auto_schema
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_SUPPORTED = True
+except ImportError:
+    PYARROW_SUPPORTED = False
+    pa = None
+    pq = None
+
+ParquetFile = TypeVar("ParquetFile")
+
+PARQUET_MAGIC_BYTES = b"PAR1"
+# Rows per batch when streaming row groups
+DEFAULT_PARQUET_BATCH_SIZE = 64 * 1024
+
+
+class ParquetFileFormat(DataFormatBase[ParquetFile]):
+    natural_storage_class = storage.FileSystemStorageClass
+    nickname = "parquet"
+
+
+class ParquetFileHandler(FormatHandler):
+    for_data_formats = [ParquetFileFormat]
+    for_storage_classes = [storage.FileSystemStorageClass]
+    inference_cost = 1  # Reads the magic bytes
+    # What to do with values that can't be cast: "raise" or "null" them
+    cast_errors: str = "raise"
+
+    def infer_data_format_from_name(
+        self, so: storage.StorageObject
+    ) -> Optional[DataFormat]:
+        if so.formatted_full_name.endswith(".parquet"):
+            return ParquetFileFormat
+        return None
+
+    def infer_data_format(self, so: storage.StorageObject) -> Optional[DataFormat]:
+        if self.infer_data_format_from_name(so):
+            return ParquetFileFormat
+        with so.storage.get_filesystem_api().open(so, "rb") as f:
+            if f.read(len(PARQUET_MAGIC_BYTES)) == PARQUET_MAGIC_BYTES:
+                return ParquetFileFormat
+        return None
+
+    def infer_field_names(self, so: storage.StorageObject) -> List[str]:
+        return read_parquet_schema(so).names
+
+    def infer_field_type(self, so: storage.StorageObject, field: str) -> FieldType:
+        return arrow_type_to_field_type(str(read_parquet_schema(so).field(field).type))
+
+    def infer_schema(self, so: storage.StorageObject) -> Schema:
+        # Only reads the footer, so do it once rather than once per field
+        fields = [
+            Field(name=f.name, field_type=arrow_type_to_field_type(str(f.type)))
+            for f in read_parquet_schema(so)
+        ]
+        return generate_auto_schema(fields=fields)
+
+    def cast_to_field_type(
+        self, so: storage.StorageObject, field: str, field_type: FieldType
+    ):
+        self.cast_fields(so, {field: field_type})
+
+    def cast_to_schema(self, so: storage.StorageObject, schema: Schema):
+        # All fields at once, so the file is rewritten at most once
+        self.cast_fields(so, {f.name: f.field_type for f in schema.fields})
+
+    def cast_fields(
+        self, so: storage.StorageObject, field_types: Dict[str, FieldType]
+    ):
+        # Files are typed, so casting rewrites the file (if any type changes)
+        if not schema_requires_cast(read_parquet_schema(so), field_types):
+            return
+        fs_api = so.storage.get_filesystem_api()
+        with fs_api.open(so, "rb") as f:
+            table = read_parquet_table(f)
+        table = cast_arrow_table(table, field_types, self.cast_errors)
+        with fs_api.open(so, "wb") as f:
+            write_parquet_table(f, table)
+
+    def create_empty(self, so: storage.StorageObject, schema: Schema):
+        table = pa.Table.from_batches([], schema=schema_to_arrow_schema(schema))
+        with so.storage.get_filesystem_api().open(so, "wb") as f:
+            pq.write_table(table, f)
+
+    def get_record_count(self, so: storage.StorageObject) -> Optional[int]:
+        with so.storage.get_filesystem_api().open(so, "rb") as f:
+            return pq.ParquetFile(f).metadata.num_rows
+
+
+def read_parquet_schema(so: storage.StorageObject) -> pa.Schema:
+    if not PYARROW_SUPPORTED:
+        raise ImportError("Pyarrow is not installed")
+    with so.storage.get_filesystem_api().open(so, "rb") as f:
+        return pq.read_schema(f)
+
+
+def get_parquet_projection(
+    pf: pq.ParquetFile, field_names: Optional[List[str]] = None
+) -> Optional[List[str]]:
+    # Only read the columns we need, None means all columns
+    if not field_names:
+        return None
+    names = pf.schema_arrow.names
+    columns = [n for n in field_names if n in names]
+    if columns == names:
+        return None
+    return columns
+
+
+def read_parquet_table(
+    f: IO[bytes], field_names: Optional[List[str]] = None
+) -> pa.Table:
+    pf = pq.ParquetFile(f)
+    return pf.read(columns=get_parquet_projection(pf, field_names))
+
+
+def iter_parquet_batches(
+    f: IO[bytes],
+    field_names: Optional[List[str]] = None,
+    batch_size: int = DEFAULT_PARQUET_BATCH_SIZE,
+) -> Iterator[pa.RecordBatch]:
+    # Reads one row group at a time, so memory is bounded by row group size
+    pf = pq.ParquetFile(f)
+    yield from pf.iter_batches(
+        batch_size=batch_size, columns=get_parquet_projection(pf, field_names)
+    )
+
+
+def write_parquet_table(f: IO[bytes], table: pa.Table):
+    pq.write_table(table, f)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import random
+from collections import OrderedDict
+from typing import IO, Any, Dict, Hashable, List, Optional, Tuple
+
+from commonmodel import Field, FieldType, Schema
+
+import dcp.storage.base as storage
+from dcp.data_format.formats.memory.records import Records, select_field_types
+from dcp.data_format.inference import generate_auto_schema
+from dcp.storage.file_system.compression import infer_compression
+
+# Schemas inferred from file samples, keyed on (handler, url, path, size, mtime)
+FILE_SCHEMA_CACHE_SIZE = 256
+_file_schema_cache: OrderedDict[Hashable, Schema] = OrderedDict()
+
+
+def get_file_schema_cache_key(
+    handler: Any, so: storage.StorageObject
+) -> Optional[Hashable]:
+    fs_api = so.storage.get_filesystem_api()
+    signature = fs_api.get_file_signature(so)
+    if signature is None:
+        return None
+    return (type(handler), so.storage.url, fs_api.get_path(so)) + tuple(signature)
+
+
+def clear_file_schema_cache():
+    _file_schema_cache.clear()
+
+
+def read_lines_at_random_offsets(
+    f: IO[bytes], start: int, end: int, n: int, seed: int = 0
+) -> List[bytes]:
+    """
+    Samples ~n complete lines from byte range [start, end) of a seekable file by
+    seeking to random offsets and skipping to the next line boundary.
+    """
+    if end <= start:
+        return []
+    rng = random.Random(seed)
+    lines = []
+    for offset in sorted(rng.randrange(start, end) for _ in range(n)):
+        f.seek(offset)
+        f.readline()  # Partial line
+        ln = f.readline()
+        if ln.strip():
+            lines.append(ln)
+    return lines
+
+
+class SampledSchemaInferenceMixin:
+    """
+    Infers file schemas from the first `sample_size` lines plus
+    `random_sample_size` lines from random offsets in the rest of the file (local,
+    uncompressed files only), detecting field types a column at a time.
+    """
+
+    sample_size: int
+    random_sample_size: int = 100
+
+    def parse_sample_lines(
+        self, head: List[bytes], tail: List[bytes]
+    ) -> Tuple[List[str], Records]:
+        raise NotImplementedError
+
+    def read_sample_lines(
+        self, so: storage.StorageObject, n_head: int
+    ) -> Tuple[List[bytes], List[bytes]]:
+        fs_api = so.storage.get_filesystem_api()
+        head = []
+        with fs_api.open(so, "rb") as f:
+            for ln in f:
+                head.append(ln)
+                if len(head) >= n_head:
+                    break
+            if (
+                so.storage.storage_engine is not storage.LocalFileSystemStorageEngine
+                or infer_compression(fs_api.get_path(so))
+            ):
+                # Random seeks are expensive (or impossible) for these
+                return head, []
+            start = f.tell()
+            end = f.seek(0, 2)
+            # Seeded by size so the same file always gives the same sample
+            tail = read_lines_at_random_offsets(
+                f, start, end, self.random_sample_size, seed=end
+            )
+        return head, tail
+
+    def infer_sample_schema(self, so: storage.StorageObject) -> Schema:
+        head, tail = self.read_sample_lines(so, self.sample_size + 1)
+        names, records = self.parse_sample_lines(head, tail)
+        columns: Dict[str, List[Any]] = {n: [] for n in names}
+        for r in records:
+            for n in names:
+                columns[n].append(r.get(n))
+        field_types = select_field_types(columns)
+        fields = [Field(name=n, field_type=field_types[n]) for n in names]
+        return generate_auto_schema(fields=fields)
+
+    def infer_schema(self, so: storage.StorageObject) -> Schema:
+        key = get_file_schema_cache_key(self, so)
+        if key is None:
+            return self.infer_sample_schema(so)
+        if key in _file_schema_cache:
+            _file_schema_cache.move_to_end(key)
+            return _file_schema_cache[key]
+        schema = self.infer_sample_schema(so)
+        _file_schema_cache[key] = schema
+        if len(_file_schema_cache) > FILE_SCHEMA_CACHE_SIZE:
+            _file_schema_cache.popitem(last=False)
+        return schema
+
+    def infer_field_type(self, so: storage.StorageObject, field: str) -> FieldType:
+        return self.infer_schema(so).get_field(field).field_type
@@ -1,3 +1,4 @@
+from .columnar_records import *
 from .csv_lines_iterator import *
 from .dataframe import *
 from .json_lines_file_object import *
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from commonmodel import FieldType, Schema
+
+import dcp.storage.base as storage
+from dcp.data_format.base import DataFormat, DataFormatBase
+from dcp.data_format.formats.memory.arrow_table import (
+    arrow_type_to_field_type,
+    cast_arrow_table,
+    records_to_arrow_table,
+)
+from dcp.data_format.formats.memory.records import Records
+from dcp.data_format.formats.memory.records_iterator import IteratorBase
+from dcp.data_format.handler import FormatHandler
+from dcp.utils.parallel import concat_arrow_tables
+
+try:
+    import pyarrow as pa
+
+    RecordBatch = pa.RecordBatch
+except ImportError:
+    pa = None
+    RecordBatch = TypeVar("RecordBatch")
+
+# Rows per batch when building batches from rows (cursors, json lines)
+DEFAULT_ARROW_BATCH_SIZE = 10_000
+
+
+class ArrowBatchIterator(IteratorBase[RecordBatch]):
+    """
+    Stream of arrow RecordBatches, so columnar data can be copied with memory
+    bounded by the batch size.
+    """
+
+    def to_table(self, arrow_schema: Optional[pa.Schema] = None) -> pa.Table:
+        # Batches may have been typed independently, so promote as we go
+        tables = [pa.Table.from_batches([b]) for b in self]
+        if not tables:
+            return pa.Table.from_batches([], schema=arrow_schema)
+        return concat_arrow_tables(tables)
+
+
+class ArrowBatchIteratorFormat(DataFormatBase[ArrowBatchIterator]):
+    natural_storage_class = storage.MemoryStorageClass
+    natural_storage_engine = storage.LocalPythonStorageEngine
+    nickname = "arrow_batch_iterator"
+
+
+def records_chunks_to_batches(
+    chunks: Iterable[Records], arrow_schema: Optional[pa.Schema] = None
+) -> Iterator[RecordBatch]:
+    for records in chunks:
+        if records:
+            yield from records_to_arrow_table(records, arrow_schema).to_batches()
+
+
+def cast_batches(
+    batches: Iterable[RecordBatch], field_types: Dict[str, FieldType]
+) -> Iterator[RecordBatch]:
+    for batch in batches:
+        table = cast_arrow_table(pa.Table.from_batches([batch]), field_types)
+        yield from table.to_batches()
+
+
+class ArrowBatchIteratorHandler(FormatHandler):
+    """Field names and types come from the first batch, left unconsumed"""
+
+    for_data_formats = [ArrowBatchIteratorFormat]
+    for_storage_engines = [storage.LocalPythonStorageEngine]
+
+    def get_first_batch(self, so: storage.StorageObject) -> Optional[RecordBatch]:
+        itr: ArrowBatchIterator = so.storage.get_memory_api().get(so)
+        head = itr.head(1)
+        return head[0] if head else None
+
+    def infer_data_format(self, so: storage.StorageObject) -> Optional[DataFormat]:
+        if isinstance(so.storage.get_memory_api().get(so), ArrowBatchIterator):
+            return ArrowBatchIteratorFormat
+        return None
+
+    def infer_field_names(self, so: storage.StorageObject) -> List[str]:
+        batch = self.get_first_batch(so)
+        if batch is None:
+            return []
+        return [f.name for f in batch.schema]
+
+    def infer_field_type(self, so: storage.StorageObject, field: str) -> FieldType:
+        batch = self.get_first_batch(so)
+        return arrow_type_to_field_type(str(batch.schema.field(field).type))
+
+    def cast_to_field_type(
+        self, so: storage.StorageObject, field: str, field_type: FieldType
+    ):
+        self.cast_batches(so, {field: field_type})
+
+    def cast_to_schema(self, so: storage.StorageObject, schema: Schema):
+        self.cast_batches(so, {f.name: f.field_type for f in schema.fields})
+
+    def cast_batches(
+        self, so: storage.StorageObject, field_types: Dict[str, FieldType]
+    ):
+        # Lazily, as each batch goes by
+        itr: ArrowBatchIterator = so.storage.get_memory_api().get(so)
+        cast_itr = ArrowBatchIterator(
+            cast_batches(itr.iterator, field_types), itr.closeable
+        )
+        so.storage.get_memory_api().put(so, cast_itr)
+
+    def create_empty(self, so: storage.StorageObject, schema: Schema):
+        so.storage.get_memory_api().put(so, ArrowBatchIterator(iter([])))
+
+    def get_record_count(self, so: storage.StorageObject) -> Optional[int]:
+        return None
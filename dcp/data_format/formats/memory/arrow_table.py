@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from typing import List, Optional, TypeVar
+from typing import Any, Dict, List, Optional, TypeVar
 
+import pandas as pd
 from commonmodel import (
     DEFAULT_FIELD_TYPE,
     Boolean,
@@ -25,16 +26,33 @@ from commonmodel.field_types import (
 
 import dcp.storage.base as storage
 from dcp.data_format.base import DataFormat, DataFormatBase
+from dcp.data_format.formats.memory.records import (
+    FLOAT_RE,
+    INTEGER_RE,
+    Records,
+    cast_python_object_to_field_type,
+    get_helper,
+)
 from dcp.data_format.handler import FormatHandler
+from dcp.utils.common import (
+    DATETIME_FORMAT_SAMPLE_SIZE,
+    ISO_FORMAT,
+    NULLISH_STRINGS,
+    infer_datetime_format,
+)
 
 try:
     import pyarrow as pa
+    import pyarrow.compute as pc
 
     ArrowTable = pa.Table
 except ImportError:
     pa = None
+    pc = None
     ArrowTable = TypeVar("ArrowTable")
 
+CAST_ERROR_POLICIES = ("raise", "null")
+
 
 class ArrowTableFormat(DataFormatBase[ArrowTable]):
     natural_storage_class = storage.MemoryStorageClass
@@ -43,7 +61,12 @@ class ArrowTableFormat(DataFormatBase[ArrowTable]):
 
 class ArrowTableHandler(FormatHandler):
     for_data_formats = [ArrowTableFormat]
-    for_storage_engines = [storage.LocalPythonStorageEngine]
+    for_storage_engines = [
+        storage.LocalPythonStorageEngine,
+        storage.SharedMemoryStorageEngine,
+    ]
+    # What to do with values that can't be cast: "raise" or "null" them
+    cast_errors: str = "raise"
 
     def infer_data_format(self, so: storage.StorageObject) -> Optional[DataFormat]:
         if pa is None:
@@ -65,13 +88,196 @@ class ArrowTableHandler(FormatHandler):
     def cast_to_field_type(
         self, so: storage.StorageObject, field: str, field_type: FieldType
     ):
-        # TODO
-        pass
+        table: ArrowTable = so.storage.get_memory_api().get(so)
+        table = cast_arrow_table(table, {field: field_type}, self.cast_errors)
+        so.storage.get_memory_api().put(so, table)
+
+    def cast_to_schema(self, so: storage.StorageObject, schema: Schema):
+        # All fields at once, so only one new table is put
+        table: ArrowTable = so.storage.get_memory_api().get(so)
+        field_types = {f.name: f.field_type for f in schema.fields}
+        table = cast_arrow_table(table, field_types, self.cast_errors)
+        so.storage.get_memory_api().put(so, table)
 
     def create_empty(self, so: storage.StorageObject, schema: Schema):
         table = pa.Table.from_batches([], schema=schema_to_arrow_schema(schema))
         so.storage.get_memory_api().put(so, table)
 
+    def get_record_count(self, so: storage.StorageObject) -> Optional[int]:
+        return so.storage.get_memory_api().get(so).num_rows
+
+
+def _null_where(arr: pa.ChunkedArray, mask: pa.ChunkedArray) -> pa.ChunkedArray:
+    return pc.if_else(mask, pa.scalar(None, arr.type), arr)
+
+
+def _string_to_number(
+    arr: pa.ChunkedArray, arrow_type: pa.DataType, errors: str
+) -> pa.ChunkedArray:
+    arr = _null_where(arr, pc.is_in(arr, value_set=pa.array(list(NULLISH_STRINGS))))
+    arr = pc.utf8_trim_whitespace(pc.replace_substring(arr, ",", ""))
+    if errors == "null":
+        pattern = INTEGER_RE if pa.types.is_integer(arrow_type) else FLOAT_RE
+        matches = pc.match_substring_regex(arr, f"^(?:{pattern})$")
+        arr = _null_where(arr, pc.invert(matches))
+    return pc.cast(arr, arrow_type)
+
+
+def _string_to_timestamp(
+    arr: pa.ChunkedArray, field_type: FieldType, errors: str
+) -> pa.ChunkedArray:
+    sample = arr.slice(0, DATETIME_FORMAT_SAMPLE_SIZE).to_pylist()
+    fmt = infer_datetime_format(sample)
+    if fmt is None:
+        raise NotImplementedError("No datetime format")
+    arr = _null_where(arr, pc.is_in(arr, value_set=pa.array(list(NULLISH_STRINGS))))
+    if fmt == ISO_FORMAT:
+        dts = pc.cast(arr, pa.timestamp("us"))
+    else:
+        dts = pc.strptime(arr, format=fmt, unit="us", error_is_null=errors == "null")
+    if field_type.name == "Date":
+        return pc.cast(dts, pa.date32())
+    return dts
+
+
+def cast_values_to_arrow_array(
+    values: List[Any],
+    field_type: FieldType,
+    errors: str = "raise",
+    arrow_type: Optional[pa.DataType] = None,
+) -> pa.Array:
+    caster = get_helper(field_type).get_caster(values[:DATETIME_FORMAT_SAMPLE_SIZE])
+    cast_values = []
+    for v in values:
+        try:
+            cast_values.append(
+                cast_python_object_to_field_type(v, field_type, caster=caster)
+            )
+        except NotImplementedError:
+            if errors == "raise":
+                raise
+            cast_values.append(None)
+    if arrow_type is None:
+        arrow_type = field_type_to_arrow_type(field_type)
+    return pa.array(cast_values, type=arrow_type)
+
+
+def _cast_arrow_array_python(
+    arr: pa.ChunkedArray, field_type: FieldType, errors: str
+) -> pa.ChunkedArray:
+    return pa.chunked_array(
+        [cast_values_to_arrow_array(arr.to_pylist(), field_type, errors)]
+    )
+
+
+def requires_cast(arrow_type: pa.DataType, field_type: FieldType) -> bool:
+    if arrow_type_to_field_type(str(arrow_type)).name == field_type.name:
+        # Already the right (logical) type
+        return False
+    if field_type.name == "Json" and (
+        pa.types.is_nested(arrow_type) or pa.types.is_string(arrow_type)
+    ):
+        # Structs and lists are already json, strings we assume are
+        return False
+    return True
+
+
+def schema_requires_cast(
+    arrow_schema: pa.Schema, field_types: Dict[str, FieldType]
+) -> bool:
+    # From the schema alone, so typed files needn't be read if nothing changes
+    for field, field_type in field_types.items():
+        i = arrow_schema.get_field_index(field)
+        if i >= 0 and requires_cast(arrow_schema.field(i).type, field_type):
+            return True
+    return False
+
+
+def cast_arrow_array(
+    arr: pa.ChunkedArray, field_type: FieldType, errors: str = "raise"
+) -> pa.ChunkedArray:
+    """
+    Casts with arrow compute kernels where possible (including parsing strings
+    to numbers and timestamps), falling back to casting python values.
+    errors="null" nulls out values that can't be cast instead of raising.
+    """
+    if errors not in CAST_ERROR_POLICIES:
+        raise ValueError(f"errors must be one of {CAST_ERROR_POLICIES}")
+    if not requires_cast(arr.type, field_type):
+        return arr
+    arrow_type = field_type_to_arrow_type(field_type)
+    try:
+        if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type):
+            if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type):
+                return _string_to_number(arr, arrow_type, errors)
+            if field_type.name in ("Date", "DateTime"):
+                return _string_to_timestamp(arr, field_type, errors)
+        return pc.cast(arr, arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, NotImplementedError):
+        pass
+    return _cast_arrow_array_python(arr, field_type, errors)
+
+
+def cast_arrow_table(
+    table: ArrowTable, field_types: Dict[str, FieldType], errors: str = "raise"
+) -> ArrowTable:
+    for field, field_type in field_types.items():
+        i = table.schema.get_field_index(field)
+        if i < 0:
+            continue
+        col = table.column(i)
+        cast_col = cast_arrow_array(col, field_type, errors)
+        if cast_col is not col:
+            table = table.set_column(i, pa.field(field, cast_col.type), cast_col)
+    return table
+
+
+def conform_arrow_table(
+    table: ArrowTable, arrow_schema: pa.Schema, errors: str = "raise"
+) -> ArrowTable:
+    # Cast to the (logical) field types of another table, eg before concatenating
+    field_types = {f.name: arrow_type_to_field_type(str(f.type)) for f in arrow_schema}
+    return cast_arrow_table(table, field_types, errors)
+
+
+def records_to_arrow_table(
+    records: Records, arrow_schema: Optional[pa.Schema] = None
+) -> ArrowTable:
+    """
+    Builds the table in one go if the records already match the arrow schema,
+    otherwise a column at a time, casting only the columns that need it.
+    """
+    try:
+        return pa.Table.from_pylist(records, schema=arrow_schema)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        if arrow_schema is None:
+            raise
+    arrays = []
+    for f in arrow_schema:
+        values = [r.get(f.name) for r in records]
+        try:
+            arrays.append(pa.array(values, type=f.type))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+            field_type = arrow_type_to_field_type(str(f.type))
+            arrays.append(
+                cast_values_to_arrow_array(values, field_type, arrow_type=f.type)
+            )
+    return pa.Table.from_arrays(arrays, schema=arrow_schema)
+
+
+def arrow_table_to_dataframe(
+    table: ArrowTable, self_destruct: bool = False, use_arrow_dtypes: bool = False
+) -> pd.DataFrame:
+    """
+    Converts without consolidating columns into 2d blocks (so no second copy).
+    Only pass `self_destruct` if nothing else references the table, it frees
+    each column as it is converted and leaves the table unusable.
+    `use_arrow_dtypes` keeps the arrow memory as is, with ArrowDtype columns.
+    """
+    if use_arrow_dtypes and hasattr(pd, "ArrowDtype"):
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    return table.to_pandas(split_blocks=True, self_destruct=self_destruct)
+
 
 def schema_to_arrow_schema(schema: Schema) -> pa.Schema:
     fields = [(f.name, field_type_to_arrow_type(f.field_type)) for f in schema.fields]
@@ -0,0 +1,413 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, TypeVar
+
+import numpy as np
+import pandas as pd
+from commonmodel import Boolean, FieldType, Float, Integer, Schema
+
+import dcp.storage.base as storage
+from dcp.data_format.base import DataFormat, DataFormatBase
+from dcp.data_format.formats.memory.records import (
+    Records,
+    cast_python_object_to_field_type,
+    get_helper,
+    select_field_type,
+)
+from dcp.data_format.handler import FormatHandler
+from dcp.utils.pandas import series_to_pylist
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+ArrowTable = TypeVar("ArrowTable")
+
+# Text columns with at most this ratio of distinct values are dictionary encoded
+DICTIONARY_ENCODE_MAX_RATIO = 0.5
+NUMPY_KINDS = {"int": np.int64, "float": np.float64, "bool": np.bool_}
+
+
+def _object_array(values: List[Any]) -> np.ndarray:
+    arr = np.empty(len(values), dtype=object)
+    try:
+        arr[:] = values
+    except ValueError:
+        # Equal length sequences get broadcast, so set one at a time
+        for i, v in enumerate(values):
+            arr[i] = v
+    return arr
+
+
+def infer_column_kind(values: List[Any]) -> str:
+    types = {type(v) for v in values if v is not None}
+    if not types:
+        return "object"
+    if types == {bool} or types <= {bool, np.bool_}:
+        return "bool"
+    if any(issubclass(t, (bool, np.bool_)) for t in types):
+        return "object"
+    if all(issubclass(t, (int, np.integer)) for t in types):
+        return "int"
+    if all(issubclass(t, (int, float, np.integer, np.floating)) for t in types):
+        return "float"
+    if types == {str}:
+        return "dict"
+    return "object"
+
+
+FIELD_TYPE_COLUMN_KINDS = {
+    "Integer": "int",
+    "Float": "float",
+    "Boolean": "bool",
+    "Text": "dict",
+    "LongText": "dict",
+}
+
+
+def field_type_to_column_kind(field_type: FieldType) -> str:
+    return FIELD_TYPE_COLUMN_KINDS.get(field_type.name, "object")
+
+
+class RecordsColumn:
+    """
+    A column of ColumnarRecords. `kind` is one of:
+        "int", "float", "bool": `values` is a typed numpy array
+        "dict": `values` are int32 codes into `categories` (-1 for null)
+        "object": `values` is an object array of python values
+    `mask` is True where the value is null, or None if there are no nulls.
+    """
+
+    __slots__ = ("kind", "values", "mask", "categories")
+
+    def __init__(
+        self,
+        kind: str,
+        values: np.ndarray,
+        mask: Optional[np.ndarray] = None,
+        categories: Optional[List[str]] = None,
+    ):
+        self.kind = kind
+        self.values = values
+        self.mask = mask if mask is not None and mask.any() else None
+        self.categories = categories
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        n = self.values.nbytes
+        if self.mask is not None:
+            n += self.mask.nbytes
+        return n
+
+    @classmethod
+    def empty(cls, kind: str = "object") -> RecordsColumn:
+        if kind == "dict":
+            return cls(kind, np.empty(0, dtype=np.int32), categories=[])
+        return cls(kind, np.empty(0, dtype=NUMPY_KINDS.get(kind, object)))
+
+    @classmethod
+    def nulls(cls, n: int) -> RecordsColumn:
+        return cls("object", np.full(n, None, dtype=object))
+
+    @classmethod
+    def from_values(
+        cls, values: List[Any], kind: Optional[str] = None
+    ) -> RecordsColumn:
+        kind = kind or infer_column_kind(values)
+        n = len(values)
+        if kind == "dict":
+            index: Dict[str, int] = {}
+            codes = np.fromiter(
+                (-1 if v is None else index.setdefault(v, len(index)) for v in values),
+                dtype=np.int32,
+                count=n,
+            )
+            if len(index) <= max(1, n * DICTIONARY_ENCODE_MAX_RATIO):
+                return cls(kind, codes, categories=list(index))
+            kind = "object"
+        if kind == "object":
+            return cls(kind, _object_array(values))
+        mask = np.fromiter((v is None for v in values), dtype=np.bool_, count=n)
+        if mask.any():
+            fill = np.nan if kind == "float" else 0
+            values = [fill if v is None else v for v in values]
+        try:
+            arr = np.array(values, dtype=NUMPY_KINDS[kind])
+        except OverflowError:
+            # Ints that don't fit in int64
+            return cls("object", _object_array(values))
+        return cls(kind, arr, mask)
+
+    @classmethod
+    def from_series(cls, s: pd.Series) -> RecordsColumn:
+        dtype_kind = s.dtype.kind
+        mask = s.isna().to_numpy() if s.hasnans else None
+        if pd.api.types.is_integer_dtype(s.dtype) and dtype_kind in "iu":
+            if mask is None:
+                return cls("int", s.to_numpy(dtype=np.int64))
+            return cls("int", s.to_numpy(dtype=np.int64, na_value=0), mask)
+        if pd.api.types.is_float_dtype(s.dtype):
+            return cls("float", s.to_numpy(dtype=np.float64, na_value=np.nan), mask)
+        if pd.api.types.is_bool_dtype(s.dtype):
+            return cls("bool", s.to_numpy(dtype=np.bool_, na_value=False), mask)
+        return cls.from_values(series_to_pylist(s))
+
+    @classmethod
+    def from_arrow(cls, col: Any) -> RecordsColumn:
+        mask = None
+        if col.null_count:
+            mask = col.is_null().to_numpy(zero_copy_only=False)
+        t = col.type
+        if pa.types.is_integer(t) and not pa.types.is_uint64(t):
+            values = col.fill_null(0) if mask is not None else col
+            values = values.to_numpy().astype(np.int64, copy=False)
+            return cls("int", values, mask)
+        if pa.types.is_floating(t):
+            values = col.fill_null(np.nan) if mask is not None else col
+            values = values.to_numpy().astype(np.float64, copy=False)
+            return cls("float", values, mask)
+        if pa.types.is_boolean(t):
+            values = col.fill_null(False) if mask is not None else col
+            return cls("bool", values.to_numpy(), mask)
+        if pa.types.is_string(t) or pa.types.is_large_string(t):
+            encoded = col.combine_chunks().dictionary_encode()
+            if len(encoded.dictionary) <= max(
+                1, len(col) * DICTIONARY_ENCODE_MAX_RATIO
+            ):
+                codes = encoded.indices.fill_null(-1).to_numpy().astype(np.int32)
+                return cls("dict", codes, categories=encoded.dictionary.to_pylist())
+        return cls.from_values(col.to_pylist(), kind="object")
+
+    def to_pylist(self) -> List[Any]:
+        if self.kind == "dict":
+            # Null code -1 picks the trailing None
+            lookup = self.categories + [None]
+            return [lookup[c] for c in self.values.tolist()]
+        values = self.values.tolist()
+        if self.mask is not None:
+            for i in np.flatnonzero(self.mask).tolist():
+                values[i] = None
+        return values
+
+    def to_series(self) -> pd.Series:
+        if self.kind == "dict":
+            lookup = _object_array(self.categories + [None])
+            return pd.Series(lookup[self.values], dtype=object)
+        if self.mask is None or self.kind == "object":
+            return pd.Series(self.values)
+        if self.kind == "int":
+            return pd.Series(pd.arrays.IntegerArray(self.values, self.mask))
+        if self.kind == "bool":
+            return pd.Series(pd.arrays.BooleanArray(self.values, self.mask))
+        values = self.values.copy()
+        values[self.mask] = np.nan
+        return pd.Series(values)
+
+    def to_arrow(self) -> Any:
+        if self.kind == "dict":
+            indices = pa.array(self.values, mask=self.values < 0)
+            dictionary = pa.array(self.categories, type=pa.string())
+            encoded = pa.DictionaryArray.from_arrays(indices, dictionary)
+            return encoded.dictionary_decode()
+        if self.kind == "object":
+            return pa.array(self.values.tolist())
+        return pa.array(self.values, mask=self.mask)
+
+    def get_field_type(self, sample_size: int = 100) -> FieldType:
+        if self.kind == "int":
+            return Integer()
+        if self.kind == "float":
+            return Float()
+        if self.kind == "bool":
+            return Boolean()
+        if self.kind == "dict":
+            # Categories are the distinct values, so sample those
+            return select_field_type(self.categories[:sample_size])
+        sample = [v for v in self.values[: sample_size * 2].tolist() if v is not None]
+        return select_field_type(sample[:sample_size])
+
+    def cast(self, field_type: FieldType) -> RecordsColumn:
+        kind = field_type_to_column_kind(field_type)
+        if kind == self.kind and kind != "object":
+            return self
+        if self.kind == "int" and kind == "float":
+            return RecordsColumn("float", self.values.astype(np.float64), self.mask)
+        if self.kind == "dict":
+            # Only need to cast each distinct value once
+            cast_categories = cast_values(self.categories, field_type)
+            lookup = cast_categories + [None]
+            values = [lookup[c] for c in self.values.tolist()]
+        else:
+            values = cast_values(self.to_pylist(), field_type)
+        if kind == "object" or infer_column_kind(values) not in (kind, "object"):
+            # Let the values decide
+            kind = None
+        return RecordsColumn.from_values(values, kind=kind)
+
+
+def cast_values(values: List[Any], field_type: FieldType) -> List[Any]:
+    caster = get_helper(field_type).get_caster(values[:100])
+    return [
+        cast_python_object_to_field_type(v, field_type, caster=caster) for v in values
+    ]
+
+
+def concat_columns(columns: List[RecordsColumn]) -> RecordsColumn:
+    columns = [c for c in columns if len(c)] or columns[:1]
+    if len(columns) == 1:
+        return columns[0]
+    kinds = {c.kind for c in columns}
+    if len(kinds) > 1:
+        if kinds == {"int", "float"}:
+            columns = [
+                RecordsColumn("float", c.values.astype(np.float64), c.mask)
+                for c in columns
+            ]
+        else:
+            values = [v for c in columns for v in c.to_pylist()]
+            return RecordsColumn.from_values(values)
+    kind = columns[0].kind
+    values = [c.values for c in columns]
+    if kind == "dict":
+        # Re-map each chunk's codes onto the merged categories
+        index: Dict[str, int] = {}
+        for i, c in enumerate(columns):
+            mapping = [index.setdefault(v, len(index)) for v in c.categories] + [-1]
+            values[i] = np.array(mapping, dtype=np.int32)[c.values]
+        return RecordsColumn(kind, np.concatenate(values), categories=list(index))
+    mask = None
+    if any(c.mask is not None for c in columns):
+        mask = np.concatenate(
+            [
+                c.mask if c.mask is not None else np.zeros(len(c), dtype=np.bool_)
+                for c in columns
+            ]
+        )
+    return RecordsColumn(kind, np.concatenate(values), mask)
+
+
+class ColumnarRecords:
+    """
+    Records stored a column at a time, a compact alternative to a list of dicts
+    (which costs a dict and hash table per row).
+    """
+
+    def __init__(self, columns: Optional[Dict[str, RecordsColumn]] = None):
+        self.columns: Dict[str, RecordsColumn] = columns or {}
+
+    def __len__(self) -> int:
+        for c in self.columns.values():
+            return len(c)
+        return 0
+
+    def __repr__(self) -> str:
+        return f"ColumnarRecords({self.field_names}, {len(self)} records)"
+
+    @property
+    def field_names(self) -> List[str]:
+        return list(self.columns)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(c.nbytes for c in self.columns.values())
+
+    @classmethod
+    def from_records(
+        cls, records: Records, field_names: Optional[List[str]] = None
+    ) -> ColumnarRecords:
+        if field_names is None:
+            names: Dict[str, None] = {}
+            for r in records:
+                names.update(dict.fromkeys(r))
+            field_names = list(names)
+        return cls(
+            {
+                n: RecordsColumn.from_values([r.get(n) for r in records])
+                for n in field_names
+            }
+        )
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> ColumnarRecords:
+        return cls({str(c): RecordsColumn.from_series(df[c]) for c in df.columns})
+
+    @classmethod
+    def from_arrow(cls, table: ArrowTable) -> ColumnarRecords:
+        return cls(
+            {
+                n: RecordsColumn.from_arrow(table.column(i))
+                for i, n in enumerate(table.column_names)
+            }
+        )
+
+    def to_records(self) -> Records:
+        names = self.field_names
+        columns = [c.to_pylist() for c in self.columns.values()]
+        return [dict(zip(names, row)) for row in zip(*columns)]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame({n: c.to_series() for n, c in self.columns.items()})
+
+    def to_arrow(self) -> ArrowTable:
+        return pa.table({n: c.to_arrow() for n, c in self.columns.items()})
+
+    def concat(self, other: ColumnarRecords) -> ColumnarRecords:
+        if not len(other):
+            return self
+        columns = {}
+        for n in dict.fromkeys(self.field_names + other.field_names):
+            parts = []
+            for obj in (self, other):
+                c = obj.columns.get(n)
+                parts.append(RecordsColumn.nulls(len(obj)) if c is None else c)
+            # Empty columns (eg from create_empty) are dropped here
+            columns[n] = concat_columns(parts)
+        return ColumnarRecords(columns)
+
+
+class ColumnarRecordsFormat(DataFormatBase[ColumnarRecords]):
+    natural_storage_class = storage.MemoryStorageClass
+    natural_storage_engine = storage.LocalPythonStorageEngine
+    nickname = "columnar"
+
+
+class ColumnarRecordsHandler(FormatHandler):
+    for_data_formats = [ColumnarRecordsFormat]
+    for_storage_engines = [storage.LocalPythonStorageEngine]
+
+    def infer_data_format(self, so: storage.StorageObject) -> Optional[DataFormat]:
+        obj = so.storage.get_memory_api().get(so)
+        if isinstance(obj, ColumnarRecords):
+            return ColumnarRecordsFormat
+        return None
+
+    def infer_field_names(self, so: storage.StorageObject) -> List[str]:
+        return so.storage.get_memory_api().get(so).field_names
+
+    def infer_field_type(self, so: storage.StorageObject, field: str) -> FieldType:
+        obj: ColumnarRecords = so.storage.get_memory_api().get(so)
+        return obj.columns[field].get_field_type(self.sample_size)
+
+    def cast_to_field_type(
+        self, so: storage.StorageObject, field: str, field_type: FieldType
+    ):
+        obj: ColumnarRecords = so.storage.get_memory_api().get_mutable(so)
+        if field in obj.columns:
+            obj.columns[field] = obj.columns[field].cast(field_type)
+        so.storage.get_memory_api().put(so, obj)
+
+    def create_empty(self, so: storage.StorageObject, schema: Schema):
+        obj = ColumnarRecords(
+            {
+                f.name: RecordsColumn.empty(field_type_to_column_kind(f.field_type))
+                for f in schema.fields
+            }
+        )
+        so.storage.get_memory_api().put(so, obj)
+
+    def get_record_count(self, so: storage.StorageObject) -> Optional[int]:
+        return len(so.storage.get_memory_api().get(so))
@@ -54,7 +54,10 @@ class PythonCsvLinesIteratorHandler(FormatHandler):
 
     def infer_data_format(self, obj: storage.StorageObject) -> Optional[DataFormat]:
         py_obj = obj.storage.get_memory_api().get(obj)
-        if isinstance(py_obj, SampleableIterator):
+        # Could be an iterator of anything, eg records
+        if isinstance(py_obj, SampleableIterator) and isinstance(
+            py_obj.get_first(), str
+        ):
             s = self.get_sample_string(obj)
             if is_maybe_csv(s):
                 return CsvLinesIteratorFormat
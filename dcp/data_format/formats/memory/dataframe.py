@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Type, cast
+from typing import Any, Callable, Dict, List, Optional, Type, cast
 
 import dcp.storage.base as storage
 import pandas as pd
@@ -30,9 +30,17 @@ from dateutil import parser
 from dcp.data_format.base import DataFormat, DataFormatBase
 from dcp.data_format.formats.memory.records import (
     cast_python_object_to_field_type,
+    get_helper,
     select_field_type,
 )
 from dcp.data_format.handler import FormatHandler
+from dcp.utils.common import (
+    DATETIME_FORMAT_SAMPLE_SIZE,
+    ISO_FORMAT,
+    NULLISH_STRINGS,
+    infer_datetime_format,
+)
+from dcp.utils.data import read_json
 from loguru import logger
 from pandas import DataFrame
 
@@ -66,12 +74,16 @@ class PythonDataframeHandler(FormatHandler):
     def cast_to_field_type(
         self, so: storage.StorageObject, field: str, field_type: FieldType
     ):
-        df = so.storage.get_memory_api().get(so)
+        df = so.storage.get_memory_api().get_mutable(so)
         cast(DataFrame, df)
         if field in df.columns:
             df[field] = cast_series_to_field_type(df[field], field_type)
         so.storage.get_memory_api().put(so, df)  # Unnecessary?
 
+    def cast_to_schema(self, so: storage.StorageObject, schema: Schema):
+        df = so.storage.get_memory_api().get_mutable(so)
+        so.storage.get_memory_api().put(so, cast_dataframe_to_schema(df, schema))
+
     def create_empty(self, so: storage.StorageObject, schema: Schema):
         df = DataFrame()
         for field in schema.fields:
@@ -148,16 +160,107 @@ def field_type_to_pandas_dtype(ft: FieldType) -> str:
     return lookup.get(ft.name, "object")
 
 
+def series_to_datetime(s: pd.Series) -> pd.Series:
+    fmt = None
+    if s.dtype == object:
+        fmt = infer_datetime_format(s.dropna().iloc[:DATETIME_FORMAT_SAMPLE_SIZE])
+    if fmt is None or fmt == ISO_FORMAT:
+        # Pandas already has a fast path for iso strings
+        return pd.to_datetime(s)
+    dts = pd.to_datetime(s, format=fmt, errors="coerce")
+    # Fall back to dateutil for anything that doesn't fit the format
+    failed = dts.isna() & s.notna()
+    if failed.any():
+        dts[failed] = pd.to_datetime(s[failed])
+    return dts
+
+
+def _strip_commas(s: pd.Series) -> pd.Series:
+    # Only touches strings, anything else passes through
+    stripped = s.str.replace(",", "", regex=False)
+    return stripped.where(stripped.notna(), s)
+
+
+def series_to_numeric(s: pd.Series, pd_type: str) -> pd.Series:
+    if s.dtype == object:
+        s = _strip_commas(s.mask(s.isin(NULLISH_STRINGS)))
+    return pd.to_numeric(s, errors="raise").astype(pd_type)
+
+
+BOOLEAN_STRINGS = {"t": True, "true": True, "f": False, "false": False}
+BOOLEAN_VALUES = {True: True, False: False, 1: True, 0: False}
+
+
+def series_to_boolean(s: pd.Series) -> pd.Series:
+    # Same values as `ensure_bool`
+    if s.dtype == object:
+        bools = s.str.lower().map(BOOLEAN_STRINGS)
+        bools = bools.where(bools.notna(), s.map(BOOLEAN_VALUES))
+    else:
+        bools = s.map(BOOLEAN_VALUES)
+    if (bools.isna() & s.notna()).any():
+        raise ValueError("Non-boolean values")
+    return bools.astype("boolean")
+
+
+def _to_json_value(v: Any) -> Any:
+    if isinstance(v, str):
+        return read_json(v)
+    if isinstance(v, (dict, list)):
+        return v
+    raise TypeError(v)
+
+
+def series_to_json(s: pd.Series) -> pd.Series:
+    # Only object columns can hold json strings (or dicts / lists)
+    if s.dtype != object:
+        raise TypeError(s.dtype)
+    return s.map(_to_json_value, na_action="ignore")
+
+
+VECTORIZED_CASTS: Dict[str, Callable[[pd.Series], pd.Series]] = {
+    "Integer": lambda s: series_to_numeric(s, "Int64"),
+    "Float": lambda s: series_to_numeric(s, "float64"),
+    "Decimal": lambda s: series_to_numeric(s, "float64"),
+    "Boolean": series_to_boolean,
+}
+
+
 def cast_series_to_field_type(s: pd.Series, field_type: FieldType) -> pd.Series:
     pd_type = field_type_to_pandas_dtype(field_type)
+    if field_type.name == "Json" and s.dtype == object:
+        # Dtype alone won't change, but json strings still need parsing
+        try:
+            return series_to_json(s)
+        except (TypeError, ValueError):
+            pass
     if s.dtype.name == pd_type:
         return s
     if "datetime" in pd_type:
-        s = pd.to_datetime(s)
-        return s
+        return series_to_datetime(s)
     try:
         return s.astype(pd_type)
     except (TypeError, ValueError, parser.ParserError):
         pass
-    # Fall back to parsing individual values (very slow...)
-    return pd.Series([cast_python_object_to_field_type(v, field_type) for v in s])
+    vectorized_cast = VECTORIZED_CASTS.get(field_type.name)
+    if vectorized_cast is not None:
+        try:
+            return vectorized_cast(s)
+        except (AttributeError, TypeError, ValueError):
+            # AttributeError: `.str` on object columns with no strings
+            pass
+    # Fall back to casting individual values (slow, but handles anything)
+    caster = get_helper(field_type).get_caster(
+        list(s.iloc[:DATETIME_FORMAT_SAMPLE_SIZE])
+    )
+    return pd.Series(
+        [cast_python_object_to_field_type(v, field_type, caster=caster) for v in s],
+        index=s.index,
+    )
+
+
+def cast_dataframe_to_schema(df: DataFrame, schema: Schema) -> DataFrame:
+    for field in schema.fields:
+        if field.name in df.columns:
+            df[field.name] = cast_series_to_field_type(df[field.name], field.field_type)
+    return df
@@ -11,7 +11,9 @@ from pandas import DataFrame
 import dcp.storage.base as storage
 from dcp.data_format.base import DataFormat, DataFormatBase
 from dcp.data_format.formats.memory.dataframe import (
+    cast_dataframe_to_schema,
     cast_series_to_field_type,
+    pandas_series_to_field_type,
 )
 from dcp.data_format.formats.memory.records_iterator import RecordsIterator
 from dcp.data_format.handler import FormatHandler
@@ -41,6 +43,12 @@ class DataFrameIterator:
         finally:
             self.close()
 
+    def head(self, n: int) -> DataFrame:
+        """
+        First n records as a DataFrame, without consuming them
+        """
+        return self._build_df(self.iterator.head(n))
+
     def all(self) -> DataFrame:
         return self._build_df(list(self.iterator))
 
@@ -69,14 +77,20 @@ class PythonDataframeIteratorHandler(FormatHandler):
     for_data_formats = [DataFrameIteratorFormat]
     for_storage_engines = [storage.LocalPythonStorageEngine]
 
+    def get_sample(self, so: storage.StorageObject) -> DataFrame:
+        df_iterator: DataFrameIterator = so.storage.get_memory_api().get(so)
+        return df_iterator.head(self.sample_size)
+
     def infer_data_format(self, so: storage.StorageObject) -> Optional[DataFormat]:
+        if isinstance(so.storage.get_memory_api().get(so), DataFrameIterator):
+            return DataFrameIteratorFormat
         return None
 
     def infer_field_names(self, so: storage.StorageObject) -> List[str]:
-        raise NotImplementedError
+        return list(self.get_sample(so).columns)
 
     def infer_field_type(self, so: storage.StorageObject, field: str) -> FieldType:
-        raise NotImplementedError
+        return pandas_series_to_field_type(self.get_sample(so)[field])
 
     def cast_to_field_type(
         self, so: storage.StorageObject, field: str, field_type: FieldType
@@ -91,6 +105,18 @@ class PythonDataframeIteratorHandler(FormatHandler):
             cast_df_iterator,
         )
 
+    def cast_to_schema(self, so: storage.StorageObject, schema: Schema):
+        # One apply per chunk for the whole schema, rather than one per field
+        df_iterator = so.storage.get_memory_api().get(so)
+        cast_df_iterator = DataFrameIterator(
+            df_iterator.iterator,
+            df_iterator.apply + [lambda df: cast_dataframe_to_schema(df, schema)],
+        )
+        so.storage.get_memory_api().put(
+            so.formatted_full_name,
+            cast_df_iterator,
+        )
+
     def create_empty(self, so: storage.StorageObject, schema: Schema):
         def f():
             yield from []
@@ -99,5 +125,8 @@ class PythonDataframeIteratorHandler(FormatHandler):
             so.formatted_full_name, DataFrameIterator(RecordsIterator(f()))
         )
 
+    def get_record_count(self, so: storage.StorageObject) -> Optional[int]:
+        return None
+
     def supports(self, field_type) -> bool:
         raise NotImplementedError
@@ -13,20 +13,32 @@ from typing import (
 )
 
 from commonmodel import (
+    Field,
     FieldType,
     Schema,
 )
 
 import dcp.storage.base as storage
 from dcp.data_format.base import DataFormat, DataFormatBase
+from dcp.data_format.formats.memory.records import (
+    Records,
+    RecordsCastPlan,
+    sample_columns,
+    select_field_type,
+    select_field_types,
+)
 from dcp.data_format.handler import FormatHandler
 from dcp.data_format.inference import generate_auto_schema
+from dcp.storage.memory.iterator import SampleableIterator
+from dcp.utils.data import iterate_chunks
 
 T = TypeVar("T")
 
 
 class IteratorBase(Generic[T]):
     def __init__(self, iterator: Iterable[T], closeable: Callable = None):
+        if not isinstance(iterator, SampleableIterator):
+            iterator = SampleableIterator(iter(iterator))
         self.iterator = iterator
         self.closeable = closeable
 
@@ -34,6 +46,12 @@ class IteratorBase(Generic[T]):
         yield from self.iterator
         self.close()
 
+    def head(self, n: int) -> List[T]:
+        """
+        First n items, without consuming them
+        """
+        return list(self.iterator.head(n))
+
     def chunks(self, chunksize: int) -> Iterator:
         try:
             chunk = []
@@ -72,30 +90,77 @@ class RecordsIteratorFormat(DataFormatBase[RecordsIterator]):
     nickname = "records_iterator"
 
 
+def ensure_records_iterator(obj: Any) -> RecordsIterator:
+    # Plain iterators and generators are stored as is (but sampleable)
+    if isinstance(obj, RecordsIterator):
+        return obj
+    return RecordsIterator(obj)
+
+
 class PythonRecordsIteratorHandler(FormatHandler):
-    """TODO: this is a write-only format at the moment (can't copy FROM this format to another),
-    this is due to iterators being ephemeral objects.
+    """
+    Iterators are ephemeral, so everything here works from a bounded head of the
+    iterator (see SampleableIterator), leaving it unconsumed for the copy.
     """
 
     for_data_formats = [RecordsIteratorFormat]
     for_storage_engines = [storage.LocalPythonStorageEngine]
 
+    def get_iterator(self, so: storage.StorageObject) -> RecordsIterator:
+        return ensure_records_iterator(so.storage.get_memory_api().get(so))
+
+    def get_sample(self, so: storage.StorageObject) -> Records:
+        return self.get_iterator(so).head(self.sample_size)
+
     def infer_data_format(self, so: storage.StorageObject) -> Optional[DataFormat]:
+        obj = so.storage.get_memory_api().get(so)
+        if isinstance(obj, RecordsIterator):
+            return RecordsIteratorFormat
+        if isinstance(obj, SampleableIterator):
+            if isinstance(obj.get_first(), dict):
+                return RecordsIteratorFormat
         return None
 
     def infer_field_names(self, so: storage.StorageObject) -> List[str]:
-        raise NotImplementedError
+        names: Dict[str, None] = {}
+        for r in self.get_sample(so):
+            names.update(dict.fromkeys(r.keys()))
+        return list(names)
 
     def infer_field_type(self, so: storage.StorageObject, field: str) -> FieldType:
-        raise NotImplementedError
+        return select_field_type([r[field] for r in self.get_sample(so) if field in r])
+
+    def infer_schema(self, so: storage.StorageObject) -> Schema:
+        sample = self.get_sample(so)
+        names = self.infer_field_names(so)
+        field_types = select_field_types(sample_columns(sample, names, len(sample)))
+        fields = [Field(name=n, field_type=field_types[n]) for n in names]
+        return generate_auto_schema(fields=fields)
 
     def cast_to_field_type(
         self, so: storage.StorageObject, field: str, field_type: FieldType
     ):
-        raise NotImplementedError
+        schema = generate_auto_schema(
+            fields=[Field(name=field, field_type=field_type)]
+        )
+        self.cast_to_schema(so, schema)
+
+    def cast_to_schema(self, so: storage.StorageObject, schema: Schema):
+        # Lazily, a chunk at a time as the records go by
+        itr = self.get_iterator(so)
+        plan = RecordsCastPlan.from_schema(schema, itr.head(self.sample_size))
+
+        def f() -> Iterator[Dict[str, Any]]:
+            for chunk in iterate_chunks(itr.iterator, self.sample_size):
+                yield from plan.cast(chunk)
+
+        so.storage.get_memory_api().put(so, RecordsIterator(f(), itr.closeable))
 
     def create_empty(self, so: storage.StorageObject, schema: Schema):
         def f():
             yield from []
 
         so.storage.get_memory_api().put(so, RecordsIterator(f()))
+
+    def get_record_count(self, so: storage.StorageObject) -> Optional[int]:
+        return None
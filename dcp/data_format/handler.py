@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import Callable, Dict, Iterable, List, Optional, Type
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type
 
 from commonmodel.base import Field, Schema
 from commonmodel.field_types import FieldType
@@ -24,6 +24,9 @@ class FormatHandler:
     for_storage_classes: List[StorageClass] = []
     for_storage_engines: List[StorageEngine] = []
     sample_size: int = 100
+    # Relative cost of `infer_data_format`, cheaper handlers are tried first
+    # (0: checks the object in memory, higher: reads from storage)
+    inference_cost: int = 0
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -42,6 +45,12 @@ class FormatHandler:
     def infer_data_format(self, so: StorageObject) -> Optional[DataFormat]:
         raise NotImplementedError
 
+    def infer_data_format_from_name(self, so: StorageObject) -> Optional[DataFormat]:
+        """
+        Cheap inference from the object's name alone, without reading it
+        """
+        return None
+
     def infer_field_names(self, obj: StorageObject) -> Iterable[str]:
         raise NotImplementedError
 
@@ -165,11 +174,57 @@ class FormatHandler:
 #         raise NotImplementedError
 
 
-def get_handler(
+class HandlerIndex:
+    """
+    Handler lookups indexed from ALL_HANDLERS, rebuilt whenever a handler is
+    registered.
+    """
+
+    def __init__(self):
+        self.registered_count = 0
+        self.by_format_and_engine: Dict[Tuple, Optional[Type[FormatHandler]]] = {}
+        self.by_engine: Dict[Type[StorageEngine], List[Type[FormatHandler]]] = {}
+
+    def refresh(self):
+        # Handlers are only ever appended
+        if self.registered_count != len(ALL_HANDLERS):
+            self.registered_count = len(ALL_HANDLERS)
+            self.by_format_and_engine = {}
+            self.by_engine = {}
+
+    def get_handler(
+        self, data_format: DataFormat, storage_engine: Type[StorageEngine]
+    ) -> Optional[Type[FormatHandler]]:
+        self.refresh()
+        key = (data_format, storage_engine)
+        if key not in self.by_format_and_engine:
+            self.by_format_and_engine[key] = find_handler(data_format, storage_engine)
+        return self.by_format_and_engine[key]
+
+    def get_handlers_for_engine(
+        self, storage_engine: Type[StorageEngine]
+    ) -> List[Type[FormatHandler]]:
+        self.refresh()
+        if storage_engine not in self.by_engine:
+            handlers = [
+                handler
+                for handler in ALL_HANDLERS
+                if storage_engine.storage_class in handler.for_storage_classes
+                or storage_engine in handler.for_storage_engines
+            ]
+            # Stable, so registration order otherwise
+            handlers.sort(key=lambda h: h.inference_cost)
+            self.by_engine[storage_engine] = handlers
+        return self.by_engine[storage_engine]
+
+
+HANDLER_INDEX = HandlerIndex()
+
+
+def find_handler(
     data_format: DataFormat,
     storage_engine: Type[StorageEngine],
-) -> Type[FormatHandler]:
-    # TODO: can cache this stuff
+) -> Optional[Type[FormatHandler]]:
     format_handlers = [
         handler for handler in ALL_HANDLERS if data_format in handler.for_data_formats
     ]
@@ -186,15 +241,30 @@ def get_handler(
             and storage_engine.storage_class in handler.for_storage_classes
         ):
             return handler
-    raise NotImplementedError(
-        f"No format handler for {data_format} on {storage_engine}"
-    )
+    return None
+
+
+def get_handler(
+    data_format: DataFormat,
+    storage_engine: Type[StorageEngine],
+) -> Type[FormatHandler]:
+    handler = HANDLER_INDEX.get_handler(data_format, storage_engine)
+    if handler is None:
+        raise NotImplementedError(
+            f"No format handler for {data_format} on {storage_engine}"
+        )
+    return handler
 
 
 def infer_format(obj: StorageObject) -> DataFormat:
-    format_handlers = get_handlers_for_storage(obj.storage)
+    format_handlers = [h() for h in get_handlers_for_storage(obj.storage)]
+    # Names first, so nothing is read if the name is enough
+    for handler in format_handlers:
+        fmt = handler.infer_data_format_from_name(obj)
+        if fmt is not None:
+            return fmt
     for handler in format_handlers:
-        fmt = handler().infer_data_format(obj)
+        fmt = handler.infer_data_format(obj)
         if fmt is not None:
             return fmt
     msg = f"Could not infer format of object '{obj.formatted_full_name}' on storage {obj.storage}"
@@ -209,13 +279,8 @@ def get_handler_for_name(obj: StorageObject) -> Type[FormatHandler]:
 
 
 def get_handlers_for_storage(storage: Storage) -> List[Type[FormatHandler]]:
-    format_handlers = [
-        handler
-        for handler in ALL_HANDLERS
-        if storage.storage_engine.storage_class in handler.for_storage_classes
-        or storage.storage_engine in handler.for_storage_engines
-    ]
-    return format_handlers
+    # Cheapest to infer with first. A copy, the index's list is shared
+    return list(HANDLER_INDEX.get_handlers_for_engine(storage.storage_engine))
 
 
 def infer_schema_for_name(name: str, storage: Storage) -> Schema:
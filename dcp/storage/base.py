@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type, Union, cast
 from urllib.parse import urlparse
 
@@ -18,6 +20,15 @@ if TYPE_CHECKING:
 ALL_STORAGE_CLASSES = []
 ALL_STORAGE_ENGINES = []
 
+# Engine for each (recently used) url, with the number of engines registered
+# when resolved
+ENGINE_CACHE_SIZE = 256
+_engines_for_urls: OrderedDict[str, tuple] = OrderedDict()
+# One (stateless, or thread-safe) api object per (recently used) url and api class
+STORAGE_API_CACHE_SIZE = 256
+_storage_apis: OrderedDict[tuple, StorageApi] = OrderedDict()
+_storage_apis_lock = threading.Lock()
+
 
 class StorageClass:
     # natural_format: DataFormat
@@ -86,14 +97,9 @@ class StorageEngine:
 
     @classmethod
     def get_supported_formats(cls) -> List[DataFormat]:
-        from dcp.data_format.base import ALL_DATA_FORMATS
+        from dcp.data_format.base import DATA_FORMAT_INDEX
 
-        fmts = []
-        for fmt in ALL_DATA_FORMATS:
-            if fmt.natural_storage_class == cls.storage_class:
-                if not fmt.natural_storage_engine or fmt.natural_storage_engine == cls:
-                    fmts.append(fmt)
-        return fmts
+        return DATA_FORMAT_INDEX.get_supported_formats(cls)
 
     @classmethod
     def is_supported_format(cls, fmt: DataFormat) -> bool:
@@ -204,6 +210,23 @@ class LocalPythonStorageEngine(StorageEngine):
     natural_format = "records"  # TODO: arrow?
 
 
+class SharedMemoryStorageEngine(StorageEngine):
+    storage_class = MemoryStorageClass
+    schemes = ["shm"]
+    natural_format = "arrow"
+
+    @classmethod
+    def get_api_cls(cls) -> Type[StorageApi]:
+        from dcp.storage.memory.engines.shared_memory import SharedMemoryStorageApi
+
+        return SharedMemoryStorageApi
+
+    @classmethod
+    def get_supported_formats(cls) -> List[DataFormat]:
+        # Only arrow tables can live in shared memory (as arrow IPC)
+        return [cls.get_natural_format()]
+
+
 def get_engine_for_scheme(scheme: str) -> Type[StorageEngine]:
     # Take first match IN REVERSE ORDER they were added
     # (so an Engine added later - by user perhaps - takes precedence)
@@ -222,27 +245,45 @@ class Storage:
         return Storage(url=url)
 
     def get_api(self) -> StorageApi:
-        return self.storage_engine.get_api_cls()(self)
+        api_cls = self.storage_engine.get_api_cls()
+        key = (self.url, api_cls)
+        with _storage_apis_lock:
+            api = _storage_apis.get(key)
+            if api is None:
+                api = api_cls(self)
+                _storage_apis[key] = api
+                while len(_storage_apis) > STORAGE_API_CACHE_SIZE:
+                    _storage_apis.popitem(last=False)
+            else:
+                _storage_apis.move_to_end(key)
+        return api
 
     def get_database_api(self) -> DatabaseStorageApi:
         from dcp import DatabaseStorageApi
 
-        return cast(DatabaseStorageApi, self.storage_engine.get_api_cls()(self))
+        return cast(DatabaseStorageApi, self.get_api())
 
     def get_filesystem_api(self) -> FileSystemStorageApi:
         from dcp import FileSystemStorageApi
 
-        return cast(FileSystemStorageApi, self.storage_engine.get_api_cls()(self))
+        return cast(FileSystemStorageApi, self.get_api())
 
     def get_memory_api(self) -> PythonStorageApi:
         from dcp import PythonStorageApi
 
-        return cast(PythonStorageApi, self.storage_engine.get_api_cls()(self))
+        return cast(PythonStorageApi, self.get_api())
 
     @property
     def storage_engine(self) -> Type[StorageEngine]:
-        parsed = urlparse(self.url)
-        return get_engine_for_scheme(parsed.scheme)
+        # Resolved again if engines have been registered since
+        n_engines, eng = _engines_for_urls.get(self.url, (None, None))
+        if n_engines != len(ALL_STORAGE_ENGINES):
+            eng = get_engine_for_scheme(urlparse(self.url).scheme)
+            _engines_for_urls[self.url] = (len(ALL_STORAGE_ENGINES), eng)
+            while len(_engines_for_urls) > ENGINE_CACHE_SIZE:
+                # (Cheap to resolve again, so oldest first rather than LRU)
+                _engines_for_urls.popitem(last=False)
+        return eng
 
 
 def ensure_storage(s: Union[Storage, str, None]) -> Storage:
@@ -342,6 +383,10 @@ class StorageObject:
     full_path: FullPath
     _data_format: DataFormat | None = None
     _schema: Schema | None = None
+    # Not copied by `dataclasses.replace`, since it depends on the storage
+    _format_handler: FormatHandler | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @property
     def formatted_full_name(self) -> str:
@@ -355,7 +400,12 @@ class StorageObject:
     def format_handler(self) -> FormatHandler:
         from dcp import get_handler
 
-        return get_handler(self.get_data_format(), self.storage.storage_engine)()
+        fmt = self.get_data_format()
+        handler = self._format_handler
+        if handler is None or fmt not in handler.for_data_formats:
+            handler = get_handler(fmt, self.storage.storage_engine)()
+            self._format_handler = handler
+        return handler
 
     def get_data_format(self) -> DataFormat | None:
         from dcp import infer_format
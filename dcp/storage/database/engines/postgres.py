@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 from contextlib import contextmanager
 from io import IOBase
 from typing import Dict, Iterator, List, Optional, Callable
@@ -21,9 +22,15 @@ from dcp.storage.database.utils import (
 from dcp.utils.common import rand_str
 from loguru import logger
 from sqlalchemy.engine.base import Engine
+from sqlalchemy.engine import Result
 
 from dcp.utils.data import conform_records_for_insert
 
+# Statements that can change the result of current_schema()
+DEFAULT_SCHEMA_CHANGE_RE = re.compile(
+    r"\bsearch_path\b|\b(create|drop|alter)\s+schema\b", re.IGNORECASE
+)
+
 POSTGRES_SUPPORTED = False
 try:
     from psycopg2.extras import execute_values
@@ -56,6 +63,12 @@ def pg_execute_values(
         conn.close()
 
 
+def changes_default_schema(sql: str) -> bool:
+    # The default (current) schema is the first schema in the search path
+    # that exists
+    return DEFAULT_SCHEMA_CHANGE_RE.search(sql) is not None
+
+
 class PostgresDatabaseApi(DatabaseApi):
     def __init__(
         self,
@@ -67,21 +80,43 @@ class PostgresDatabaseApi(DatabaseApi):
                 "postgresql" + url[8:]
             )  # sqlalchemy now only works with postgresql scheme
         super().__init__(url, json_serializer)
+        # Queried once (and again after statements that may change it), api
+        # objects are shared per storage
+        self.default_schema: Optional[str] = None
 
     @classmethod
     def dialect_is_supported(cls) -> bool:
         return POSTGRES_SUPPORTED
 
+    def reset_default_storage_path(self):
+        # Queried again on next use
+        self.default_schema = None
+
     def get_default_storage_path(self) -> list[str]:
-        try:
-            with self.execute_sql_result("select current_schema()") as r:
-                return [list(r)[0][0]]
-        except OperationalError:
-            # Database is offline or unavailable
-            return ["public"]  # Default to postgres default?
+        if self.default_schema is None:
+            try:
+                with self.execute_sql_result("select current_schema()") as r:
+                    self.default_schema = list(r)[0][0]
+            except OperationalError:
+                # Database is offline or unavailable
+                return ["public"]  # Default to postgres default?
+        return [self.default_schema]
 
     ### Overrides
 
+    def execute_sql(self, sql: str) -> Result:
+        res = super().execute_sql(sql)
+        if changes_default_schema(sql):
+            self.reset_default_storage_path()
+        return res
+
+    @contextmanager
+    def execute_sql_result(self, sql: str) -> Iterator[Result]:
+        with super().execute_sql_result(sql) as res:
+            yield res
+        if changes_default_schema(sql):
+            self.reset_default_storage_path()
+
     def _exists(self, obj: StorageObject) -> bool:
         """MUST also check for views"""
         meta_tables = ["information_schema.tables", "information_schema.views"]
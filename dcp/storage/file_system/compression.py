@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Callable, Deque, Optional
+
+try:
+    import zstandard
+
+    ZSTD_SUPPORTED = True
+except ImportError:
+    zstandard = None
+    ZSTD_SUPPORTED = False
+
+
+COMPRESSION_EXTENSIONS = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+}
+SUPPORTED_COMPRESSIONS = set(COMPRESSION_EXTENSIONS.values())
+DEFAULT_COMPRESSION_BLOCK_SIZE = 4 * 1024 * 1024
+DEFAULT_COMPRESSION_THREADS = min(4, os.cpu_count() or 1)
+
+
+def infer_compression(path: str) -> Optional[str]:
+    _, ext = os.path.splitext(path)
+    return COMPRESSION_EXTENSIONS.get(ext.lower())
+
+
+def strip_compression_extension(path: str) -> str:
+    base, ext = os.path.splitext(path)
+    if ext.lower() in COMPRESSION_EXTENSIONS:
+        return base
+    return path
+
+
+def binary_mode(mode: str) -> str:
+    mode = mode.replace("t", "")
+    if "b" not in mode:
+        mode += "b"
+    return mode
+
+
+def get_block_compressor(
+    compression: str, level: Optional[int] = None
+) -> Callable[[bytes], bytes]:
+    # Each compressed block is a complete gzip member / bz2 stream / xz stream /
+    # zstd frame. All four formats allow these to be concatenated.
+    if compression == "gzip":
+        return lambda b: gzip.compress(b, compresslevel=level or 6)
+    if compression == "bz2":
+        return lambda b: bz2.compress(b, compresslevel=level or 9)
+    if compression == "xz":
+        return lambda b: lzma.compress(b, preset=level)
+    if compression == "zstd":
+        if not ZSTD_SUPPORTED:
+            raise ImportError("zstandard is not installed")
+        # Compressor objects are not thread safe, so one per block
+        return lambda b: zstandard.ZstdCompressor(level=level or 3).compress(b)
+    raise ValueError(f"Unsupported compression {compression}")
+
+
+def open_decompressed_reader(compression: str, fileobj: IO[bytes]) -> IO[bytes]:
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+    if compression == "bz2":
+        return bz2.BZ2File(fileobj, mode="rb")
+    if compression == "xz":
+        return lzma.LZMAFile(fileobj, mode="rb")
+    if compression == "zstd":
+        if not ZSTD_SUPPORTED:
+            raise ImportError("zstandard is not installed")
+        return zstandard.ZstdDecompressor().stream_reader(
+            fileobj, read_across_frames=True
+        )
+    raise ValueError(f"Unsupported compression {compression}")
+
+
+class DecompressingReader(io.BufferedReader):
+    """
+    Buffered reader over a decompression stream that also closes the underlying
+    (compressed) file object.
+    """
+
+    def __init__(self, compression: str, fileobj: IO[bytes]):
+        super().__init__(open_decompressed_reader(compression, fileobj))
+        self.fileobj = fileobj
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.fileobj.close()
+
+
+class ParallelBlockCompressor(io.BufferedIOBase):
+    """
+    Writable binary stream that compresses fixed size blocks on a thread pool
+    (zlib, bz2, lzma and zstd all release the GIL) and writes them to the
+    underlying file object in order.
+    """
+
+    def __init__(
+        self,
+        fileobj: IO[bytes],
+        compress: Callable[[bytes], bytes],
+        block_size: int = DEFAULT_COMPRESSION_BLOCK_SIZE,
+        threads: int = DEFAULT_COMPRESSION_THREADS,
+    ):
+        self.fileobj = fileobj
+        self.compress = compress
+        self.block_size = block_size
+        self.max_pending = max(threads, 1) * 2
+        self.executor = ThreadPoolExecutor(threads) if threads > 1 else None
+        self.pending: Deque[Future] = deque()
+        self.buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        if self.closed:
+            raise ValueError("write to closed file")
+        self.buffer += b
+        while len(self.buffer) >= self.block_size:
+            block = bytes(self.buffer[: self.block_size])
+            del self.buffer[: self.block_size]
+            self.submit(block)
+        return len(b)
+
+    def submit(self, block: bytes):
+        if self.executor is None:
+            self.fileobj.write(self.compress(block))
+            return
+        self.pending.append(self.executor.submit(self.compress, block))
+        while len(self.pending) >= self.max_pending:
+            self.fileobj.write(self.pending.popleft().result())
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self.buffer:
+                self.submit(bytes(self.buffer))
+                self.buffer.clear()
+            while self.pending:
+                self.fileobj.write(self.pending.popleft().result())
+        finally:
+            try:
+                if self.executor is not None:
+                    self.executor.shutdown()
+            finally:
+                # Closed even if compressing or writing failed
+                self.fileobj.close()
+                super().close()
+
+
+def open_compressed(
+    fileobj: IO[bytes],
+    mode: str,
+    compression: str,
+    encoding: Optional[str] = None,
+    errors: Optional[str] = None,
+    newline: Optional[str] = None,
+    compression_level: Optional[int] = None,
+    compression_threads: int = DEFAULT_COMPRESSION_THREADS,
+    block_size: int = DEFAULT_COMPRESSION_BLOCK_SIZE,
+) -> IO:
+    """
+    Wraps a raw binary file object in a (de)compressing stream. Writes and
+    appends add new compressed blocks to the end of the file.
+    """
+    if "+" in mode:
+        raise ValueError(f"Mode {mode} not supported for compressed files")
+    if "r" in mode:
+        stream = DecompressingReader(compression, fileobj)
+    else:
+        stream = ParallelBlockCompressor(
+            fileobj,
+            get_block_compressor(compression, compression_level),
+            block_size=block_size,
+            threads=compression_threads,
+        )
+    if "b" in mode:
+        return stream
+    return io.TextIOWrapper(stream, encoding=encoding, errors=errors, newline=newline)
@@ -6,17 +6,23 @@ import shutil
 import tempfile
 from contextlib import contextmanager
 from typing import (
+    IO,
     ContextManager,
     Generator,
     Iterable,
     Iterator,
     Optional,
-    TextIO,
+    Tuple,
     Type,
     Union,
 )
 
 from dcp.storage.base import Storage, StorageApi, StorageObject, FullPath
+from dcp.storage.file_system.compression import (
+    binary_mode,
+    infer_compression,
+    open_compressed,
+)
 
 
 def raw_line_count(f: Union[str, IOBase]) -> int:
@@ -29,8 +35,9 @@ def raw_line_count(f: Union[str, IOBase]) -> int:
             b = reader(1024 * 1024)
 
     if isinstance(f, str):
-        f = open(f, "rb")
-    f_gen = _make_gen(f.raw.read)
+        with open(f, "rb") as fb:
+            return raw_line_count(fb)
+    f_gen = _make_gen(getattr(f, "raw", f).read)
     return sum(buf.count(b"\n") for buf in f_gen)
 
 
@@ -41,15 +48,38 @@ def get_tmp_local_file_url() -> str:
 class FileSystemStorageApi(StorageApi):
     @contextmanager
     def open(
-        self, name: str | FullPath | StorageObject, *args, **kwargs
-    ) -> Iterator[TextIO]:
-        with open(self.get_path(name), *args, **kwargs) as f:
+        self,
+        name: str | FullPath | StorageObject,
+        mode: str = "r",
+        *args,
+        compression: Optional[str] = "infer",
+        **kwargs,
+    ) -> Iterator[IO]:
+        with self.open_name(name, mode, *args, compression=compression, **kwargs) as f:
             yield f
 
     def open_name(
-        self, name: str | FullPath | StorageObject, *args, **kwargs
-    ) -> TextIO:
-        return open(self.get_path(name), *args, **kwargs)
+        self,
+        name: str | FullPath | StorageObject,
+        mode: str = "r",
+        *args,
+        compression: Optional[str] = "infer",
+        **kwargs,
+    ) -> IO:
+        """
+        Compression is inferred from the file extension (.gz, .bz2, .xz, .zst)
+        unless given explicitly, use `compression=None` to read raw bytes.
+        """
+        pth = self.get_path(name)
+        if compression == "infer":
+            compression = infer_compression(pth)
+        if compression is None:
+            return self.open_path(pth, mode, *args, **kwargs)
+        f = self.open_path(pth, binary_mode(mode), *args)
+        return open_compressed(f, mode, compression, **kwargs)
+
+    def open_path(self, pth: str, mode: str = "r", *args, **kwargs) -> IO:
+        return open(pth, mode, *args, **kwargs)
 
     def get_path(self, name: str | FullPath | StorageObject) -> str:
         if isinstance(name, StorageObject):
@@ -59,6 +89,19 @@ class FileSystemStorageApi(StorageApi):
         dir = self.storage.url.split("://")[1]
         return os.path.join(dir, name)
 
+    def get_file_signature(
+        self, name: str | FullPath | StorageObject
+    ) -> Optional[Tuple]:
+        """
+        (size, mtime) of the file, or None if it doesn't exist. Changes whenever
+        the file does, so can be used to cache anything derived from the contents.
+        """
+        try:
+            st = os.stat(self.get_path(name))
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
     ### StorageApi implementations ###
     def format_full_path(self, full_path: FullPath) -> str:
         return os.path.join(*full_path.as_list())
@@ -85,6 +128,9 @@ class FileSystemStorageApi(StorageApi):
     def _record_count(self, obj: StorageObject) -> Optional[int]:
         # TODO: this depends on format... hmmm, i guess let upstream handle for now
         pth = self.get_path(obj)
+        if infer_compression(pth):
+            with self.open(obj, "rb") as f:
+                return raw_line_count(f)
         return raw_line_count(pth)
 
     def _copy(self, obj: StorageObject, to_obj: StorageObject):
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-from contextlib import contextmanager
-from typing import Iterator, Optional, TextIO
+from typing import IO, Optional, Tuple
 
 from dcp.storage.base import Storage, StorageObject
 from dcp.storage.file_system.engines.base import FileSystemStorageApi
@@ -31,12 +30,17 @@ class GoogleCloudStorageApi(FileSystemStorageApi):
     def bucket_name(self) -> str:
         return self.storage.url.split("://")[1].split("/")[0]
 
-    @contextmanager
-    def open(self, name: str, mode: str = "r", *args, **kwargs) -> Iterator[TextIO]:
+    def open_path(self, pth: str, mode: str = "r", *args, **kwargs) -> IO:
         # if "a" in mode:
         #     raise NotImplementedError
-        with self.fs.open(self.get_path(name), mode, *args, **kwargs) as f:
-            yield f
+        return self.fs.open(pth, mode, *args, **kwargs)
+
+    def get_file_signature(self, name: str) -> Optional[Tuple]:
+        try:
+            info = self.fs.info(self.get_path(name))
+        except FileNotFoundError:
+            return None
+        return info.get("size"), info.get("updated") or info.get("generation")
 
     # def read(self, name: str) -> TextIO:
     #     buffer = io.TextIO()
@@ -45,11 +49,6 @@ class GoogleCloudStorageApi(FileSystemStorageApi):
     #     buffer.seek(0)
     #     return buffer
 
-    def open_name(self, name: str, mode: str = "r", *args, **kwargs) -> TextIO:
-        # if "a" in mode:
-        #     raise NotImplementedError
-        return self.fs.open(self.get_path(name), mode, *args, **kwargs)
-
     ### StorageApi implementations ###
     def _exists(self, obj: StorageObject) -> bool:
         return self.fs.exists(self.get_path(obj.formatted_full_name))
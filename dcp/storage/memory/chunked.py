@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Any, Generic, Iterable, List, TypeVar
+
+import pandas as pd
+
+from dcp.utils.parallel import concat_arrow_tables
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+T = TypeVar("T")
+
+
+class ChunkedObject(Generic[T]):
+    """
+    Chunks of an object appended in O(1), and combined once, when the object
+    is next read.
+    """
+
+    def __init__(self, chunks: Iterable[T]):
+        self.chunks: List[T] = list(chunks)
+
+    def append(self, chunk: T):
+        self.chunks.append(chunk)
+
+    def combine(self) -> T:
+        if len(self.chunks) != 1:
+            # Keep the result, so combining again (eg from an alias) is free
+            self.chunks = [self.combine_chunks(self.chunks)]
+        return self.chunks[0]
+
+    def combine_chunks(self, chunks: List[T]) -> T:
+        raise NotImplementedError
+
+
+class ChunkedDataFrame(ChunkedObject[pd.DataFrame]):
+    def combine_chunks(self, chunks: List[pd.DataFrame]) -> pd.DataFrame:
+        # Empty frames (from create_empty) would only muddle the dtypes when
+        # concatenated, but still carry the schema's columns
+        non_empty = [c for c in chunks if not c.empty]
+        if not non_empty:
+            return chunks[0]
+        df = non_empty[0] if len(non_empty) == 1 else pd.concat(non_empty)
+        columns = list(dict.fromkeys(col for c in chunks for col in c.columns))
+        if columns == list(df.columns):
+            return df
+        df = df.reindex(columns=columns)
+        for c in chunks:
+            if not c.empty:
+                continue
+            for col, dtype in c.dtypes.items():
+                if df[col].isna().all() and df[col].dtype != dtype:
+                    try:
+                        df[col] = df[col].astype(dtype)
+                    except (TypeError, ValueError):
+                        pass
+        return df
+
+
+def append_chunk(existing: Any, chunk: Any) -> Any:
+    """
+    Appends without copying what's already there: lists are extended in
+    place, arrow tables are concatenated (zero-copy) and DataFrames are
+    chunked until read.
+    """
+    if isinstance(existing, list):
+        existing.extend(chunk)
+        return existing
+    if pa is not None and isinstance(existing, pa.Table):
+        if existing.num_rows == 0:
+            return chunk
+        return concat_arrow_tables([existing, chunk])
+    if isinstance(existing, ChunkedDataFrame):
+        existing.append(chunk)
+        return existing
+    if isinstance(existing, pd.DataFrame):
+        return ChunkedDataFrame([existing, chunk])
+    raise TypeError(f"Can't append to {type(existing)}")
@@ -1 +1,2 @@
 from .python import *
+from .shared_memory import *
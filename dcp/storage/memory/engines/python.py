@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import os
+from collections import abc
 from contextlib import contextmanager
 from copy import deepcopy
-from typing import Any, Dict, Optional
+from io import IOBase
+from typing import Any, Dict, Optional, Set
+
+import pandas as pd
+from sqlalchemy.engine import ResultProxy
 
 from dcp.storage.base import (
     NameDoesNotExistError,
@@ -12,9 +17,21 @@ from dcp.storage.base import (
     StorageObject,
     FullPath,
 )
+from dcp.storage.memory.chunked import ChunkedObject, append_chunk
+from dcp.storage.memory.iterator import SampleableIterator
+from dcp.storage.memory.store import PythonObjectStore
 from dcp.utils.common import rand_str
 
-LOCAL_PYTHON_STORAGE: Dict[str, Any] = {}  # TODO: global state...
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Unbounded unless a capacity is set (see `set_python_storage_capacity`)
+LOCAL_PYTHON_STORAGE = PythonObjectStore()  # TODO: global state...
+# Paths whose object is shared with a copy (see `_copy`), so must be copied
+# before being mutated, to the paths sharing it (one set per shared object)
+COPY_ON_WRITE_PATHS: Dict[str, Set[str]] = {}
 
 
 def new_local_python_storage() -> Storage:
@@ -23,24 +40,65 @@ def new_local_python_storage() -> Storage:
 
 def clear_local_storage():
     LOCAL_PYTHON_STORAGE.clear()
-
-
-#
-# def wrap_records_object(obj: Any) -> Any:
-#     """
-#     Wrap records object that are exhaustable (eg generators, file objects, db cursors)
-#     so that we can sample them for inspection and inference without losing records.
-#     """
-#     # TODO: handling iterators is too dangerous?
-#     return obj
-#     if isinstance(obj, SampleableIterator):
-#         # Already wrapped
-#         return obj
-#     # if isinstance(obj, IOBase):
-#     #     return SampleableIOBase(obj)
-#     if isinstance(obj, abc.Iterator):
-#         return SampleableIterator(obj)
-#     return obj
+    COPY_ON_WRITE_PATHS.clear()
+
+
+def set_python_storage_capacity(capacity: Optional[int]):
+    """
+    Bounds python storage to ~`capacity` bytes (estimated), spilling least
+    recently used objects to local files beyond it. None for unbounded.
+    """
+    LOCAL_PYTHON_STORAGE.capacity = capacity
+    LOCAL_PYTHON_STORAGE.evict()
+
+
+def share_path(pth: str, with_pth: str):
+    sharing = COPY_ON_WRITE_PATHS.get(pth, {pth})
+    sharing.add(with_pth)
+    for p in sharing:
+        COPY_ON_WRITE_PATHS[p] = sharing
+
+
+def unshare_path(pth: str):
+    # Once only one path holds the object, it's safe to mutate it in place
+    sharing = COPY_ON_WRITE_PATHS.pop(pth, None)
+    if sharing is None:
+        return
+    sharing.discard(pth)
+    if len(sharing) == 1:
+        COPY_ON_WRITE_PATHS.pop(sharing.pop(), None)
+
+
+def wrap_records_object(obj: Any) -> Any:
+    """
+    Wrap records objects that are exhaustable (eg generators) so that we can
+    sample them for inspection and inference without losing records.
+    """
+    if isinstance(obj, (SampleableIterator, IOBase, ResultProxy)):
+        # Already wrapped, or handled by its own format (files, db cursors)
+        return obj
+    if isinstance(obj, abc.Iterator):
+        return SampleableIterator(obj)
+    return obj
+
+
+def copy_for_write(obj: Any) -> Any:
+    """
+    Copies only as deep as our mutating paths (casts, appends) reach: they
+    replace record values and DataFrame columns, but never mutate them in place.
+    """
+    if isinstance(obj, list):
+        return [dict(r) if isinstance(r, dict) else r for r in obj]
+    if isinstance(obj, pd.DataFrame):
+        return obj.copy(deep=False)
+    if pa is not None and isinstance(obj, pa.Table):
+        # Immutable
+        return obj
+    try:
+        return deepcopy(obj)
+    except TypeError:
+        # Eg generators and cursors, which can only be consumed once anyway
+        return obj
 
 
 class PythonStorageApi(StorageApi):
@@ -56,17 +114,70 @@ class PythonStorageApi(StorageApi):
         obj = LOCAL_PYTHON_STORAGE.get(pth)
         if obj is None:
             raise NameDoesNotExistError(f"{name} on {self.storage}")
+        if isinstance(obj, ChunkedObject):
+            obj = obj.combine()
+            LOCAL_PYTHON_STORAGE[pth] = obj
+        return obj
+
+    def get_mutable(self, name: str | FullPath | StorageObject) -> Any:
+        """
+        Like `get`, but the object is safe to mutate in place: if it's shared
+        with a copy, it's copied first.
+        """
+        obj = self.get(name)
+        pth = self.get_path(name)
+        if pth in COPY_ON_WRITE_PATHS:
+            obj = copy_for_write(obj)
+            self.put(name, obj)
+        # Its size may change as it's mutated
+        LOCAL_PYTHON_STORAGE.invalidate_size(pth)
         return obj
 
     def put(self, name: str | FullPath | StorageObject, records_obj: Any):
-        # assert isinstance(
-        #     mdr, MemoryRecordsObject
-        # ), f"Can only store MemoryRecordsObjects, not {type(mdr)}"
-        # records_obj = wrap_records_object(
-        #     records_obj
-        # )  # TODO: is this the right place for this?
         pth = self.get_path(name)
-        LOCAL_PYTHON_STORAGE[pth] = records_obj
+        LOCAL_PYTHON_STORAGE[pth] = wrap_records_object(records_obj)
+        unshare_path(pth)
+
+    def append(self, name: str | FullPath | StorageObject, chunk: Any):
+        """
+        Appends chunk to the stored object without copying the existing data,
+        so repeated appends are linear in total size.
+        """
+        pth = self.get_path(name)
+        existing = LOCAL_PYTHON_STORAGE.get(pth)
+        if existing is None:
+            raise NameDoesNotExistError(f"{name} on {self.storage}")
+        if pth in COPY_ON_WRITE_PATHS:
+            existing = self.get_mutable(name)
+        LOCAL_PYTHON_STORAGE[pth] = append_chunk(existing, chunk)
+
+    def get_object_size(self, name: str | FullPath | StorageObject) -> int:
+        """
+        Estimated in-memory size of the object, in bytes (0 if spilled to disk)
+        """
+        return LOCAL_PYTHON_STORAGE.size_of(self.get_path(name))
+
+    def get_size(self) -> int:
+        """
+        Estimated in-memory size of all objects on this storage, in bytes
+        """
+        prefix = os.path.join(self.storage.url, "")
+        return LOCAL_PYTHON_STORAGE.total_size(prefix=prefix)
+
+    def pin(self, name: str | FullPath | StorageObject):
+        # Pinned objects are always kept in memory
+        LOCAL_PYTHON_STORAGE.pin(self.get_path(name))
+
+    def unpin(self, name: str | FullPath | StorageObject):
+        LOCAL_PYTHON_STORAGE.unpin(self.get_path(name))
+
+    @contextmanager
+    def pinned(self, name: str | FullPath | StorageObject):
+        self.pin(name)
+        try:
+            yield
+        finally:
+            self.unpin(name)
 
     @contextmanager
     def temp(self, name: str, records_obj: Any):
@@ -79,6 +190,7 @@ class PythonStorageApi(StorageApi):
     def _remove(self, obj: StorageObject):
         pth = self.get_path(obj)
         del LOCAL_PYTHON_STORAGE[pth]
+        unshare_path(pth)
 
     def _exists(self, obj: StorageObject) -> bool:
         pth = self.get_path(obj)
@@ -91,13 +203,18 @@ class PythonStorageApi(StorageApi):
         return handler().get_record_count(obj)
 
     def _copy(self, obj: StorageObject, to_obj: StorageObject):
+        # Copy-on-write: share the object until either side is mutated (see
+        # `get_mutable`)
         py_obj = self.get(obj)
-        py_obj_copy = deepcopy(py_obj)  # TODO: when does this deepcopy fail?
-        self.put(to_obj, py_obj_copy)
+        self.put(to_obj, py_obj)
+        share_path(self.get_path(obj), self.get_path(to_obj))
 
     def _create_alias(self, obj: StorageObject, alias_obj: StorageObject):
         py_obj = self.get(obj)
         self.put(alias_obj, py_obj)
+        if self.get_path(obj) in COPY_ON_WRITE_PATHS:
+            # The alias shares the copy's object too
+            share_path(self.get_path(obj), self.get_path(alias_obj))
 
     def _remove_alias(self, obj: StorageObject):
         self._remove(obj)
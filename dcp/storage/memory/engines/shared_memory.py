@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import atexit
+import hashlib
+import os
+import struct
+from contextlib import contextmanager
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional
+
+from dcp.storage.base import (
+    FullPath,
+    NameDoesNotExistError,
+    Storage,
+    StorageApi,
+    StorageObject,
+)
+from dcp.storage.memory.chunked import append_chunk
+from dcp.utils.common import rand_str
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Each object is a pointer segment, under a name derived from its path, holding
+# the name of the data segment with the current version of the table. Puts
+# write a new data segment and only then swap the pointer, so readers only
+# ever see whole tables.
+# Data segment layout: int64 size of the arrow IPC stream that follows
+HEADER = struct.Struct("q")
+# Pointer segment layout: sequence number (odd while being written) then the
+# data segment name (empty once removed)
+POINTER_SEQ = struct.Struct("Q")
+POINTER_NAME = struct.Struct("32s")
+POINTER_SIZE = POINTER_SEQ.size + POINTER_NAME.size
+
+# Segments this process has created or attached to, by segment name. Held open
+# since tables read from a segment reference its memory directly
+_SEGMENTS: Dict[str, SharedMemory] = {}
+# Removed segments still referenced by tables, closed once they aren't (or on
+# exit)
+_RETIRED_SEGMENTS: List[SharedMemory] = []
+# Data segment this process last read for each pointer segment
+_DATA_SEGMENT_NAMES: Dict[str, str] = {}
+
+
+def new_shared_memory_storage() -> Storage:
+    return Storage.from_url(f"shm://{rand_str(10)}/")
+
+
+def get_segment_name(path: str) -> str:
+    # Same in every process, and short enough for macOS (31 chars max)
+    return "dcp_" + hashlib.sha1(path.encode()).hexdigest()[:24]
+
+
+def new_data_segment_name() -> str:
+    # Unique per put, so a new version never overwrites one being read
+    return "dcp_" + rand_str(20)
+
+
+def _untrack(segment: SharedMemory):
+    # Segments live until removed, rather than being unlinked by the resource
+    # tracker when the process that created (or attached to) them exits
+    resource_tracker.unregister(segment._name, "shared_memory")
+
+
+def _get_size(segment: SharedMemory) -> int:
+    return HEADER.unpack_from(segment.buf, 0)[0]
+
+
+def _read_pointer(pointer: SharedMemory) -> str:
+    # Retry while a swap is in progress, or if one happened mid-read
+    while True:
+        seq = POINTER_SEQ.unpack_from(pointer.buf, 0)[0]
+        if seq % 2:
+            continue
+        name = POINTER_NAME.unpack_from(pointer.buf, POINTER_SEQ.size)[0]
+        if POINTER_SEQ.unpack_from(pointer.buf, 0)[0] == seq:
+            return name.rstrip(b"\0").decode()
+
+
+def _swap_pointer(pointer: SharedMemory, data_segment_name: str) -> str:
+    # Returns the previous data segment name
+    previous = _read_pointer(pointer)
+    seq = POINTER_SEQ.unpack_from(pointer.buf, 0)[0]
+    POINTER_SEQ.pack_into(pointer.buf, 0, seq + 1)
+    POINTER_NAME.pack_into(pointer.buf, POINTER_SEQ.size, data_segment_name.encode())
+    POINTER_SEQ.pack_into(pointer.buf, 0, seq + 2)
+    return previous
+
+
+def _retire(segment_name: str):
+    segment = _SEGMENTS.pop(segment_name, None)
+    if segment is None:
+        return
+    try:
+        segment.close()
+    except BufferError:
+        # Tables read from it are still around
+        _RETIRED_SEGMENTS.append(segment)
+
+
+def _close_retired():
+    # Retried on later writes and removes, as tables are let go
+    for segment in list(_RETIRED_SEGMENTS):
+        try:
+            segment.close()
+        except BufferError:
+            continue
+        _RETIRED_SEGMENTS.remove(segment)
+
+
+@atexit.register
+def _close_all():
+    for segment in list(_SEGMENTS.values()) + _RETIRED_SEGMENTS:
+        try:
+            segment.close()
+        except BufferError:
+            pass
+    _SEGMENTS.clear()
+    _RETIRED_SEGMENTS.clear()
+    _DATA_SEGMENT_NAMES.clear()
+
+
+def _open(segment_name: str) -> Optional[SharedMemory]:
+    segment = _SEGMENTS.get(segment_name)
+    if segment is not None:
+        return segment
+    try:
+        segment = SharedMemory(name=segment_name)
+    except FileNotFoundError:
+        return None
+    _untrack(segment)
+    _SEGMENTS[segment_name] = segment
+    return segment
+
+
+def _create(segment_name: str, size: int) -> SharedMemory:
+    segment = SharedMemory(name=segment_name, create=True, size=size)
+    _untrack(segment)
+    _SEGMENTS[segment_name] = segment
+    return segment
+
+
+def _unlink(segment_name: str):
+    segment = _open(segment_name)
+    if segment is None:
+        return
+    # Unlink unregisters it from the resource tracker too, so must be registered
+    resource_tracker.register(segment._name, "shared_memory")
+    try:
+        segment.unlink()
+    except FileNotFoundError:
+        # Unlinked by another process meanwhile
+        pass
+    _retire(segment_name)
+
+
+def _get_pointer(pointer_name: str) -> Optional[SharedMemory]:
+    pointer = _open(pointer_name)
+    if pointer is not None and not _read_pointer(pointer):
+        # Removed by another process (and maybe since put again)
+        _retire(pointer_name)
+        pointer = _open(pointer_name)
+    return pointer
+
+
+def _attach(pointer_name: str) -> Optional[SharedMemory]:
+    # The data segment currently pointed to, if any
+    while True:
+        pointer = _get_pointer(pointer_name)
+        if pointer is None:
+            return None
+        data_segment_name = _read_pointer(pointer)
+        if not data_segment_name:
+            return None
+        previous = _DATA_SEGMENT_NAMES.get(pointer_name)
+        if previous is not None and previous != data_segment_name:
+            # Replaced by another put
+            _retire(previous)
+        segment = _open(data_segment_name)
+        if segment is not None:
+            _DATA_SEGMENT_NAMES[pointer_name] = data_segment_name
+            return segment
+        # Replaced (and unlinked) since we read the pointer, so read it again
+
+
+def _publish(pointer_name: str, data_segment_name: str):
+    pointer = _get_pointer(pointer_name)
+    if pointer is None:
+        try:
+            pointer = _create(pointer_name, POINTER_SIZE)
+        except FileExistsError:
+            # Created by another process meanwhile
+            pointer = _open(pointer_name)
+    previous = _swap_pointer(pointer, data_segment_name)
+    _DATA_SEGMENT_NAMES[pointer_name] = data_segment_name
+    if previous:
+        # Readers attached to it keep it mapped until they let go
+        _unlink(previous)
+
+
+def _remove_segment(pointer_name: str) -> bool:
+    pointer = _get_pointer(pointer_name)
+    if pointer is None:
+        return False
+    # Tell other processes attached to it, then free both segments
+    data_segment_name = _swap_pointer(pointer, "")
+    _DATA_SEGMENT_NAMES.pop(pointer_name, None)
+    _unlink(pointer_name)
+    if data_segment_name:
+        _unlink(data_segment_name)
+    return bool(data_segment_name)
+
+
+class SharedMemoryStorageApi(StorageApi):
+    """
+    Arrow tables in named shared memory segments (as arrow IPC), so any process
+    on the host can read them zero-copy from the same `shm://` storage. Segments
+    outlive the processes that use them, until removed.
+    """
+
+    def get_path(self, name: str | FullPath | StorageObject) -> str:
+        if isinstance(name, StorageObject):
+            name = name.full_path
+        if isinstance(name, FullPath):
+            name = os.path.join(*name.as_list())
+        return os.path.join(self.storage.url, name)
+
+    def get_segment_name(self, name: str | FullPath | StorageObject) -> str:
+        return get_segment_name(self.get_path(name))
+
+    def get(self, name: str | FullPath | StorageObject) -> Any:
+        segment = _attach(self.get_segment_name(name))
+        if segment is None:
+            raise NameDoesNotExistError(f"{name} on {self.storage}")
+        buf = pa.py_buffer(segment.buf)
+        stream = buf.slice(HEADER.size, _get_size(segment))
+        return pa.ipc.open_stream(stream).read_all()
+
+    def get_mutable(self, name: str | FullPath | StorageObject) -> Any:
+        # Arrow tables are immutable
+        return self.get(name)
+
+    def put(self, name: str | FullPath | StorageObject, records_obj: Any):
+        if pa is None:
+            raise ImportError("Pyarrow is not installed")
+        if not isinstance(records_obj, pa.Table):
+            raise TypeError(
+                f"Can only store arrow tables in shared memory, not {type(records_obj)}"
+            )
+        _close_retired()
+        mock = pa.MockOutputStream()
+        self._write_table(mock, records_obj)
+        size = mock.size()
+        data_segment_name = new_data_segment_name()
+        segment = _create(data_segment_name, HEADER.size + size)
+        HEADER.pack_into(segment.buf, 0, size)
+        # (Slices of arrow buffers aren't writable, memoryview slices are)
+        sink = pa.py_buffer(segment.buf[HEADER.size : HEADER.size + size])
+        self._write_table(pa.FixedSizeBufferWriter(sink), records_obj)
+        # Only visible to readers once written
+        _publish(self.get_segment_name(name), data_segment_name)
+
+    def _write_table(self, sink: Any, table: Any):
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    def append(self, name: str | FullPath | StorageObject, chunk: Any):
+        # Segments are fixed size, so this rewrites the whole table
+        table = append_chunk(self.get(name), chunk)
+        self.put(name, table)
+        # The combined table was the last reference to the old segment
+        del table
+        _close_retired()
+
+    @contextmanager
+    def temp(self, name: str, records_obj: Any):
+        self.put(name, records_obj)
+        yield
+        self.remove(name)
+
+    # StorageApi overrides
+
+    def _remove(self, obj: StorageObject):
+        _remove_segment(self.get_segment_name(obj))
+        _close_retired()
+
+    def _exists(self, obj: StorageObject) -> bool:
+        return _attach(self.get_segment_name(obj)) is not None
+
+    def _record_count(self, obj: StorageObject) -> Optional[int]:
+        return self.get(obj).num_rows
+
+    def _copy(self, obj: StorageObject, to_obj: StorageObject):
+        self.put(to_obj, self.get(obj))
+
+    def _create_alias(self, obj: StorageObject, alias_obj: StorageObject):
+        # Segments can't be aliased, but tables are immutable so a copy will do
+        self._copy(obj, alias_obj)
+
+    def _remove_alias(self, obj: StorageObject):
+        self._remove(obj)
+
+    def format_full_path(self, full_path: FullPath) -> str:
+        return "/".join(full_path.as_list())
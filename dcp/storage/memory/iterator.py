@@ -63,6 +63,9 @@ class SampleableIterator(Generic[T]):
             i += 1
             if i >= n:
                 return
+        if self._complete:
+            # Whole iterator is in the sample already
+            return
         if self._is_used:
             raise Exception("Iterator already used")
         for v in self._iterator:
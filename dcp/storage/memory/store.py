@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+from collections import OrderedDict, abc
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+import pandas as pd
+
+from dcp.storage.memory.chunked import ChunkedObject
+from dcp.storage.memory.iterator import SampleableIterator
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Records sampled to estimate the size of a records list
+SIZE_SAMPLE_RECORDS = 100
+
+
+def estimate_size(obj: Any) -> int:
+    """
+    Approximate in-memory size of a stored object, in bytes. Cheap rather than
+    exact: lists of records are estimated from a sample.
+    """
+    if isinstance(obj, ChunkedObject):
+        return sum(estimate_size(c) for c in obj.chunks)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, list):
+        if not obj:
+            return sys.getsizeof(obj)
+        sample = obj[:SIZE_SAMPLE_RECORDS]
+        sample_size = 0
+        for r in sample:
+            sample_size += sys.getsizeof(r)
+            if isinstance(r, dict):
+                sample_size += sum(sys.getsizeof(v) for v in r.values())
+        return sys.getsizeof(obj) + sample_size * len(obj) // len(sample)
+    nbytes = getattr(obj, "nbytes", None)  # Arrow tables, columnar records
+    if isinstance(nbytes, int):
+        return nbytes
+    return sys.getsizeof(obj)
+
+
+def is_spillable(obj: Any) -> bool:
+    # Iterators, cursors and files are live objects, only held in memory
+    if isinstance(obj, (abc.Iterator, SampleableIterator)):
+        return False
+    if isinstance(obj, pd.DataFrame):
+        # Has no close, but could have a column named that
+        return True
+    return not hasattr(obj, "close")
+
+
+class PythonObjectStore(abc.MutableMapping):
+    """
+    Objects of the python storage engine, by path. If `capacity` (in estimated
+    bytes) is set, least recently used objects beyond it are spilled to local
+    files (Arrow IPC for arrow tables, pickle otherwise) and transparently
+    reloaded when next read. Pinned objects are never spilled. An object stored
+    under several paths (eg copy-on-write copies) is counted, spilled and reloaded
+    once.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = capacity
+        # In memory objects, least recently used first
+        self._objects: OrderedDict[str, Any] = OrderedDict()
+        # Paths holding each in memory object, by object id
+        self._holders: Dict[int, Set[str]] = {}
+        # Estimated sizes by object id, and their running total. Objects not
+        # sized yet (or mutated since) are estimated when next needed
+        self._sizes: Dict[int, int] = {}
+        self._unsized: Set[int] = set()
+        self._total_size = 0
+        self._spilled: Dict[str, str] = {}
+        # Spilled paths per spill file (shared objects share a file)
+        self._spill_files: Dict[str, Set[str]] = {}
+        self._pinned: Set[str] = set()
+        self._spill_dir: Optional[str] = None
+        self._spill_count = 0
+
+    def __getitem__(self, pth: str) -> Any:
+        if pth in self._objects:
+            self._objects.move_to_end(pth)
+            return self._objects[pth]
+        if pth in self._spilled:
+            return self._reload(pth)
+        raise KeyError(pth)
+
+    def __setitem__(self, pth: str, obj: Any):
+        self._remove_spilled(pth)
+        self._discard(pth)
+        self._add(pth, obj)
+        self.evict()
+
+    def __delitem__(self, pth: str):
+        if pth not in self:
+            raise KeyError(pth)
+        self._discard(pth)
+        self._pinned.discard(pth)
+        self._remove_spilled(pth)
+
+    def __contains__(self, pth: object) -> bool:
+        return pth in self._objects or pth in self._spilled
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self._objects)
+        yield from list(self._spilled)
+
+    def __len__(self) -> int:
+        return len(self._objects) + len(self._spilled)
+
+    def clear(self):
+        self._objects.clear()
+        self._holders.clear()
+        self._sizes.clear()
+        self._unsized.clear()
+        self._total_size = 0
+        self._spilled.clear()
+        self._spill_files.clear()
+        self._pinned.clear()
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def _add(self, pth: str, obj: Any):
+        self._objects[pth] = obj
+        holders = self._holders.setdefault(id(obj), set())
+        if not holders:
+            self._unsized.add(id(obj))
+        holders.add(pth)
+
+    def _discard(self, pth: str):
+        if pth not in self._objects:
+            return
+        obj = self._objects.pop(pth)
+        holders = self._holders[id(obj)]
+        holders.discard(pth)
+        if holders:
+            return
+        del self._holders[id(obj)]
+        self._unsized.discard(id(obj))
+        self._total_size -= self._sizes.pop(id(obj), 0)
+
+    # Size accounting
+
+    def size_of(self, pth: str) -> int:
+        """
+        Estimated in-memory size of the object (0 if spilled)
+        """
+        if pth not in self._objects:
+            return 0
+        obj = self._objects[pth]
+        if id(obj) in self._unsized:
+            self._unsized.discard(id(obj))
+            self._sizes[id(obj)] = estimate_size(obj)
+            self._total_size += self._sizes[id(obj)]
+        return self._sizes[id(obj)]
+
+    def invalidate_size(self, pth: str):
+        # Object may be mutated in place, so re-estimate when next needed
+        if pth not in self._objects:
+            return
+        obj_id = id(self._objects[pth])
+        self._total_size -= self._sizes.pop(obj_id, 0)
+        self._unsized.add(obj_id)
+
+    def total_size(self, prefix: str = "") -> int:
+        if not prefix:
+            for obj_id in list(self._unsized):
+                self.size_of(next(iter(self._holders[obj_id])))
+            return self._total_size
+        seen: Set[int] = set()
+        total = 0
+        for p, obj in self._objects.items():
+            if p.startswith(prefix) and id(obj) not in seen:
+                seen.add(id(obj))
+                total += self.size_of(p)
+        return total
+
+    def is_spilled(self, pth: str) -> bool:
+        return pth in self._spilled
+
+    # Pinning and eviction
+
+    def pin(self, pth: str):
+        self._pinned.add(pth)
+
+    def unpin(self, pth: str):
+        self._pinned.discard(pth)
+
+    def evict(self):
+        if self.capacity is None or not self._objects:
+            return
+        # Never the object just used
+        recent = id(next(reversed(self._objects.values())))
+        # Least recently used first. Objects that can't be spilled are moved
+        # to the back, so each path is looked at (at most) once
+        for _ in range(len(self._objects)):
+            if not self._objects or self.total_size() <= self.capacity:
+                return
+            pth, obj = next(iter(self._objects.items()))
+            # Only frees memory if every path holding it is spilled
+            holding = list(self._holders[id(obj)])
+            if (
+                id(obj) == recent
+                or not is_spillable(obj)
+                or any(p in self._pinned for p in holding)
+                or not self._spill(holding)
+            ):
+                self._objects.move_to_end(pth)
+
+    def _spill(self, pths: List[str]) -> bool:
+        obj = self._objects[pths[0]]
+        if isinstance(obj, ChunkedObject):
+            obj = obj.combine()
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="dcp_spill_")
+        self._spill_count += 1
+        file_pth = os.path.join(self._spill_dir, str(self._spill_count))
+        try:
+            if pa is not None and isinstance(obj, pa.Table):
+                file_pth += ".arrow"
+                with pa.OSFile(file_pth, "wb") as f:
+                    with pa.ipc.new_file(f, obj.schema) as writer:
+                        writer.write_table(obj)
+            else:
+                file_pth += ".pickle"
+                with open(file_pth, "wb") as f:
+                    pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # Can't be spilled, keep it in memory
+            if os.path.exists(file_pth):
+                os.remove(file_pth)
+            return False
+        for pth in pths:
+            self._discard(pth)
+            self._spilled[pth] = file_pth
+        self._spill_files[file_pth] = set(pths)
+        return True
+
+    def _reload(self, pth: str) -> Any:
+        file_pth = self._spilled[pth]
+        obj = self._load(file_pth)
+        # Every path that held it holds the same object again
+        for p in self._spill_files.pop(file_pth):
+            del self._spilled[p]
+            self._add(p, obj)
+        self._objects.move_to_end(pth)
+        os.remove(file_pth)
+        self.evict()
+        return obj
+
+    def _load(self, file_pth: str) -> Any:
+        if file_pth.endswith(".arrow"):
+            # Memory mapped, so only read as it's used. The mapping outlives
+            # the (closed) file for as long as the table does
+            with pa.memory_map(file_pth) as source:
+                return pa.ipc.open_file(source).read_all()
+        with open(file_pth, "rb") as f:
+            return pickle.load(f)
+
+    def _remove_spilled(self, pth: str):
+        file_pth = self._spilled.pop(pth, None)
+        if file_pth is None:
+            return
+        pths = self._spill_files[file_pth]
+        pths.discard(pth)
+        if pths:
+            return
+        del self._spill_files[file_pth]
+        if os.path.exists(file_pth):
+            os.remove(file_pth)
@@ -12,6 +12,7 @@ from datetime import date, datetime, time, timedelta
 from enum import Enum
 from typing import (
     Any,
+    Callable,
     Dict,
     Generic,
     Iterable,
@@ -122,7 +123,70 @@ def ensure_list(x: Any) -> List:
     return [x]
 
 
-def ensure_datetime(x: Optional[Union[str, datetime]]) -> Optional[datetime]:
+# Formats tried (in order) by `infer_datetime_format`. All parse to the same
+# value dateutil would give. ISO_FORMAT means `fromisoformat`.
+ISO_FORMAT = "iso"
+# Iso last: what fromisoformat accepts varies by python version (eg a trailing
+# Z from 3.11), so explicit formats go first to infer the same on every version
+DATETIME_FORMATS = [
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%d %H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%Y-%m-%d %H:%M:%S.%f%z",
+    "%Y/%m/%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%m/%d/%Y",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S",
+    "%Y%m%d",
+    ISO_FORMAT,
+]
+TIME_FORMATS = ["%H:%M:%S", "%H:%M", "%I:%M %p", "%I:%M:%S %p", ISO_FORMAT]
+DATETIME_FORMAT_SAMPLE_SIZE = 100
+
+
+def parse_datetime_with_format(x: str, fmt: str) -> datetime:
+    if fmt == ISO_FORMAT:
+        return datetime.fromisoformat(x)
+    return datetime.strptime(x, fmt)
+
+
+def parse_time_with_format(x: str, fmt: str) -> time:
+    if fmt == ISO_FORMAT:
+        return time.fromisoformat(x)
+    return datetime.strptime(x, fmt).time()
+
+
+def infer_datetime_format(
+    values: Iterable[Any],
+    formats: List[str] = DATETIME_FORMATS,
+    parse: Callable[[str, str], Any] = parse_datetime_with_format,
+) -> Optional[str]:
+    """
+    First of `formats` that parses every string in (a sample of) `values`, or
+    None if there are no strings or no format fits them all.
+    """
+    sample = []
+    for v in values:
+        if isinstance(v, str) and v and v not in NULLISH_STRINGS:
+            sample.append(v)
+            if len(sample) >= DATETIME_FORMAT_SAMPLE_SIZE:
+                break
+    if not sample:
+        return None
+    for fmt in formats:
+        try:
+            for v in sample:
+                parse(v, fmt)
+        except ValueError:
+            continue
+        return fmt
+    return None
+
+
+def ensure_datetime(
+    x: Optional[Union[str, datetime]], fmt: Optional[str] = None
+) -> Optional[datetime]:
     if x is None:
         return None
     if isinstance(x, datetime):
@@ -131,24 +195,44 @@ def ensure_datetime(x: Optional[Union[str, datetime]]) -> Optional[datetime]:
         return datetime.combine(x, datetime.min.time())
     if isinstance(x, int):
         return datetime.utcfromtimestamp(x)
+    if fmt is not None and isinstance(x, str):
+        try:
+            return parse_datetime_with_format(x, fmt)
+        except ValueError:
+            # Fall back to dateutil
+            pass
     return parser.parse(x)
 
 
-def ensure_date(x: Optional[Union[str, date]]) -> Optional[date]:
+def ensure_date(
+    x: Optional[Union[str, date]], fmt: Optional[str] = None
+) -> Optional[date]:
     if x is None:
         return None
     if isinstance(x, datetime):
         return x.date()
     if isinstance(x, date):
         return x
+    if fmt is not None and isinstance(x, str):
+        try:
+            return parse_datetime_with_format(x, fmt).date()
+        except ValueError:
+            pass
     return parser.parse(x).date()
 
 
-def ensure_time(x: Optional[Union[str, time]]) -> Optional[time]:
+def ensure_time(
+    x: Optional[Union[str, time]], fmt: Optional[str] = None
+) -> Optional[time]:
     if x is None:
         return None
     if isinstance(x, time):
         return x
+    if fmt is not None and isinstance(x, str):
+        try:
+            return parse_time_with_format(x, fmt)
+        except ValueError:
+            pass
     return parser.parse(x).time()
 
 
@@ -179,9 +263,14 @@ def ensure_bool(x: Optional[Union[str, bool]]) -> Optional[bool]:
     raise TypeError(x)
 
 
+NULLISH_STRINGS = frozenset(
+    ["None", "null", "na", "", "NULL", "NA", "N/A", "0000-00-00"]
+)
+
+
 def is_nullish(
     o: Any,
-    null_strings=set(["None", "null", "na", "", "NULL", "NA", "N/A", "0000-00-00"]),
+    null_strings=NULLISH_STRINGS,
 ) -> bool:
     # TOOD: is "na" too aggressive?
     if o is None:
@@ -30,6 +30,14 @@ from dcp.utils.common import DcpJsonEncoder, is_nullish, title_to_snake_case
 from loguru import logger
 from pandas import Timestamp, isnull
 
+try:
+    import orjson
+
+    ORJSON_SUPPORTED = True
+except ImportError:
+    orjson = None
+    ORJSON_SUPPORTED = False
+
 T = TypeVar("T")
 
 
@@ -175,8 +183,20 @@ def write_csv(
         writer.writerow(row)
 
 
-def read_json(j: str) -> Union[Dict, List]:
-    return json.loads(j)  # TODO: de-serializer
+def read_json(j: AnyStr) -> Union[Dict, List]:
+    if orjson is not None:
+        try:
+            return orjson.loads(j)
+        except orjson.JSONDecodeError:
+            # orjson is stricter (no NaN, no ints > 64 bit), so fall through
+            pass
+    return json.loads(j)
+
+
+def read_json_lines(lines: Iterable[AnyStr]) -> Iterator[Dict]:
+    for ln in lines:
+        if ln.strip():
+            yield read_json(ln)
 
 
 def conform_records_for_insert(
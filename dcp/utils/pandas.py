@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
 import pandas as pd
 from commonmodel import Schema
@@ -59,11 +59,35 @@ def empty_dataframe_for_schema(schema: Schema) -> DataFrame:
 #     return conform_dataframe_to_schema(df, schema)
 
 
+def series_to_pylist(s: Series) -> List:
+    # Python objects (numpy ints -> int etc), nulls -> None
+    if pd.api.types.is_datetime64_any_dtype(s.dtype):
+        # Plain datetimes are much cheaper to create than Timestamps
+        values = s.dt.to_pydatetime()
+        if s.hasnans:
+            values[s.isna().to_numpy()] = None
+        return values.tolist()
+    return s.to_numpy(dtype=object, na_value=None).tolist()
+
+
 def dataframe_to_records(df: DataFrame) -> List[Dict]:
-    # TODO
-    for c in df:
-        dfc = df[c].astype(object)
-        dfc.loc[pd.isna(dfc)] = None
-        del df[c]
-        df[c] = dfc
-    return df.to_dict(orient="records")
+    """
+    Converts a column at a time, without modifying `df`
+    """
+    columns = list(df.columns)
+    values = [series_to_pylist(df.iloc[:, i]) for i in range(len(columns))]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+DEFAULT_RECORDS_CHUNK_SIZE = 10_000
+
+
+def iter_dataframe_records(
+    df: DataFrame, chunk_size: int = DEFAULT_RECORDS_CHUNK_SIZE
+) -> Iterator[List[Dict]]:
+    """
+    Yields `dataframe_to_records` in chunks, so the full records list is never
+    built
+    """
+    for i in range(0, len(df), chunk_size):
+        yield dataframe_to_records(df.iloc[i : i + chunk_size])
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+import clevercsv as csv
+import pandas as pd
+
+from dcp.utils.common import NULLISH_STRINGS
+from dcp.utils.data import infer_csv_dialect, read_csv, read_json_lines
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.json as pa_json
+
+    PYARROW_SUPPORTED = True
+except ImportError:
+    PYARROW_SUPPORTED = False
+    pa = None
+    pa_csv = None
+    pa_json = None
+
+# Files smaller than this aren't worth the process pool overhead
+PARALLEL_READ_MIN_BYTES = 64 * 1024 * 1024
+MIN_RANGE_BYTES = 16 * 1024 * 1024
+SCAN_BLOCK_BYTES = 1024 * 1024
+OUTPUT_FORMATS = ("records", "dataframe", "arrow")
+# Fork isn't safe once the parent has threads (eg db connection pools)
+DEFAULT_START_METHOD = "spawn"
+
+ByteRange = Tuple[int, int]
+
+
+def _count_in_range(f: io.BufferedReader, start: int, end: int, char: bytes) -> int:
+    f.seek(start)
+    cnt = 0
+    while start < end:
+        b = f.read(min(SCAN_BLOCK_BYTES, end - start))
+        if not b:
+            break
+        cnt += b.count(char)
+        start += len(b)
+    return cnt
+
+
+def _next_record_boundary(
+    f: io.BufferedReader, pos: int, in_quotes: bool, quotechar: Optional[bytes]
+) -> Optional[int]:
+    # First newline at or after pos that is not inside a quoted value
+    f.seek(pos)
+    while True:
+        b = f.read(SCAN_BLOCK_BYTES)
+        if not b:
+            return None
+        i = 0
+        while True:
+            nl = b.find(b"\n", i)
+            if nl < 0:
+                break
+            if quotechar:
+                in_quotes ^= b.count(quotechar, i, nl) % 2 == 1
+            if not in_quotes:
+                return pos + nl + 1
+            i = nl + 1
+        if quotechar:
+            in_quotes ^= b.count(quotechar, i) % 2 == 1
+        pos += len(b)
+
+
+def read_header_record(
+    f: io.BufferedReader, quotechar: Optional[str], first_line: bytes = b""
+) -> bytes:
+    """
+    Reads the header record, which may span lines if a quoted value has a
+    newline (same quote parity rule as `_next_record_boundary`, without seeking).
+    """
+    qc = quotechar.encode() if quotechar else None
+    header = first_line or f.readline()
+    while qc and header.count(qc) % 2 == 1:
+        ln = f.readline()
+        if not ln:
+            break
+        header += ln
+    return header
+
+
+def split_byte_ranges(
+    path: str, n_ranges: int, start: int = 0, quotechar: Optional[str] = None
+) -> List[ByteRange]:
+    """
+    Splits file into ~equal byte ranges, each aligned to a record boundary.
+    If `quotechar` is given (csv), newlines inside quoted values are skipped by
+    tracking quote parity from `start`, which must itself be a record boundary.
+    """
+    size = os.path.getsize(path)
+    if n_ranges <= 1 or size <= start:
+        return [(start, size)]
+    qc = quotechar.encode() if quotechar else None
+    step = (size - start) // n_ranges
+    boundaries = [start]
+    with open(path, "rb") as f:
+        for i in range(1, n_ranges):
+            prev = boundaries[-1]
+            target = start + step * i
+            if target <= prev:
+                continue
+            in_quotes = False
+            if qc:
+                in_quotes = _count_in_range(f, prev, target, qc) % 2 == 1
+            boundary = _next_record_boundary(f, target, in_quotes, qc)
+            if boundary is None or boundary >= size:
+                break
+            boundaries.append(boundary)
+    boundaries.append(size)
+    return [(s, e) for s, e in zip(boundaries[:-1], boundaries[1:]) if e > s]
+
+
+def _read_range(path: str, start: int, end: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start)
+
+
+def get_arrow_csv_options(
+    header: bytes, dialect_params: Tuple
+) -> Tuple[List[str], pa_csv.ParseOptions, pa_csv.ConvertOptions]:
+    delimiter, quotechar, escapechar = dialect_params
+    names = next(csv.reader(io.StringIO(header.decode()), delimiter=delimiter))
+    parse_options = pa_csv.ParseOptions(
+        delimiter=delimiter,
+        quote_char=quotechar or False,
+        escape_char=escapechar or False,
+        newlines_in_values=True,
+    )
+    # Csv has no types, keep everything as (nullable) strings like read_csv
+    convert_options = pa_csv.ConvertOptions(
+        column_types={n: pa.string() for n in names},
+        null_values=list(NULLISH_STRINGS),
+        strings_can_be_null=True,
+    )
+    return names, parse_options, convert_options
+
+
+def iter_arrow_csv_batches(
+    f: io.BufferedReader, block_size: int = SCAN_BLOCK_BYTES
+) -> Iterator[pa.RecordBatch]:
+    """
+    Streams a csv file (positioned at its header) as arrow batches of strings,
+    holding one block in memory at a time.
+    """
+    if not PYARROW_SUPPORTED:
+        raise ImportError("Pyarrow is not installed")
+    # Peek (doesn't consume) for a sample, so this works on unseekable streams
+    sample = f.peek(SCAN_BLOCK_BYTES) if hasattr(f, "peek") else b""
+    first_line = b""
+    if not sample:
+        # Can't peek, so sniff the first line
+        sample = first_line = f.readline()
+    dialect = infer_csv_dialect(sample.decode(errors="ignore"))
+    header = read_header_record(f, dialect.quotechar, first_line)
+    if not header.strip():
+        return
+    names, parse_options, convert_options = get_arrow_csv_options(
+        header, (dialect.delimiter, dialect.quotechar, dialect.escapechar)
+    )
+    yield from pa_csv.open_csv(
+        f,
+        read_options=pa_csv.ReadOptions(column_names=names, block_size=block_size),
+        parse_options=parse_options,
+        convert_options=convert_options,
+    )
+
+
+def _parse_csv_range(args: Tuple) -> Any:
+    path, (start, end), header, dialect_params, output = args
+    data = header + _read_range(path, start, end)
+    if output == "arrow":
+        _, parse_options, convert_options = get_arrow_csv_options(
+            header, dialect_params
+        )
+        return pa_csv.read_csv(
+            io.BytesIO(data),
+            parse_options=parse_options,
+            convert_options=convert_options,
+        )
+    dialect = csv.dialect.SimpleDialect(*dialect_params)
+    records = list(read_csv(io.StringIO(data.decode(), newline=None), dialect=dialect))
+    if output == "dataframe":
+        return pd.DataFrame(records)
+    return records
+
+
+def _parse_json_lines_range(args: Tuple) -> Any:
+    path, (start, end), output = args
+    data = _read_range(path, start, end)
+    if output == "arrow":
+        return pa_json.read_json(io.BytesIO(data))
+    records = list(read_json_lines(data.splitlines()))
+    if output == "dataframe":
+        return pd.DataFrame(records)
+    return records
+
+
+def concat_arrow_tables(tables: List[pa.Table]) -> pa.Table:
+    # Ranges are typed independently, so allow promotion (eg null -> int)
+    try:
+        return pa.concat_tables(tables, promote_options="permissive")
+    except TypeError:
+        # pyarrow < 14
+        return pa.concat_tables(tables, promote=True)
+
+
+def _combine(parts: List[Any], output: str) -> Any:
+    if output == "arrow":
+        return concat_arrow_tables(parts)
+    if output == "dataframe":
+        return pd.concat(parts, ignore_index=True)
+    return list(chain.from_iterable(parts))
+
+
+def _map_ranges(
+    fn: Callable, args: List[Tuple], max_workers: int, start_method: str
+) -> List[Any]:
+    if len(args) == 1:
+        return [fn(args[0])]
+    mp_context = multiprocessing.get_context(start_method)
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=mp_context
+    ) as executor:
+        # map preserves order, so records come back in file order
+        return list(executor.map(fn, args))
+
+
+def _get_n_ranges(
+    size: int, max_workers: Optional[int], min_range_bytes: int
+) -> Tuple[int, int]:
+    max_workers = max_workers or os.cpu_count() or 1
+    return max(1, min(max_workers, size // max(min_range_bytes, 1))), max_workers
+
+
+def _check_output(output: str):
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(f"output must be one of {OUTPUT_FORMATS}")
+    if output == "arrow" and not PYARROW_SUPPORTED:
+        raise ImportError("Pyarrow is not installed")
+
+
+def read_csv_file_parallel(
+    path: str,
+    output: str = "records",
+    max_workers: Optional[int] = None,
+    min_range_bytes: int = MIN_RANGE_BYTES,
+    start_method: str = DEFAULT_START_METHOD,
+) -> Any:
+    """
+    Parses a local (uncompressed) csv file in record-aligned byte ranges on a
+    process pool, returning records, a DataFrame or an Arrow table in file order.
+    """
+    _check_output(output)
+    with open(path, "rb") as f:
+        sample = f.read(SCAN_BLOCK_BYTES)
+    dialect = infer_csv_dialect(sample.decode(errors="ignore"))
+    dialect_params = (dialect.delimiter, dialect.quotechar, dialect.escapechar)
+    qc = dialect.quotechar.encode() if dialect.quotechar else None
+    with open(path, "rb") as f:
+        # The header is a record too, and may have quoted newlines
+        start = _next_record_boundary(f, 0, False, qc) or os.path.getsize(path)
+        f.seek(0)
+        header = f.read(start)
+    n_ranges, max_workers = _get_n_ranges(
+        os.path.getsize(path), max_workers, min_range_bytes
+    )
+    ranges = split_byte_ranges(path, n_ranges, start, quotechar=dialect.quotechar)
+    args = [(path, r, header, dialect_params, output) for r in ranges]
+    parts = _map_ranges(_parse_csv_range, args, max_workers, start_method)
+    return _combine(parts, output)
+
+
+def read_json_lines_file_parallel(
+    path: str,
+    output: str = "records",
+    max_workers: Optional[int] = None,
+    min_range_bytes: int = MIN_RANGE_BYTES,
+    start_method: str = DEFAULT_START_METHOD,
+) -> Any:
+    """
+    Parses a local (uncompressed) json lines file in line-aligned byte ranges
+    on a process pool, returning records, a DataFrame or an Arrow table in file order.
+    """
+    _check_output(output)
+    n_ranges, max_workers = _get_n_ranges(
+        os.path.getsize(path), max_workers, min_range_bytes
+    )
+    ranges = split_byte_ranges(path, n_ranges)
+    args = [(path, r, output) for r in ranges]
+    parts = _map_ranges(_parse_json_lines_range, args, max_workers, start_method)
+    return _combine(parts, output)
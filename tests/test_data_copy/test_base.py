@@ -106,7 +106,14 @@ def test_data_copy_lookup():
                 StorageFormat(SqliteStorageEngine, DatabaseTableFormat),
                 StorageFormat(LocalPythonStorageEngine, ArrowTableFormat),
             ),
-            3,
+            2,
+        ),
+        (
+            (
+                StorageFormat(LocalPythonStorageEngine, ArrowTableFormat),
+                StorageFormat(LocalPythonStorageEngine, RecordsFormat),
+            ),
+            1,
         ),
     ],
 )
@@ -7,14 +7,19 @@ from typing import Type
 import pytest
 
 from dcp.data_copy.base import CopyRequest
-from dcp.data_copy.copiers.to_database.file_to_database import CsvFileToDatabaseTable
+from dcp.data_copy.copiers.to_database.file_to_database import (
+    CsvFileToDatabaseTable,
+    JsonLinesFileToDatabaseTable,
+)
 from dcp.data_format.formats.database.base import DatabaseTableFormat
 from dcp.storage.base import (
     Storage,
     ensure_storage_object,
 )
 from dcp.storage.database.api import DatabaseApi
+from dcp.storage.database.engines.sqlite import SqliteDatabaseStorageApi
 from dcp.storage.file_system.engines.base import FileSystemStorageApi
+from dcp.utils.common import rand_str, to_json
 from tests.utils import (
     conformed_test_records,
     csv_lines,
@@ -67,3 +72,26 @@ def test_file_to_db(url):
                 assert [dict(r) for r in res] == test_records_json_str
             else:
                 assert [dict(r) for r in res] == conformed_test_records_json_str
+
+
+def test_json_lines_file_to_db():
+    dr = tempfile.gettempdir()
+    from_s: Storage = Storage.from_url(f"file://{dr}")
+    fs_api: FileSystemStorageApi = from_s.get_filesystem_api()
+    name = f"_test_{rand_str()}"
+    fs_api.write_lines_to_file(name, [to_json(r) for r in test_records])
+    with SqliteDatabaseStorageApi.temp_local_database() as db_url:
+        db_s = Storage.from_url(db_url)
+        db_api = db_s.get_database_api()
+        from_so = ensure_storage_object(name, storage=from_s)
+        to_so = ensure_storage_object(
+            name,
+            storage=db_s,
+            _data_format=DatabaseTableFormat,
+            _schema=test_records_schema,
+        )
+        copier = JsonLinesFileToDatabaseTable()
+        copier.chunk_size = 3
+        copier.copy(CopyRequest(from_so, to_so))
+        with db_api.execute_sql_result(f"select * from {name}") as res:
+            assert [dict(r) for r in res] == test_records_json_str
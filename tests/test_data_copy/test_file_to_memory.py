@@ -3,19 +3,40 @@ from __future__ import annotations
 import tempfile
 
 import pyarrow as pa
+import pyarrow.parquet as pq
+from commonmodel.base import create_quick_schema
 
 from dcp.data_copy.base import CopyRequest
+from dcp.data_copy.copiers.to_file.memory_to_file import (
+    ArrowBatchIteratorToJsonLinesFile,
+    ArrowBatchIteratorToParquetFile,
+)
 from dcp.data_copy.copiers.to_memory.file_to_memory import (
+    CsvFileToArrowBatchIterator,
     CsvFileToRecords,
     JsonLinesFileToArrowTable,
+    JsonLinesFileToRecords,
+    JsonLinesFileToRecordsIterator,
+    ParquetFileToArrowTable,
+    ParquetFileToDataFrame,
+)
+from dcp.data_format.formats.file_system.json_lines_file import JsonLinesFileFormat
+from dcp.data_format.formats.file_system.parquet_file import ParquetFileFormat
+from dcp.data_format.formats.memory.arrow_batch_iterator import (
+    ArrowBatchIteratorFormat,
 )
 from dcp.data_format.formats.memory.arrow_table import ArrowTableFormat
+from dcp.data_format.formats.memory.dataframe import DataFrameFormat
 from dcp.data_format.formats.memory.records import RecordsFormat
+from dcp.data_format.formats.memory.records_iterator import RecordsIteratorFormat
 from dcp.storage.base import (
     Storage,
     ensure_storage_object,
 )
 from dcp.storage.memory.engines.python import new_local_python_storage
+from dcp.utils.common import rand_str
+from dcp.utils.data import read_json_lines
+from dcp.utils.pandas import assert_dataframes_are_almost_equal
 from tests.utils import test_records_schema
 
 
@@ -48,3 +69,131 @@ def test_file_to_mem():
     JsonLinesFileToArrowTable().copy(req)
     expected = pa.Table.from_pydict({"f1": ["hi"], "f2": [2]})
     assert mem_api.get(name) == expected
+
+
+def test_file_to_mem_parallel_read_opt_in(monkeypatch):
+    from dcp.data_copy.copiers.to_memory import file_to_memory
+
+    calls = []
+
+    def read_parallel(pth, max_workers=None):
+        calls.append(max_workers)
+        return [{"f1": "hi", "f2": 2}]
+
+    monkeypatch.setattr(file_to_memory, "read_csv_file_parallel", read_parallel)
+    dr = tempfile.gettempdir()
+    s: Storage = Storage.from_url(f"file://{dr}")
+    s.get_filesystem_api().write_lines_to_file("_test_par", ["f1,f2", "hi,2"])
+    mem_s = new_local_python_storage()
+    from_so = ensure_storage_object("_test_par", storage=s)
+    copier = CsvFileToRecords()
+    for name in ["default", "parallel"]:
+        to_so = ensure_storage_object(
+            name, storage=mem_s, _data_format=RecordsFormat, _schema=test_records_schema
+        )
+        copier.copy(CopyRequest(from_so, to_so))
+        assert mem_s.get_memory_api().get(name) == [{"f1": "hi", "f2": 2}]
+        # Stays in process unless opted in
+        copier.parallel_read_min_bytes = 0
+        copier.parallel_read_max_workers = 2
+    assert calls == [2]
+
+
+def test_parquet_file_to_mem():
+    dr = tempfile.gettempdir()
+    s: Storage = Storage.from_url(f"file://{dr}")
+    fs_api = s.get_filesystem_api()
+    mem_s = new_local_python_storage()
+    mem_api = mem_s.get_memory_api()
+    name = f"_test_{rand_str()}.parquet"
+    table = pa.Table.from_pydict({"f1": ["hi", "bye"], "f2": [1, 2], "f3": [1.0, 2.0]})
+    with fs_api.open(name, "wb") as f:
+        pq.write_table(table, f, row_group_size=1)
+    from_so = ensure_storage_object(name, storage=s)
+    assert from_so.get_data_format() is ParquetFileFormat
+    assert from_so.get_schema().field_names() == ["f1", "f2", "f3"]
+    assert from_so.format_handler.get_record_count(from_so) == 2
+
+    # Arrow, projected to the to-schema's fields
+    schema = create_quick_schema("ParquetSchema", [("f1", "Text"), ("f2", "Integer")])
+    to_so = ensure_storage_object(
+        name, storage=mem_s, _data_format=ArrowTableFormat, _schema=schema
+    )
+    ParquetFileToArrowTable().copy(CopyRequest(from_so, to_so))
+    assert mem_api.get(name) == table.select(["f1", "f2"])
+
+    # DataFrame
+    to_so = ensure_storage_object(name, storage=mem_s, _data_format=DataFrameFormat)
+    ParquetFileToDataFrame().copy(CopyRequest(from_so, to_so, if_exists="replace"))
+    assert_dataframes_are_almost_equal(mem_api.get(name), table.to_pandas())
+
+
+def test_json_lines_file_to_mem():
+    dr = tempfile.gettempdir()
+    s: Storage = Storage.from_url(f"file://{dr}")
+    fs_api = s.get_filesystem_api()
+    mem_s = new_local_python_storage()
+    mem_api = mem_s.get_memory_api()
+    name = f"_test_{rand_str()}.jsonl.gz"
+    fs_api.write_lines_to_file(name, ['{"f1":"hi","f2":2}', "", '{"f1":"bye","f2":3}'])
+    records_obj = [{"f1": "hi", "f2": 2}, {"f1": "bye", "f2": 3}]
+    from_so = ensure_storage_object(name, storage=s)
+
+    to_so = ensure_storage_object(
+        "records", storage=mem_s, _data_format=RecordsFormat, _schema=test_records_schema
+    )
+    JsonLinesFileToRecords().copy(CopyRequest(from_so, to_so))
+    assert mem_api.get("records") == records_obj
+
+    to_so = ensure_storage_object(
+        "iterator", storage=mem_s, _data_format=RecordsIteratorFormat
+    )
+    JsonLinesFileToRecordsIterator().copy(CopyRequest(from_so, to_so))
+    assert list(mem_api.get("iterator")) == records_obj
+
+    # Compressed, non-local style read (no f.name)
+    to_so = ensure_storage_object(
+        "arrow", storage=mem_s, _data_format=ArrowTableFormat, _schema=test_records_schema
+    )
+    JsonLinesFileToArrowTable().copy(CopyRequest(from_so, to_so))
+    assert mem_api.get("arrow") == pa.Table.from_pylist(records_obj)
+
+
+def test_arrow_batch_iterator_file_to_file():
+    dr = tempfile.gettempdir()
+    s: Storage = Storage.from_url(f"file://{dr}")
+    fs_api = s.get_filesystem_api()
+    mem_s = new_local_python_storage()
+    schema = create_quick_schema("CsvSchema", [("f1", "Text"), ("f2", "Integer")])
+    name = f"_test_{rand_str()}.csv"
+    fs_api.write_lines_to_file(name, ["f1,f2", "hi,2", "bye,3"])
+    from_so = ensure_storage_object(name, storage=s)
+    itr_so = ensure_storage_object(
+        "batches",
+        storage=mem_s,
+        _data_format=ArrowBatchIteratorFormat,
+        _schema=schema,
+    )
+    CsvFileToArrowBatchIterator().copy(CopyRequest(from_so, itr_so))
+
+    # Parquet, batch by batch, cast to the schema on the way
+    pq_name = f"_test_{rand_str()}.parquet"
+    to_so = ensure_storage_object(
+        pq_name, storage=s, _data_format=ParquetFileFormat, _schema=schema
+    )
+    ArrowBatchIteratorToParquetFile().copy(CopyRequest(itr_so, to_so))
+    with fs_api.open(pq_name, "rb") as f:
+        table = pq.read_table(f)
+    assert table.to_pylist() == [{"f1": "hi", "f2": 2}, {"f1": "bye", "f2": 3}]
+
+    # Json lines
+    CsvFileToArrowBatchIterator().copy(
+        CopyRequest(from_so, itr_so, if_exists="replace")
+    )
+    jl_name = f"_test_{rand_str()}.jsonl"
+    to_so = ensure_storage_object(
+        jl_name, storage=s, _data_format=JsonLinesFileFormat, _schema=schema
+    )
+    ArrowBatchIteratorToJsonLinesFile().copy(CopyRequest(itr_so, to_so))
+    with fs_api.open(jl_name) as f:
+        assert list(read_json_lines(f)) == table.to_pylist()
@@ -7,13 +7,18 @@ from typing import Type
 import pytest
 
 from dcp.data_copy.base import CopyRequest
-from dcp.data_copy.copiers.to_database.memory_to_database import RecordsToDatabaseTable
+from dcp.data_copy.copiers.to_database.memory_to_database import (
+    RecordsIteratorToDatabaseTable,
+    RecordsToDatabaseTable,
+)
 from dcp.data_format.formats.database.base import DatabaseTableFormat
+from dcp.data_format.formats.memory.records_iterator import RecordsIterator
 from dcp.storage.base import (
     Storage,
     ensure_storage_object,
 )
 from dcp.storage.database.api import DatabaseApi
+from dcp.storage.database.engines.sqlite import SqliteDatabaseApi
 from dcp.storage.memory.engines.python import new_local_python_storage
 from tests.utils import (
     conformed_test_records,
@@ -62,3 +67,23 @@ def test_records_to_db(url):
                 assert [dict(r) for r in res] == test_records_json_str
             else:
                 assert [dict(r) for r in res] == conformed_test_records_json_str
+
+
+def test_records_iterator_to_db():
+    mem_s = new_local_python_storage()
+    mem_api = mem_s.get_memory_api()
+    closed = []
+    records = [{"f1": "hi", "f2": i} for i in range(25)]
+    mem_api.put("_test", RecordsIterator(iter(records), lambda: closed.append(True)))
+    with SqliteDatabaseApi.temp_local_database() as db_url:
+        db_s = Storage.from_url(db_url)
+        from_so = ensure_storage_object("_test", storage=mem_s)
+        to_so = ensure_storage_object(
+            "_test", storage=db_s, _data_format=DatabaseTableFormat
+        )
+        copier = RecordsIteratorToDatabaseTable()
+        copier.chunk_size = 10
+        copier.copy(CopyRequest(from_so, to_so))
+        with db_s.get_database_api().execute_sql_result("select * from _test") as res:
+            assert [dict(r) for r in res] == records
+    assert closed
@@ -2,10 +2,23 @@ from __future__ import annotations
 
 import tempfile
 
+import pyarrow as pa
+import pyarrow.parquet as pq
+
 from dcp.data_copy.base import CopyRequest
-from dcp.data_copy.copiers.to_file.memory_to_file import RecordsToCsvFile
+from dcp.data_copy.copiers.to_file.memory_to_file import (
+    ArrowTableToArrowFile,
+    ArrowTableToParquetFile,
+    RecordsIteratorToCsvFile,
+    RecordsToCsvFile,
+)
+from dcp.data_copy.copiers.to_memory.file_to_memory import ArrowFileToArrowTable
+from dcp.data_format.formats.file_system.arrow_file import ArrowFileFormat
 from dcp.data_format.formats.file_system.csv_file import CsvFileFormat
+from dcp.data_format.formats.file_system.parquet_file import ParquetFileFormat
+from dcp.data_format.formats.memory.arrow_table import ArrowTableFormat
 from dcp.data_format.formats.memory.records import RecordsFormat
+from dcp.data_format.formats.memory.records_iterator import RecordsIteratorFormat
 from dcp.data_format.handler import get_handler
 from dcp.storage.base import (
     Storage,
@@ -49,6 +62,29 @@ def test_records_to_file():
         assert recs == obj
 
 
+def test_records_iterator_to_csv_file_columns():
+    dr = tempfile.gettempdir()
+    s: Storage = Storage.from_url(f"file://{dr}")
+    mem_s = new_local_python_storage()
+    name = f"_test_{rand_str()}.csv"
+    # Chunks start with records in a different key order, or missing keys
+    records = [{"a": "1", "b": "2"}, {"b": "4", "a": "3"}, {"b": "6"}]
+    mem_s.get_memory_api().put(name, iter(records))
+    from_so = ensure_storage_object(
+        name, storage=mem_s, _data_format=RecordsIteratorFormat
+    )
+    to_so = ensure_storage_object(name, storage=s, _data_format=CsvFileFormat)
+    copier = RecordsIteratorToCsvFile()
+    copier.chunk_size = 1
+    copier.copy(CopyRequest(from_so, to_so))
+    with s.get_filesystem_api().open(name, newline="") as f:
+        assert list(read_csv(f)) == [
+            {"a": "1", "b": "2"},
+            {"a": "3", "b": "4"},
+            {"a": None, "b": "6"},
+        ]
+
+
 # def test_obj_to_file():
 #     dr = tempfile.gettempdir()
 #     s: Storage = Storage.from_url(f"file://{dr}")
@@ -92,3 +128,44 @@ def test_records_to_file():
 #         recs = [json.loads(ln) for ln in f.readlines()]
 #         recs = RecordsFormat.conform_records_to_schema(recs, TestSchema4)
 #         assert recs == obj
+
+
+def test_arrow_to_parquet_file():
+    dr = tempfile.gettempdir()
+    s: Storage = Storage.from_url(f"file://{dr}")
+    fs_api: FileSystemStorageApi = s.get_api()
+    mem_s = new_local_python_storage()
+    mem_api: PythonStorageApi = mem_s.get_api()
+    name = f"_test_{rand_str()}"
+    table = pa.Table.from_pydict({"f1": ["hi", "bye"], "f2": [1, 2]})
+    mem_api.put(name, table)
+    from_so = ensure_storage_object(name, storage=mem_s)
+    to_so = ensure_storage_object(name, storage=s, _data_format=ParquetFileFormat)
+    ArrowTableToParquetFile().copy(CopyRequest(from_so, to_so))
+    ArrowTableToParquetFile().copy(CopyRequest(from_so, to_so, if_exists="append"))
+    with fs_api.open(name, "rb") as f:
+        assert pq.read_table(f) == pa.concat_tables([table, table])
+
+
+def test_arrow_file_round_trip():
+    dr = tempfile.gettempdir()
+    s: Storage = Storage.from_url(f"file://{dr}")
+    mem_s = new_local_python_storage()
+    mem_api: PythonStorageApi = mem_s.get_api()
+    name = f"_test_{rand_str()}.arrow"
+    table = pa.Table.from_pydict({"f1": ["hi", "bye"], "f2": [1, 2]})
+    mem_api.put(name, table)
+    from_so = ensure_storage_object(name, storage=mem_s)
+    to_so = ensure_storage_object(name, storage=s, _data_format=ArrowFileFormat)
+    ArrowTableToArrowFile().copy(CopyRequest(from_so, to_so))
+    ArrowTableToArrowFile().copy(CopyRequest(from_so, to_so, if_exists="append"))
+
+    file_so = ensure_storage_object(name, storage=s)
+    assert file_so.get_data_format() is ArrowFileFormat
+    assert file_so.get_schema().field_names() == ["f1", "f2"]
+    assert file_so.format_handler.get_record_count(file_so) == 4
+    out_so = ensure_storage_object(
+        "output", storage=mem_s, _data_format=ArrowTableFormat
+    )
+    ArrowFileToArrowTable().copy(CopyRequest(file_so, out_so))
+    assert mem_api.get("output") == pa.concat_tables([table, table])
@@ -2,14 +2,29 @@ from __future__ import annotations
 
 from itertools import product
 
+import pandas as pd
 import pytest
 
 from dcp import ensure_storage_object
 from dcp.data_copy.base import CopyRequest
+from dcp.data_copy.copiers.to_memory.memory_to_memory import (
+    ArrowTableToDataFrame,
+    DataFrameToArrowTable,
+    RecordsToDataframe,
+    RecordsToRecords,
+)
+from dcp.data_format.formats.memory.arrow_table import ArrowTableFormat
+from dcp.data_format.formats.memory.columnar_records import ColumnarRecordsFormat
+from dcp.data_format.formats.memory.dataframe import DataFrameFormat
+from dcp.data_format.formats.memory.records import RecordsFormat
 from dcp.data_copy.graph import get_datacopy_lookup
-from dcp.storage.memory.engines.python import PythonStorageApi, new_local_python_storage
+from dcp.storage.memory.engines.python import (
+    LOCAL_PYTHON_STORAGE,
+    PythonStorageApi,
+    new_local_python_storage,
+)
 from tests.test_data_format import assert_objects_equal
-from tests.utils import dff, rf, rif, dfif, test_records_schema
+from tests.utils import af, dff, rf, rif, dfif, test_records_schema
 
 from_formats = [rf, dff]  # , af, dfif, rif, dlff]
 to_formats = [rf, dff]  # , af]
@@ -42,3 +57,99 @@ def test_mem_to_mem(from_fmt, to_fmt):
         to_name = to_name + str(i)
     to_name = from_name
     assert_objects_equal(mem_api.get(to_name), expected())
+
+
+def test_arrow_dataframe_round_trip():
+    pa = pytest.importorskip("pyarrow")
+    s = new_local_python_storage()
+    mem_api: PythonStorageApi = s.get_memory_api()
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}, index=[10, 11])
+    mem_api.put("_df", df)
+    df_so = ensure_storage_object("_df", storage=s)
+    at_so = ensure_storage_object(
+        "_at", storage=s, _data_format=ArrowTableFormat, _schema=df_so.get_schema()
+    )
+    for _ in range(2):
+        DataFrameToArrowTable().copy(CopyRequest(df_so, at_so, if_exists="append"))
+    table = mem_api.get("_at")
+    # No index column
+    assert table.column_names == ["a", "b"]
+    assert table.num_rows == 4
+    copier = ArrowTableToDataFrame()
+    copier.use_arrow_dtypes = True
+    out_so = ensure_storage_object(
+        "_out", storage=s, _data_format=DataFrameFormat, _schema=df_so.get_schema()
+    )
+    copier.copy(CopyRequest(at_so, out_so))
+    out = mem_api.get("_out")
+    assert out["a"].tolist() == [1, 2, 1, 2]
+    # Source table is untouched
+    assert mem_api.get("_at").equals(table)
+
+
+def test_append_chunks():
+    s = new_local_python_storage()
+    mem_api: PythonStorageApi = s.get_memory_api()
+    mem_api.put("_recs", [{"a": 1}, {"a": 2}])
+    recs_so = ensure_storage_object("_recs", storage=s)
+    schema = recs_so.get_schema()
+    df_so = ensure_storage_object(
+        "_df", storage=s, _data_format=DataFrameFormat, _schema=schema
+    )
+    copy_recs_so = ensure_storage_object(
+        "_recs_copy", storage=s, _data_format=RecordsFormat, _schema=schema
+    )
+    for _ in range(3):
+        RecordsToDataframe().copy(CopyRequest(recs_so, df_so, if_exists="append"))
+        RecordsToRecords().copy(CopyRequest(recs_so, copy_recs_so, if_exists="append"))
+    # Chunks aren't combined until read
+    assert len(LOCAL_PYTHON_STORAGE[mem_api.get_path("_df")].chunks) == 4
+    df = mem_api.get("_df")
+    assert df["a"].tolist() == [1, 2] * 3
+    assert mem_api.get("_df") is df
+    recs = mem_api.get("_recs_copy")
+    assert recs == [{"a": 1}, {"a": 2}] * 3
+    assert mem_api.get("_recs") == [{"a": 1}, {"a": 2}]
+
+
+def test_append_chunk_missing_column():
+    s = new_local_python_storage()
+    mem_api: PythonStorageApi = s.get_memory_api()
+    empty = pd.DataFrame({"a": pd.Series(dtype="Int64"), "b": pd.Series(dtype=str)})
+    mem_api.put("_df", empty)
+    mem_api.append("_df", pd.DataFrame({"a": [1, 2]}))
+    mem_api.append("_df", pd.DataFrame({"a": [3]}))
+    df = mem_api.get("_df")
+    # Schema columns (and their dtypes) from the empty frame are kept
+    assert list(df.columns) == ["a", "b"]
+    assert df["a"].tolist() == [1, 2, 3]
+    assert df["b"].isna().all() and df["b"].dtype == empty["b"].dtype
+
+
+@pytest.mark.parametrize("from_fmt", [rf, dff, af])
+def test_columnar_records_copies(from_fmt):
+    from_fmt, obj = from_fmt
+    s = new_local_python_storage()
+    mem_api: PythonStorageApi = s.get_memory_api()
+    mem_api.put("_from", obj())
+    from_so = ensure_storage_object("_from", storage=s)
+    columnar_so = ensure_storage_object(
+        "_columnar",
+        storage=s,
+        _data_format=ColumnarRecordsFormat,
+        _schema=test_records_schema,
+    )
+    req = CopyRequest(from_so, columnar_so)
+    pth = get_datacopy_lookup().get_lowest_cost_path(req.conversion)
+    assert len(pth.edges) == 1
+    pth.edges[0].copier.copy(req)
+    assert len(mem_api.get("_columnar")) == len(obj())
+    # And back again
+    to_so = ensure_storage_object(
+        "_to", storage=s, _data_format=from_fmt, _schema=test_records_schema
+    )
+    req = CopyRequest(columnar_so, to_so)
+    pth = get_datacopy_lookup().get_lowest_cost_path(req.conversion)
+    assert len(pth.edges) == 1
+    pth.edges[0].copier.copy(req)
+    assert_objects_equal(mem_api.get("_to"), obj())
@@ -1,9 +1,20 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Any
 
 import pytest
-from commonmodel.field_types import DEFAULT_FIELD_TYPE, Date, Integer, Text
+from commonmodel.base import create_quick_schema
+from commonmodel.field_types import (
+    DEFAULT_FIELD_TYPE,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    Integer,
+    Json,
+    Text,
+)
 from pandas.core.frame import DataFrame
 from pandas.core.series import Series
 
@@ -14,7 +25,18 @@ from dcp.data_format.base import (
     UnknownFormat,
 )
 from dcp.data_format.formats.database.base import DatabaseTableFormat
-from dcp.data_format.handler import get_handler
+from dcp.data_format.formats.memory.columnar_records import (
+    ColumnarRecords,
+    ColumnarRecordsFormat,
+)
+from dcp.data_format.formats.memory.records import RecordsFormat
+from dcp.data_format.formats.file_system.parquet_file import ParquetFileFormat
+from dcp.data_format.handler import (
+    FormatHandler,
+    get_handler,
+    get_handlers_for_storage,
+    infer_format,
+)
 from dcp.storage.base import (
     Storage,
     StorageClass,
@@ -22,8 +44,14 @@ from dcp.storage.base import (
     ensure_storage_object,
 )
 from dcp.storage.database.utils import get_tmp_sqlite_db_url
+from dcp.storage.file_system.engines.local import get_tmp_local_file_url
 from dcp.utils.pandas import assert_dataframes_are_almost_equal
-from tests.utils import test_data_format_objects, test_records, test_records_schema
+from tests.utils import (
+    conformed_test_records,
+    test_data_format_objects,
+    test_records,
+    test_records_schema,
+)
 
 
 def test_formats():
@@ -67,6 +95,37 @@ def test_memory_handlers(fmt: DataFormat, py_obj: Any):
     assert_objects_equal(round_trip_object, py_obj())
 
 
+def test_columnar_records_handler():
+    s = Storage("python://test")
+    name = "_test_columnar"
+    s.get_memory_api().put(name, ColumnarRecords.from_records(test_records))
+    obj = ensure_storage_object(name, storage=s)
+    assert infer_format(obj) is ColumnarRecordsFormat
+    handler = get_handler(ColumnarRecordsFormat, s.storage_engine)()
+    assert handler.infer_field_names(obj) == list(test_records[0].keys())
+    schema = handler.infer_schema(obj)
+    assert [f.field_type for f in schema.fields[:5]] == [
+        Text(),
+        Integer(),
+        DEFAULT_FIELD_TYPE,
+        Date(),
+        DEFAULT_FIELD_TYPE,
+    ]
+    assert handler.get_record_count(obj) == len(test_records)
+    handler.cast_to_schema(obj, test_records_schema)
+    columnar = s.get_memory_api().get(name)
+    assert columnar.columns["f1"].kind == "dict"
+    assert columnar.columns["f2"].kind == "int"
+    assert columnar.to_records() == conformed_test_records
+    # Round trips through the other memory formats
+    assert ColumnarRecords.from_dataframe(columnar.to_dataframe()).to_records() == (
+        conformed_test_records
+    )
+    at = ColumnarRecords.from_arrow(columnar.to_arrow())
+    assert at.columns["f1"].to_pylist() == [r["f1"] for r in test_records]
+    assert columnar.concat(columnar).to_records() == conformed_test_records * 2
+
+
 def test_database_handler():
     dburl = get_tmp_sqlite_db_url()
     s = Storage(dburl)
@@ -87,3 +146,161 @@ def test_database_handler():
     # handler().cast_to_field_type(name, s, "f4", Text())
     # round_trip_object = s.get_memory_api().get(name)
     # assert_objects_equal(round_trip_object, obj())
+
+
+def test_handler_lookups():
+    s = Storage(get_tmp_local_file_url())
+    handlers = get_handlers_for_storage(s)
+    costs = [h.inference_cost for h in handlers]
+    assert costs == sorted(costs)
+    # Callers can't change the cached lookup
+    handlers.clear()
+    assert get_handlers_for_storage(s)
+    # From the name alone, so the file isn't read (or even there)
+    obj = ensure_storage_object("_missing.parquet", storage=s)
+    assert infer_format(obj) is ParquetFileFormat
+    assert obj.get_data_format() is ParquetFileFormat
+    assert obj.format_handler is obj.format_handler
+
+
+@pytest.mark.parametrize("ext", ["csv", "jsonl"])
+def test_file_handler_sampled_schema(ext: str):
+    s = Storage(get_tmp_local_file_url())
+    name = f"_test_sampled.{ext}"
+    obj = ensure_storage_object(name, storage=s)
+    with s.get_filesystem_api().open(obj, "w") as f:
+        if ext == "csv":
+            f.write("a,b,c,d\n")
+            for i in range(2000):
+                f.write(f'{i},{i / 2},2020-01-0{i % 9 + 1},"x, {i}"\n')
+        else:
+            for i in range(2000):
+                c = f"2020-01-01T00:00:0{i % 9}"
+                f.write(f'{{"a": {i}, "b": {i / 2}, "c": "{c}", "d": {{}}}}\n')
+    handler = obj.format_handler
+    schema = handler.infer_schema(obj)
+    expected = {
+        "csv": [Integer(), Float(), Date(), Text()],
+        "jsonl": [Integer(), Float(), DateTime(), Json()],
+    }[ext]
+    assert schema.field_names() == ["a", "b", "c", "d"]
+    assert [f.field_type for f in schema.fields] == expected
+    assert handler.infer_field_type(obj, "a") == Integer()
+    # Cached until the file changes
+    assert handler.infer_schema(obj) is schema
+    with s.get_filesystem_api().open(obj, "a") as f:
+        f.write("x,x,x,x\n" if ext == "csv" else '{"a": "x"}\n')
+    assert handler.infer_schema(obj) is not schema
+    s.get_api().remove(name)
+
+
+def test_csv_handler_unquoted_sample():
+    # Sniffed dialect has no quote or escape char
+    s = Storage(get_tmp_local_file_url())
+    obj = ensure_storage_object("_test_unquoted.csv", storage=s)
+    with s.get_filesystem_api().open(obj, "w") as f:
+        f.write("a,b\n")
+        for i in range(100):
+            f.write(f"{i},x{i}\n")
+    schema = obj.format_handler.infer_schema(obj)
+    assert [f.field_type for f in schema.fields] == [Integer(), Text()]
+    s.get_api().remove(obj)
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_records_handler_wide_schema(use_processes: bool):
+    s = Storage("python://test")
+    name = "_test_wide"
+    records = [
+        {f"f{j}": [str(i), i, f"2020-01-0{i % 9 + 1}", None][j % 4] for j in range(96)}
+        for i in range(50)
+    ]
+    s.get_memory_api().put(name, records)
+    obj = ensure_storage_object(name, storage=s)
+    handler = get_handler(RecordsFormat, s.storage_engine)()
+    handler.infer_max_workers = 4
+    handler.infer_use_processes = use_processes
+    schema = handler.infer_schema(obj)
+    assert schema.field_names() == list(records[0].keys())
+    assert [f.field_type for f in schema.fields[:4]] == [
+        Integer(),
+        Integer(),
+        Date(),
+        DEFAULT_FIELD_TYPE,
+    ]
+    # Same as inferring field by field
+    assert schema.fields == FormatHandler.infer_schema(handler, obj).fields
+
+
+def test_arrow_table_handler_cast_to_schema():
+    pa = pytest.importorskip("pyarrow")
+    from dcp.data_format.formats.memory.arrow_table import ArrowTableFormat
+
+    s = Storage("python://test")
+    name = "_test_arrow_cast"
+    table = pa.table(
+        {
+            "i": ["1", "2,000", " 3", None],
+            "f": ["1.5", "nan", "-2e3", ""],
+            "d": ["2020-01-01", None, "2020-01-03", "2020-01-04"],
+            "dt": ["1/2/2020 10:30", "1/3/2020 11:00", None, None],
+            "b": ["true", "False", None, "0"],
+        }
+    )
+    s.get_memory_api().put(name, table)
+    obj = ensure_storage_object(name, storage=s)
+    handler = get_handler(ArrowTableFormat, s.storage_engine)()
+    schema = create_quick_schema(
+        "T", [("i", "Integer"), ("f", "Float"), ("d", "Date"), ("dt", "DateTime")]
+    )
+    handler.cast_to_schema(obj, schema)
+    handler.cast_to_field_type(obj, "b", Boolean())
+    cast = s.get_memory_api().get(name)
+    assert [str(t) for t in cast.schema.types] == [
+        "int64",
+        "double",
+        "date32[day]",
+        "timestamp[us]",
+        "bool",
+    ]
+    assert cast.column("i").to_pylist() == [1, 2000, 3, None]
+    assert cast.column("dt").to_pylist()[0] == datetime(2020, 1, 2, 10, 30)
+
+    s.get_memory_api().put(name, pa.table({"i": ["1", "x"]}))
+    with pytest.raises(NotImplementedError):
+        handler.cast_to_field_type(obj, "i", Integer())
+    handler.cast_errors = "null"
+    handler.cast_to_field_type(obj, "i", Integer())
+    assert s.get_memory_api().get(name).column("i").to_pylist() == [1, None]
+
+
+@pytest.mark.parametrize("ext", ["parquet", "arrow"])
+def test_typed_file_handler_cast_to_schema(ext: str):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    from dcp.data_format.formats.file_system.arrow_file import (
+        read_arrow_file_table,
+        write_arrow_file,
+    )
+
+    s = Storage(get_tmp_local_file_url())
+    obj = ensure_storage_object(f"_test_cast.{ext}", storage=s)
+    table = pa.table({"i": ["1", "2"], "t": ["a", "b"]})
+    with s.get_filesystem_api().open(obj, "wb") as f:
+        if ext == "parquet":
+            pq.write_table(table, f)
+        else:
+            write_arrow_file(f, table.schema, table.to_batches())
+    handler = obj.format_handler
+    schema = create_quick_schema("T", [("i", "Integer"), ("t", "Text")])
+    handler.cast_to_schema(obj, schema)
+    handler.cast_to_field_type(obj, "t", Text())  # No change, not rewritten
+    if ext == "parquet":
+        with s.get_filesystem_api().open(obj, "rb") as f:
+            cast = pq.read_table(f)
+    else:
+        cast = read_arrow_file_table(obj)
+    assert cast.column("i").to_pylist() == [1, 2]
+    assert handler.infer_schema(obj).fields[0].field_type == Integer()
+    s.get_api().remove(obj)
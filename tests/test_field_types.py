@@ -6,6 +6,7 @@ from typing import Any, List, Type
 import pandas as pd
 import pytest
 import sqlalchemy.types as satypes
+from commonmodel.base import create_quick_schema
 from commonmodel.field_types import (
     DEFAULT_FIELD_TYPE,
     Boolean,
@@ -26,11 +27,18 @@ from commonmodel.field_types import (
 from dateutil.tz import tzoffset
 
 from dcp import sqlalchemy_type_to_field_type
-from dcp.data_format.formats.memory.dataframe import pandas_series_to_field_type
+from dcp.data_format.formats.memory.dataframe import (
+    cast_series_to_field_type,
+    pandas_series_to_field_type,
+)
 from dcp.data_format.formats.memory.records import (
     ALL_FIELD_TYPE_HELPERS,
+    RecordsCastPlan,
+    _detect_field_type_fast,
     cast_python_object_to_field_type,
+    detect_field_type,
     select_field_type,
+    select_field_types,
 )
 
 LONG_TEXT = 65536
@@ -148,6 +156,17 @@ def test_python_object_field_type_case(case: Case):
     assert set(defs) == set(f.name for f in case.definitelys)
 
 
+@pytest.mark.parametrize(
+    "obj",
+    [c.obj for c in cases]
+    + ["12:30", "noon", "2020", "March 3 2020", "1,000", "nan", "  ", "20200101"],
+)
+def test_compiled_detector_matches_reference(obj: Any):
+    assert detect_field_type(obj) == _detect_field_type_fast(obj)
+    # Again from the cache
+    assert detect_field_type(obj) == _detect_field_type_fast(obj)
+
+
 sample_records = [
     {
         "a": "2017-02-17T15:09:26-08:00",
@@ -216,6 +235,29 @@ def test_select_field_type():
         values = [r.get(k) for r in sample_records]
         ft = select_field_type(values)
         assert ft == expected_field_types[k], k
+        assert select_field_types({k: values})[k] == expected_field_types[k], k
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["1", "2", None],
+        ["1,000", " 5 ", "1_000"],
+        ["1.5", "nan", "-Infinity", "1e5", ".5"],
+        ["True", "false"],
+        ["True", "1"],
+        ["2020-01-01", "2021-12-31", "null"],
+        ["2020-01-01", "2020-01-01 00:00:00"],
+        ["2020-01-01", "1"],
+        ["2020-13-45", "2020-01-01"],
+        ["2017-02-17T15:09:26-08:00", "20200101T101112"],
+        ["2020-01-01T01", "cookies"],
+        ["na", "NULL", None],
+        [long_text, "1"],
+    ],
+)
+def test_select_field_types_matches_select_field_type(values):
+    assert select_field_types({"a": values})["a"] == select_field_type(values)
 
 
 ERROR = "_ERROR"
@@ -314,12 +356,56 @@ def test_value_soft_casting(ftype_helper, obj, expected):
         assert cast_python_object_to_field_type(obj, ftype) == expected
 
 
+def test_records_cast_plan():
+    schema = create_quick_schema(
+        "CastSchema", [("a", "Integer"), ("b", "DateTime"), ("c", "Boolean")]
+    )
+    records = [
+        {"a": "1,000", "b": "1/2/2020 10:30", "c": "true"},
+        {"a": float("nan"), "b": None, "c": "false", "d": "untouched"},
+        {"b": "March 3 2020"},
+    ]
+    plan = RecordsCastPlan.from_schema(schema, records)
+    assert plan.cast(records) == [
+        {"a": 1000, "b": dt(2020, 1, 2, 10, 30), "c": True},
+        {"a": None, "b": None, "c": False, "d": "untouched"},
+        {"b": dt(2020, 3, 3)},
+    ]
+    with pytest.raises(NotImplementedError):
+        plan.cast([{"a": "x"}])
+
+
 def test_pandas_series_to_field_type():
     df = pd.DataFrame.from_records(sample_records)
     for c in df.columns:
         assert pandas_series_to_field_type(df[c]) == expected_pandas_field_types[c], c
 
 
+@pytest.mark.parametrize(
+    "ftype,values,expected",
+    [
+        (Integer, ["1,000", "2", None, "null"], [1000, 2, pd.NA, pd.NA]),
+        (Integer, [1.5, 2], [1, 2]),
+        (Float, ["1.5", "2,000.5"], [1.5, 2000.5]),
+        (Boolean, ["true", "F", True, 0, None], [True, False, True, False, pd.NA]),
+        (Json, ['{"a": 1}', [1], None], [{"a": 1}, [1], None]),
+        (Time, ["1:30 PM", "12:00"], [time(13, 30), time(12)]),
+        (
+            DateTime,
+            ["1/2/2020 10:30", "March 3 2020"],
+            [dt(2020, 1, 2, 10, 30), dt(2020, 3, 3)],
+        ),
+    ],
+)
+def test_cast_series_to_field_type(ftype, values, expected):
+    s = cast_series_to_field_type(pd.Series(values), ftype())
+    assert s.tolist() == expected
+    # Same as casting each value
+    for v, e in zip(values, expected):
+        if e is not pd.NA:
+            assert cast_python_object_to_field_type(v, ftype()) == e
+
+
 @pytest.mark.parametrize("ftype,expected", [("Text(length=55)", Text(length=55))])
 def test_ensure_field_type(ftype, expected):
     assert ensure_field_type(ftype) == expected
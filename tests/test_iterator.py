@@ -1,4 +1,10 @@
 import pytest
+from dcp.data_copy.base import CopyRequest
+from dcp.data_copy.copiers.to_memory.memory_to_memory import RecordsIteratorToRecords
+from dcp.data_format.formats.memory.records import RecordsFormat
+from dcp.data_format.formats.memory.records_iterator import RecordsIteratorFormat
+from dcp.storage.base import ensure_storage_object
+from dcp.storage.memory.engines.python import new_local_python_storage
 from dcp.storage.memory.iterator import SampleableIterator
 
 
@@ -26,3 +32,20 @@ def test_sampleable_iterator():
     # Should still iterate properly
     assert list(si) == list(range(10))
     assert list(si.head(20)) == list(range(10))
+
+
+def test_iterator_put_is_sampleable():
+    mem_s = new_local_python_storage()
+    mem_api = mem_s.get_memory_api()
+    mem_api.put("gen", ({"f1": "hi", "f2": i} for i in range(250)))
+    so = ensure_storage_object("gen", storage=mem_s)
+    assert so.get_data_format() is RecordsIteratorFormat
+    schema = so.get_schema()
+    assert schema.field_names() == ["f1", "f2"]
+    assert schema.get_field("f2").field_type.name == "Integer"
+
+    # Inference didn't consume anything
+    to_so = ensure_storage_object("records", storage=mem_s, _data_format=RecordsFormat)
+    RecordsIteratorToRecords().copy(CopyRequest(so, to_so))
+    records = mem_api.get("records")
+    assert records == [{"f1": "hi", "f2": i} for i in range(250)]
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import gzip
+import multiprocessing
 import os
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
 from typing import Type
 
+import pandas as pd
+import pyarrow as pa
 import pytest
 
 from dcp import (
@@ -25,6 +31,21 @@ from dcp.storage.database import (
     MysqlDatabaseStorageApi,
     DatabaseApi,
 )
+from dcp.data_copy.base import copy_objects
+from dcp.data_format.formats.file_system.csv_file import CsvFileFormat
+from dcp.data_format.formats.memory.arrow_table import ArrowTableFormat
+from dcp.storage.file_system.compression import (
+    ZSTD_SUPPORTED,
+    ParallelBlockCompressor,
+    infer_compression,
+    open_compressed,
+)
+from dcp.storage.file_system.engines.base import get_tmp_local_file_url
+from dcp.storage.memory.engines.python import (
+    LOCAL_PYTHON_STORAGE,
+    set_python_storage_capacity,
+)
+from dcp.storage.memory.engines.shared_memory import new_shared_memory_storage
 from dcp.utils.common import rand_str
 
 
@@ -54,6 +75,32 @@ def test_storage_api():
     assert isinstance(s, PythonStorageApi)
 
 
+def test_storage_api_shared():
+    url = f"python://{rand_str(6)}"
+    api = Storage(url).get_api()
+    assert Storage(url).get_memory_api() is api
+    assert Storage(f"python://{rand_str(6)}").get_api() is not api
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        url = f"sqlite:///{rand_str(6)}.db"
+        apis = list(executor.map(lambda _: Storage(url).get_api(), range(32)))
+    assert all(a is apis[0] for a in apis)
+
+
+def test_storage_api_cache_bounded(monkeypatch):
+    from dcp.storage import base as storage_base
+
+    monkeypatch.setattr(storage_base, "STORAGE_API_CACHE_SIZE", 2)
+    monkeypatch.setattr(storage_base, "ENGINE_CACHE_SIZE", 2)
+    first = Storage(f"python://{rand_str(6)}")
+    api = first.get_api()
+    for _ in range(5):
+        Storage(f"python://{rand_str(6)}").get_api()
+        # Recently used, so kept
+        assert first.get_api() is api
+    assert len(storage_base._storage_apis) <= 2
+    assert len(storage_base._engines_for_urls) <= 2
+
+
 @pytest.mark.parametrize(
     "url",
     [
@@ -142,3 +189,221 @@ def test_python_api_core_operations(url):
     assert api.record_count(name + "alias") == 2
     api.copy(name, name + "copy")
     assert api.record_count(name + "copy") == 2
+
+
+def test_python_api_copy_on_write():
+    api = Storage("python://").get_memory_api()
+    name = f"_test_{rand_str()}"
+    records = [{"a": 1}, {"a": 2}]
+    api.put(name, records)
+    api.copy(name, name + "copy")
+    # Shared until mutated
+    assert api.get(name + "copy") is records
+    copied = api.get_mutable(name + "copy")
+    assert copied is not records
+    copied[0]["a"] = 3
+    api.append(name + "copy", [{"a": 4}])
+    assert api.get(name) == [{"a": 1}, {"a": 2}]
+    assert api.get(name + "copy") == [{"a": 3}, {"a": 2}, {"a": 4}]
+    # The original is the only one left holding it, so isn't copied
+    assert api.get_mutable(name) is records
+    # Shared by three, the first write copies, the other two still share
+    api.copy(name, name + "copy2")
+    api.copy(name, name + "copy3")
+    assert api.get_mutable(name) is not records
+    assert api.get_mutable(name + "copy2") is not records
+    assert api.get_mutable(name + "copy3") is records
+
+
+def test_python_storage_spill():
+    api = Storage(f"python://{rand_str()}/").get_memory_api()
+    records = [{"a": i, "b": str(i)} for i in range(1000)]
+    table = pa.Table.from_pylist(records)
+    # Only the most recently used object fits
+    set_python_storage_capacity(1)
+    try:
+        api.put("records", records)
+        assert api.get_object_size("records") > 0
+        api.put("table", table)
+        api.pin("table")
+        api.put("df", pd.DataFrame(records))
+        # Least recently used first, and never pinned
+        assert LOCAL_PYTHON_STORAGE.is_spilled(api.get_path("records"))
+        assert not LOCAL_PYTHON_STORAGE.is_spilled(api.get_path("table"))
+        in_memory = ["table", "df"]
+        assert api.get_size() == sum(api.get_object_size(n) for n in in_memory)
+        # Reloaded on get, spilling the next least recently used
+        assert api.get("records") == records
+        assert LOCAL_PYTHON_STORAGE.is_spilled(api.get_path("df"))
+        api.unpin("table")
+        api.put("more", records)
+        assert api.get("table") == table
+        api.remove("records")
+        assert not api.exists("records")
+    finally:
+        set_python_storage_capacity(None)
+
+
+def test_python_storage_spill_accounting():
+    api = Storage(f"python://{rand_str()}/").get_memory_api()
+    records = [{"a": i} for i in range(1000)]
+    api.put("records", records)
+    api.copy("records", "copy")
+    # Shared, so counted once
+    assert api.get_size() == api.get_object_size("records")
+    api.get_mutable("records")
+    size = api.get_object_size("records")
+    # Re-estimated after mutating in place
+    api.get_mutable("records").extend(records)
+    assert api.get_object_size("records") > size
+    api.copy("records", "copy")
+    set_python_storage_capacity(1)
+    try:
+        api.put("table", pa.table({"a": list(range(1000))}))
+        # Both paths holding it spilled together, to one file
+        assert LOCAL_PYTHON_STORAGE.is_spilled(api.get_path("records"))
+        assert LOCAL_PYTHON_STORAGE.is_spilled(api.get_path("copy"))
+        assert api.get("copy") == records * 2
+        # Reloaded once, and still shared
+        assert api.get("records") is api.get("copy")
+        assert api.get_size() == api.get_object_size("records")
+        # Reloading memory mapped tables doesn't leak file descriptors
+        fd_dir = "/proc/self/fd"
+        n_fds = len(os.listdir(fd_dir)) if os.path.isdir(fd_dir) else None
+        for _ in range(5):
+            assert api.get("table").num_rows == 1000
+            api.get("records")
+        if n_fds is not None:
+            assert len(os.listdir(fd_dir)) <= n_fds
+    finally:
+        set_python_storage_capacity(None)
+
+
+def _sum_shared_table(url: str):
+    api = Storage(url).get_memory_api()
+    table = api.get("table")
+    api.put("sum", pa.table({"sum": [sum(table.column("a").to_pylist())]}))
+
+
+def test_shared_memory_storage():
+    s = new_shared_memory_storage()
+    api = s.get_memory_api()
+    api.put("table", pa.table({"a": list(range(100))}))
+    try:
+        assert api.exists("table")
+        assert api.record_count("table") == 100
+        with pytest.raises(TypeError):
+            api.put("records", [{"a": 1}])
+        # Another process attaches, and writes a table we can read back
+        p = multiprocessing.Process(target=_sum_shared_table, args=(s.url,))
+        p.start()
+        p.join()
+        assert p.exitcode == 0
+        assert api.get("sum").to_pylist() == [{"sum": 4950}]
+
+        # Copies to and from python storage
+        mem_s = Storage(f"python://{rand_str()}/")
+        mem_s.get_memory_api().put("records", [{"a": 1}, {"a": 2}])
+        from_so = StorageObject(mem_s, FullPath("records"))
+        to_so = StorageObject(s, FullPath("copied"), _data_format=ArrowTableFormat)
+        copy_objects(from_so, to_so, available_storages=[mem_s, s])
+        assert api.get("copied").to_pylist() == [{"a": 1}, {"a": 2}]
+    finally:
+        for name in ["table", "sum", "copied"]:
+            api.remove(name)
+    assert not api.exists("table")
+
+
+def _read_shared_table_versions(url: str, n_versions: int):
+    api = Storage(url).get_memory_api()
+    seen = set()
+    while len(seen) < n_versions:
+        # Always a whole version, never a partly written or missing one
+        values = set(api.get("table").column("a").to_pylist())
+        assert len(values) == 1
+        seen |= values
+
+
+def test_shared_memory_put_while_reading():
+    s = new_shared_memory_storage()
+    api = s.get_memory_api()
+    api.put("table", pa.table({"a": [0] * 1000}))
+    try:
+        p = multiprocessing.Process(target=_read_shared_table_versions, args=(s.url, 2))
+        p.start()
+        i = 0
+        while p.is_alive():
+            i += 1
+            api.put("table", pa.table({"a": [i] * 1000}))
+        assert p.exitcode == 0
+    finally:
+        api.remove("table")
+
+
+def test_shared_memory_segments_freed():
+    from dcp.storage.memory.engines import shared_memory
+
+    api = new_shared_memory_storage().get_memory_api()
+    api.put("table", pa.table({"a": [0]}))
+    try:
+        for i in range(20):
+            api.append("table", pa.table({"a": [i]}))
+            assert not shared_memory._RETIRED_SEGMENTS
+        assert api.record_count("table") == 21
+        # Kept open while a table read from it is around, closed after
+        table = api.get("table")
+        api.remove("table")
+        assert len(shared_memory._RETIRED_SEGMENTS) == 1
+        assert table.num_rows == 21
+        del table
+        api.put("table", pa.table({"a": [0]}))
+        assert not shared_memory._RETIRED_SEGMENTS
+    finally:
+        api.remove("table")
+
+
+@pytest.mark.parametrize("ext", [".gz", ".bz2", ".xz", ".zst"])
+def test_compressed_files(ext: str):
+    compression = infer_compression("f" + ext)
+    if compression == "zstd" and not ZSTD_SUPPORTED:
+        pytest.skip("zstandard not installed")
+    s = Storage(get_tmp_local_file_url())
+    fs_api = s.get_filesystem_api()
+    name = f"_test_{rand_str()}.csv{ext}"
+    lines = ["f1,f2"] + [f"hi{i},{i}" for i in range(100)]
+    fs_api.write_lines_to_file(name, lines)
+    with fs_api.open(name, "a") as f:
+        f.write("bye,100\n")
+    # Raw bytes are compressed
+    with fs_api.open(name, "rb", compression=None) as f:
+        assert not f.read().startswith(b"f1,f2")
+    with fs_api.open(name) as f:
+        assert f.read().splitlines() == lines + ["bye,100"]
+    so = StorageObject(s, FullPath(name))
+    assert fs_api.record_count(so) == 102
+    assert so.get_data_format() is CsvFileFormat
+    fs_api.remove(so)
+
+
+def test_parallel_block_compressor():
+    data = b"".join(b"%d,hello world\n" % i for i in range(10000))
+    out = BytesIO()
+    out.close = lambda: None
+    with open_compressed(
+        out, "wb", "gzip", compression_threads=4, block_size=1024
+    ) as f:
+        f.write(data)
+    # Many independent gzip members, readable as one file
+    assert gzip.decompress(out.getvalue()) == data
+
+
+def test_parallel_block_compressor_closes_on_error():
+    def compress(block: bytes) -> bytes:
+        raise ValueError("bad block")
+
+    out = BytesIO()
+    f = ParallelBlockCompressor(out, compress, block_size=1024, threads=2)
+    f.write(b"x" * 100)
+    with pytest.raises(ValueError):
+        f.close()
+    assert f.closed and out.closed
@@ -6,15 +6,29 @@ from enum import Enum
 
 import pytest
 from dcp.utils.common import (
+    ISO_FORMAT,
+    TIME_FORMATS,
     DcpJsonEncoder,
+    ensure_date,
+    ensure_datetime,
+    ensure_time,
+    infer_datetime_format,
     is_datetime_str,
+    parse_time_with_format,
     snake_to_title_case,
     title_to_snake_case,
 )
-from dcp.utils.data import clean_record, is_nullish, with_header
+from dcp.utils.data import clean_record, is_nullish, with_header, write_csv
+from dcp.utils.parallel import (
+    iter_arrow_csv_batches,
+    read_csv_file_parallel,
+    read_json_lines_file_parallel,
+    split_byte_ranges,
+)
 from dcp.utils.pandas import (
     assert_dataframes_are_almost_equal,
     dataframe_to_records,
+    iter_dataframe_records,
     empty_dataframe_for_schema,
 )
 from numpy import NaN
@@ -62,6 +76,37 @@ def test_is_datetime_str():
     assert not is_datetime_str("Pizza 2012-02-02")
 
 
+@pytest.mark.parametrize(
+    "values,expected",
+    [
+        (["2012-01-01", "2012-01-01 00:00:00", None], ISO_FORMAT),
+        (["2012-01-01T00:00:00Z", "2012-01-01T00:00:00+08:00"], "%Y-%m-%dT%H:%M:%S%z"),
+        (["1/2/2012", "12/31/2012", "null"], "%m/%d/%Y"),
+        (["20120101", "20121231"], "%Y%m%d"),
+        (["1/2/2012 10:30", "12/31/2012 8:00"], "%m/%d/%Y %H:%M"),
+        (["2012-01-01", "January 2012"], None),
+        ([None, 1], None),
+    ],
+)
+def test_infer_datetime_format(values, expected):
+    fmt = infer_datetime_format(values)
+    assert fmt == expected
+    for v in values:
+        if isinstance(v, str) and v != "null":
+            # Same result as dateutil, with or without the format
+            assert ensure_datetime(v, fmt) == ensure_datetime(v)
+            assert ensure_date(v, fmt) == ensure_date(v)
+
+
+def test_ensure_with_format_falls_back():
+    assert ensure_datetime("March 3 2012", "%m/%d/%Y") == datetime(2012, 3, 3)
+    assert ensure_date("2012/03/03", ISO_FORMAT) == date(2012, 3, 3)
+    fmt = infer_datetime_format(["1:30 PM"], TIME_FORMATS, parse_time_with_format)
+    assert fmt == "%I:%M %p"
+    assert ensure_time("1:30 PM", fmt) == time(13, 30)
+    assert ensure_time("13:30:01", fmt) == time(13, 30, 1)
+
+
 def test_json_encoder():
     class T(str, Enum):
         A = "A"
@@ -121,6 +166,12 @@ def test_dataframe_to_records():
         if r["a"] == 0:
             # NaT has been converted to None
             assert r["c"] is None
+    # Input is left untouched
+    assert df["c"].dtype.name == "datetime64[ns]"
+    assert list(df.columns) == ["a", "b", "c"]
+    chunks = list(iter_dataframe_records(df, chunk_size=3))
+    assert [len(c) for c in chunks] == [3, 3, 3, 1]
+    assert [r for c in chunks for r in c] == records
 
 
 def test_with_header():
@@ -144,3 +195,67 @@ def test_clean_records():
 #     df = coerce_dataframe_to_schema(df, TestSchema4)
 #     dfe = DataFrame({"f1": [str(i) for i in range(10)], "f2": range(10)})
 #     assert_dataframes_are_almost_equal(df, dfe, TestSchema4)
+
+
+def test_split_byte_ranges_respects_quoted_newlines(tmp_path):
+    pth = str(tmp_path / "quoted.csv")
+    rows = [f'{i},"multi\nline ""{i}""",x' for i in range(200)]
+    with open(pth, "w") as f:
+        f.write("a,b,c\n" + "\n".join(rows) + "\n")
+    with open(pth, "rb") as f:
+        data = f.read()
+    start = data.index(b"\n") + 1
+    ranges = split_byte_ranges(pth, 7, start, quotechar='"')
+    assert len(ranges) > 1
+    assert ranges[0][0] == start and ranges[-1][1] == len(data)
+    for s, e in ranges:
+        # Every range starts on a record (a row number), never mid-value
+        assert data[s : e].split(b",")[0].isdigit()
+
+
+@pytest.mark.parametrize("output", ["records", "dataframe", "arrow"])
+def test_parallel_file_reads(tmp_path, output):
+    csv_pth = str(tmp_path / "test.csv")
+    jsonl_pth = str(tmp_path / "test.jsonl")
+    records = [{"a": str(i), "b": f"hi\n{i}", "c": None} for i in range(500)]
+    with open(csv_pth, "w") as f:
+        write_csv(records, f)
+    with open(jsonl_pth, "w") as f:
+        f.writelines(json.dumps(r) + "\n" for r in records)
+    for pth, reader in [
+        (csv_pth, read_csv_file_parallel),
+        (jsonl_pth, read_json_lines_file_parallel),
+    ]:
+        obj = reader(pth, output=output, max_workers=3, min_range_bytes=1000)
+        if output == "dataframe":
+            obj = dataframe_to_records(obj)
+        elif output == "arrow":
+            obj = obj.to_pylist()
+        assert obj == records
+
+
+def test_parallel_csv_read_quoted_header(tmp_path):
+    pth = str(tmp_path / "header.csv")
+    with open(pth, "w") as f:
+        f.write('"multi\nline",b\n')
+        f.writelines(f"{i},x\n" for i in range(500))
+    for output in ["records", "arrow"]:
+        # (Forked just to keep the test quick, spawn is the default)
+        obj = read_csv_file_parallel(
+            pth, output, max_workers=3, min_range_bytes=1000, start_method="fork"
+        )
+        if output == "arrow":
+            obj = obj.to_pylist()
+        assert obj == [{"multi\nline": str(i), "b": "x"} for i in range(500)]
+
+
+def test_arrow_csv_batches_quoted_header(tmp_path):
+    pth = str(tmp_path / "header.csv")
+    with open(pth, "w") as f:
+        f.write('"multi\nline",b\n')
+        f.writelines(f"{i},x\n" for i in range(500))
+    with open(pth, "rb") as f:
+        batches = list(iter_arrow_csv_batches(f, block_size=1000))
+    assert len(batches) > 1
+    records = [r for b in batches for r in b.to_pylist()]
+    assert records == [{"multi\nline": str(i), "b": "x"} for i in range(500)]